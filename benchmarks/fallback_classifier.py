@@ -0,0 +1,96 @@
+"""
+Benchmark for the fallback intent classifier
+Reports accuracy and latency on the bundled utterance corpus
+
+Regex + fallback can score below the fallback alone. The processor only
+consults the fallback when no pattern matches with confidence 0.3 or more,
+and a few catch-all patterns match paraphrases confidently but wrongly
+("kill the audio" is close_app through "kill (.+)", "do i need a coat" is
+launch_app through "i need (.+)"). Those show up as pattern overrides; no
+threshold separates them, since they match with confidence 0.8 to 1.0.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.intent_recognizer import IntentRecognizer
+from core.fallback_classifier import FallbackClassifier, DEFAULT_CORPUS
+
+
+def percentile(values, fraction):
+    """Get a percentile from a list of values"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_benchmark(repeat: int = 200):
+    """Run the benchmark and print a report"""
+    with open(DEFAULT_CORPUS, 'r', encoding='utf-8') as f:
+        evaluation = json.load(f)['evaluation']
+    
+    recognizer = IntentRecognizer(cache_size=0, catalog_path='')
+    classifier = FallbackClassifier()
+    
+    start = time.perf_counter()
+    classifier._get_model()
+    build_time = time.perf_counter() - start
+    
+    regex_correct = 0
+    fallback_correct = 0
+    combined_correct = 0
+    overrides = []
+    with_parameters = 0
+    needing_parameters = 0
+    
+    for utterance, expected in evaluation:
+        result = recognizer.recognize(utterance)
+        regex_intent = result['intent'] if result['confidence'] >= 0.3 else 'unknown'
+        
+        fallback = classifier.classify(utterance)
+        fallback_intent = fallback['intent'] if fallback else 'unknown'
+        
+        combined_intent = regex_intent if regex_intent != 'unknown' else fallback_intent
+        
+        regex_correct += regex_intent == expected
+        fallback_correct += fallback_intent == expected
+        combined_correct += combined_intent == expected
+        
+        # Confident pattern matches that hide a correct fallback guess
+        if regex_intent not in ('unknown', expected) and fallback_intent == expected:
+            overrides.append(f"{utterance!r} -> {regex_intent}")
+        
+        if fallback and fallback_intent in classifier._get_model().parameters:
+            needing_parameters += 1
+            with_parameters += bool(fallback['parameters'])
+    
+    # Latency of a single classification
+    latencies = []
+    for _ in range(repeat):
+        for utterance, _ in evaluation:
+            start = time.perf_counter()
+            classifier.classify(utterance)
+            latencies.append((time.perf_counter() - start) * 1e6)
+    
+    total = len(evaluation)
+    print("\n=== Fallback Classifier Benchmark ===")
+    print(f"Evaluation utterances: {total}")
+    print(f"Model build:           {build_time * 1000:.1f} ms")
+    print(f"Regex only accuracy:   {regex_correct / total:.1%}")
+    print(f"Fallback accuracy:     {fallback_correct / total:.1%}")
+    print(f"Regex + fallback:      {combined_correct / total:.1%}")
+    print(f"Pattern overrides:     {len(overrides)}")
+    for override in overrides:
+        print(f"  {override}")
+    if needing_parameters:
+        print(f"Parameters extracted:  {with_parameters}/{needing_parameters}")
+    print(f"Latency p50:           {percentile(latencies, 0.5):.1f} us")
+    print(f"Latency p99:           {percentile(latencies, 0.99):.1f} us")
+
+
+if __name__ == "__main__":
+    run_benchmark()
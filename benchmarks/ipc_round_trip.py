@@ -0,0 +1,105 @@
+"""
+Benchmark for the daemon command endpoint
+Reports round-trip latency, pipelined throughput and main.py --command
+wall time with and without a running daemon
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.logger import get_logger
+from utils.config_manager import get_config
+from core.ipc_client import CommandClient
+from core.ipc_server import CommandServer
+
+COMMAND = "what time is it"
+
+
+def percentile(values, fraction):
+    """Get a percentile from a list of values"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def time_main(address: str, extra_args, runs: int):
+    """Median wall time of main.py --command in milliseconds"""
+    args = [sys.executable, str(PROJECT_ROOT / 'main.py'), '--command', COMMAND] + extra_args
+    env = dict(os.environ, JARVIS_IPC_ADDRESS=address)
+    
+    timings = []
+    for _ in range(runs + 1):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=PROJECT_ROOT, env=env, capture_output=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    
+    # The first run only warms the OS file cache
+    return percentile(timings[1:], 0.5)
+
+
+def run_benchmark(requests: int = 2000, runs: int = 10):
+    """Run the benchmark and print a report"""
+    get_logger().logger.setLevel(logging.WARNING)
+    get_config().set('voice.enabled', False, save=False)
+    
+    from core.jarvis import Jarvis
+    jarvis = Jarvis()
+    jarvis.start()
+    
+    if os.name == 'nt':
+        address = '\\\\.\\pipe\\jarvis-benchmark'
+    else:
+        address = os.path.join(tempfile.mkdtemp(), 'jarvis-benchmark.sock')
+    server = CommandServer(jarvis, address)
+    if not server.start():
+        print("Could not start the command endpoint")
+        return 1
+    
+    try:
+        start = time.perf_counter()
+        client = CommandClient(address)
+        connect_time = time.perf_counter() - start
+        
+        # Sequential round trips
+        latencies = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            client.execute(COMMAND)
+            latencies.append((time.perf_counter() - start) * 1e6)
+        
+        # Pipelined over the same connection
+        start = time.perf_counter()
+        results = client.execute_many([COMMAND] * requests)
+        pipelined_time = time.perf_counter() - start
+        client.close()
+        
+        in_order = [result['id'] for result in results] == sorted(result['id'] for result in results)
+        daemon_wall = time_main(address, [], runs)
+    finally:
+        server.stop()
+        jarvis.stop()
+    
+    standalone_wall = time_main(address, ['--no-daemon'], runs)
+    
+    print("\n=== Command Endpoint Benchmark ===")
+    print(f"Address:               {address}")
+    print(f"Connect:               {connect_time * 1e6:.0f} us")
+    print(f"Round trip p50:        {percentile(latencies, 0.5):.0f} us")
+    print(f"Round trip p99:        {percentile(latencies, 0.99):.0f} us")
+    print(f"Pipelined throughput:  {requests / pipelined_time:.0f} commands/s "
+          f"({'in order' if in_order else 'OUT OF ORDER'})")
+    print(f"main.py --command via daemon:  {daemon_wall:.1f} ms")
+    print(f"main.py --command in-process:  {standalone_wall:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_benchmark())
@@ -0,0 +1,103 @@
+"""
+Benchmark for speech recognition backends
+Decodes the same recordings with each engine and reports latency, real-time
+factor and word error rate, to pick the fastest engine that is accurate
+enough on this hardware
+
+Usage: python benchmarks/recognition.py [recordings dir] [engine ...]
+The directory holds WAV files with a matching .txt transcript each
+(e.g. open_chrome.wav and open_chrome.txt). Without recordings, synthetic
+audio is decoded with the scripted stand-in engine only.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import speech_recognition as sr
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from voice.recognition_backends import ScriptedBackend, create_backend
+
+
+def load_recordings(directory: Path):
+    """Get (name, audio, reference transcript) for each WAV file with a transcript"""
+    recordings = []
+    for path in sorted(directory.glob('*.wav')):
+        transcript = path.with_suffix('.txt')
+        if not transcript.exists():
+            continue
+        with sr.AudioFile(str(path)) as source:
+            audio = sr.Recognizer().record(source)
+        recordings.append((path.stem, audio, transcript.read_text().strip()))
+    return recordings
+
+
+def synthetic_recordings():
+    """Tone bursts of 1-5 s paired with made-up commands"""
+    import numpy as np
+    from benchmarks.vad import synthetic_utterance, SAMPLE_RATE
+    
+    rng = np.random.default_rng(7)
+    commands = ["open chrome", "what time is it", "take a screenshot",
+                "set volume to fifty percent", "close all notepad windows"]
+    recordings = []
+    for index, command in enumerate(commands):
+        samples, start, end = synthetic_utterance(rng, -50, False)
+        samples = samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+        recordings.append((f"synthetic_{index}", sr.AudioData(samples.tobytes(), SAMPLE_RATE, 2), command))
+    return recordings
+
+
+def word_errors(reference: str, hypothesis: str):
+    """Word-level edit distance and reference length"""
+    ref = reference.lower().split()
+    hyp = (hypothesis or '').lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, word in enumerate(ref, 1):
+        current = [i]
+        for j, other in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (word != other)))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def run_benchmark(directory: str = '', engines=()):
+    """Run the benchmark and print a report"""
+    if directory and Path(directory).is_dir():
+        recordings = load_recordings(Path(directory))
+        backends = [create_backend(engine) for engine in engines or ('vosk', 'google')]
+    else:
+        print("No recordings given - decoding synthetic audio with the scripted engine")
+        recordings = synthetic_recordings()
+        backends = [ScriptedBackend([reference for _, _, reference in recordings], real_time_factor=0.05)]
+    
+    if not recordings:
+        print(f"No WAV files with transcripts in {directory}")
+        return
+    
+    audio_seconds = sum(len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+                        for _, audio, _ in recordings)
+    print(f"{len(recordings)} recordings, {audio_seconds:.1f} s of audio\n")
+    print(f"{'engine':10} {'offline':>8} {'latency p50/p95':>20} {'RTF':>7} {'WER':>7} {'total':>9}")
+    
+    for backend in backends:
+        errors = words = 0
+        start = time.perf_counter()
+        for name, audio, reference in recordings:
+            text = backend.recognize(audio)
+            edits, length = word_errors(reference, text)
+            errors += edits
+            words += length
+        total = time.perf_counter() - start
+        
+        stats = backend.get_stats()
+        print(f"{stats['engine']:10} {str(stats['offline']):>8} "
+              f"{stats.get('latency_p50_ms', 0):>9.0f} / {stats.get('latency_p95_ms', 0):>5.0f} ms "
+              f"{stats.get('real_time_factor') or 0:>7.3f} {errors / max(words, 1):>7.1%} {total:>7.2f} s")
+
+
+if __name__ == "__main__":
+    run_benchmark(*sys.argv[1:2], engines=sys.argv[2:])
@@ -0,0 +1,57 @@
+"""
+Benchmark for cold start of a single command
+Times `main.py --command` end to end and checks it against the startup budget
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.config_manager import get_config
+
+
+def percentile(values, fraction):
+    """Get a percentile from a list of values"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_benchmark(command: str = "what time is it", runs: int = 10) -> int:
+    """Run the benchmark, print a report and return an exit code"""
+    budget = get_config().get('advanced.cold_start_budget_ms', 300)
+    args = [sys.executable, str(PROJECT_ROOT / 'main.py'), '--command', command, '--no-daemon']
+    
+    # One untimed run so every timed run finds the files in the OS cache
+    subprocess.run(args, cwd=PROJECT_ROOT, capture_output=True)
+    
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.run(args, cwd=PROJECT_ROOT, capture_output=True)
+        timings.append((time.perf_counter() - start) * 1000)
+        
+        if process.returncode != 0:
+            print(process.stdout.decode(errors='replace'))
+            print(f"Command failed with exit code {process.returncode}")
+            return 1
+    
+    median = percentile(timings, 0.5)
+    print("\n=== Cold Start Benchmark ===")
+    print(f"Command:      main.py --command \"{command}\"")
+    print(f"Runs:         {runs}")
+    print(f"Wall p50:     {median:.1f} ms")
+    print(f"Wall p90:     {percentile(timings, 0.9):.1f} ms")
+    print(f"Wall max:     {max(timings):.1f} ms")
+    print(f"Budget:       {budget} ms ({'ok' if median <= budget else 'OVER BUDGET'})")
+    print("Run main.py --profile-startup --command ... to see where the time goes")
+    
+    return 0 if median <= budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_benchmark(*sys.argv[1:2]))
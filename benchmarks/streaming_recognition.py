@@ -0,0 +1,72 @@
+"""
+Benchmark for streaming speech recognition
+Replays synthetic utterances in real time through SpeechRecognizer.listen
+with the scripted engine at several decode speeds, and compares how long
+after the speaker stops the final transcript arrives when the phrase is
+decoded as it is captured versus after it has been recorded
+"""
+
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.vad import SAMPLE_RATE, synthetic_utterance
+from voice.recognition_backends import ScriptedBackend
+from voice.speech_recognition import FileAudioSource, SpeechRecognizer
+
+
+def write_utterances(directory: Path, count: int, seed: int = 7):
+    """Write WAV files of one utterance each; returns (path, true speech end s)"""
+    rng = np.random.default_rng(seed)
+    utterances = []
+    for index in range(count):
+        samples, _, speech_end = synthetic_utterance(rng, -50, False)
+        samples = samples[:int((speech_end + 1.0) * SAMPLE_RATE)]
+        path = directory / f"utterance_{index}.wav"
+        with wave.open(str(path), 'wb') as file:
+            file.setnchannels(1)
+            file.setsampwidth(2)
+            file.setframerate(SAMPLE_RATE)
+            file.writeframes(samples.tobytes())
+        utterances.append((path, speech_end))
+    return utterances
+
+
+def run_benchmark(utterances: int = 6, factors=(0.1, 0.3, 0.6)):
+    """Run the benchmark and print a report"""
+    recognizer = SpeechRecognizer()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        recordings = write_utterances(Path(directory), utterances)
+        print(f"{utterances} utterances replayed in real time\n")
+        print(f"{'RTF':>5} {'mode':>10} {'after speech end p50/max':>28} {'finalize p50':>14}")
+        
+        for factor in factors:
+            for streaming in (False, True):
+                recognizer.backend = ScriptedBackend(["open the quarterly report in excel"], factor)
+                recognizer.streaming = streaming
+                latencies, finalize = [], []
+                
+                for path, speech_end in recordings:
+                    source = FileAudioSource(path, realtime=True)
+                    start = time.perf_counter()
+                    result = recognizer.listen(timeout=3, source=source,
+                                               on_partial=lambda text: None)
+                    latencies.append((time.perf_counter() - start - speech_end) * 1000)
+                    finalize.append(result.get('finalize_ms'))
+                
+                mode = 'streaming' if streaming else 'batch'
+                finalize_ms = f"{np.percentile(finalize, 50):.1f} ms" if streaming else '-'
+                print(f"{factor:>5} {mode:>10} {np.percentile(latencies, 50):>17.0f} / {max(latencies):>5.0f} ms "
+                      f"{finalize_ms:>14}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,167 @@
+"""
+Benchmark for voice activity detection endpointing
+Compares speech_recognition's energy-threshold endpointing with the NumPy
+VAD on synthetic utterances: how long after the speaker stops each one
+ends the phrase, how much audio each sends for recognition, and how much
+CPU the VAD spends per frame
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import speech_recognition as sr
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from voice.vad import VoiceActivityDetector, Endpointer
+
+SAMPLE_RATE = 16000
+CHUNK = 512  # samples per audio bus frame
+PHRASE_LIMIT = 10
+
+
+def synthetic_utterance(rng: np.random.Generator, noise_db: float, varying_noise: bool):
+    """
+    Leading silence, a few words of voiced syllables, trailing silence
+    Returns the samples and the true speech start and end in seconds.
+    """
+    lead = rng.uniform(0.5, 1.5)
+    tail = PHRASE_LIMIT + 2
+    pieces = [np.zeros(int(lead * SAMPLE_RATE))]
+    speech_length = 0.0
+    
+    for word in range(rng.integers(2, 6)):
+        for syllable in range(rng.integers(1, 4)):
+            duration = rng.uniform(0.12, 0.25)
+            t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+            f0 = rng.uniform(100, 220)
+            voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 12))
+            envelope = np.sin(np.pi * t / duration) ** 0.5
+            pieces.append(0.3 * envelope * voiced / 3)
+            speech_length += duration
+            gap = rng.uniform(0.03, 0.08)
+            pieces.append(np.zeros(int(gap * SAMPLE_RATE)))
+            speech_length += gap
+        gap = rng.uniform(0.1, 0.25)
+        pieces.append(np.zeros(int(gap * SAMPLE_RATE)))
+        speech_length += gap
+    
+    pieces.append(np.zeros(int(tail * SAMPLE_RATE)))
+    signal = np.concatenate(pieces)
+    
+    # Background noise, optionally swelling and fading like a fan or traffic
+    level = 10 ** (noise_db / 20)
+    noise = rng.normal(0, level, len(signal))
+    if varying_noise:
+        t = np.arange(len(signal)) / SAMPLE_RATE
+        noise *= 10 ** (6 * np.sin(2 * np.pi * t / 4) / 20)
+    samples = np.clip((signal + noise) * 32767, -32768, 32767).astype(np.int16)
+    
+    # The last syllable gap and word gap are silence
+    speech_end = lead + speech_length - gap
+    return samples, lead, speech_end
+
+
+class _ArraySource(sr.AudioSource):
+    """speech_recognition audio source that plays back an array"""
+    
+    def __init__(self, samples: np.ndarray):
+        self.data = samples.tobytes()
+        self.position = 0
+        self.SAMPLE_RATE = SAMPLE_RATE
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = CHUNK
+        self.stream = self
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        pass
+    
+    def read(self, size: int) -> bytes:
+        chunk = self.data[self.position:self.position + size * 2]
+        self.position += len(chunk)
+        return chunk
+
+
+def baseline(samples: np.ndarray, noise: np.ndarray):
+    """Energy-threshold endpointing; returns (end of listening s, audio sent s)"""
+    recognizer = sr.Recognizer()
+    recognizer.adjust_for_ambient_noise(_ArraySource(noise), duration=1)
+    source = _ArraySource(samples)
+    audio = recognizer.listen(source, timeout=5, phrase_time_limit=PHRASE_LIMIT)
+    return source.position / 2 / SAMPLE_RATE, len(audio.frame_data) / 2 / SAMPLE_RATE
+
+
+def with_vad(samples: np.ndarray, noise: np.ndarray, frame_times: list):
+    """VAD endpointing; returns (end of listening s, audio sent s, speech start, speech end)"""
+    vad = VoiceActivityDetector(SAMPLE_RATE, frame_ms=20, energy_margin_db=9.0, spectral=False)
+    vad.calibrate(noise)
+    endpointer = Endpointer(vad, min_speech_ms=90, hangover_ms=400, padding_ms=150)
+    
+    consumed = 0
+    while not endpointer.ended and consumed < len(samples):
+        chunk = samples[consumed:consumed + CHUNK]
+        start = time.perf_counter()
+        endpointer.feed(chunk)
+        frame_times.append((time.perf_counter() - start) * 1e6)
+        consumed += len(chunk)
+        if endpointer.speech_start is not None and \
+                consumed / SAMPLE_RATE - endpointer.speech_start >= PHRASE_LIMIT:
+            endpointer.finish()
+    
+    start, end = endpointer.bounds(consumed)
+    return consumed / SAMPLE_RATE, (end - start) / SAMPLE_RATE, endpointer.speech_start, endpointer.speech_end
+
+
+def run_benchmark(utterances: int = 40, seed: int = 7):
+    """Run the benchmark and print a report"""
+    rng = np.random.default_rng(seed)
+    frame_times = []
+    
+    for name, noise_db, varying in (('Quiet room', -60, False), ('Noisy room', -40, False),
+                                    ('Fluctuating noise', -40, True)):
+        results = {'baseline': [], 'vad': []}
+        boundary_errors = []
+        
+        for _ in range(utterances):
+            samples, speech_start, speech_end = synthetic_utterance(rng, noise_db, varying)
+            noise = samples[:int(0.5 * SAMPLE_RATE)]
+            true_length = speech_end - speech_start
+            
+            end, sent = baseline(samples, noise)
+            results['baseline'].append((end - speech_end, sent, sent - true_length))
+            
+            end, sent, start, stop = with_vad(samples, noise, frame_times)
+            results['vad'].append((end - speech_end, sent, sent - true_length))
+            if start is not None:
+                boundary_errors.append((abs(start - speech_start) + abs(stop - speech_end)) / 2)
+        
+        print(f"\n=== {name} (noise {noise_db} dBFS{', +/-6 dB' if varying else ''}) ===")
+        print(f"{'':10} {'endpoint latency p50/p90':>26} {'audio sent':>12} {'extra audio':>12} "
+              f"{'hit limit':>10}")
+        for method, rows in results.items():
+            latency = np.array([row[0] for row in rows]) * 1000
+            sent = np.mean([row[1] for row in rows])
+            extra = np.mean([row[2] for row in rows])
+            at_limit = sum(row[0] > PHRASE_LIMIT - 3 for row in rows)
+            print(f"{method:10} {np.percentile(latency, 50):>12.0f} / {np.percentile(latency, 90):>6.0f} ms "
+                  f"{sent:>10.2f} s {extra:>10.2f} s {at_limit:>10}")
+        
+        base_sent = np.mean([row[1] for row in results['baseline']])
+        vad_sent = np.mean([row[1] for row in results['vad']])
+        print(f"Payload reduction:  {1 - vad_sent / base_sent:.0%}")
+        if boundary_errors:
+            print(f"VAD boundary error: {np.mean(boundary_errors) * 1000:.0f} ms (mean of start/end)")
+    
+    frame_times = np.array(frame_times)
+    print(f"\nVAD cost per {CHUNK}-sample chunk: p50 {np.percentile(frame_times, 50):.1f} us, "
+          f"p99 {np.percentile(frame_times, 99):.1f} us")
+
+
+if __name__ == "__main__":
+    run_benchmark()
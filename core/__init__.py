@@ -1,16 +1,35 @@
 """
 Core package for Jarvis V2
+
+Submodules are imported on first access, so the thin IPC client can be
+imported without loading the assistant itself.
 """
 
-from .jarvis import Jarvis, get_jarvis
-from .command_processor import CommandProcessor
-from .intent_recognizer import IntentRecognizer
-from .validator import Validator
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .jarvis import Jarvis, get_jarvis
+    from .command_processor import CommandProcessor
+    from .intent_recognizer import IntentRecognizer
+    from .validator import Validator
+
+# Exported name -> submodule defining it
+_EXPORTS = {
+    'Jarvis': '.jarvis',
+    'get_jarvis': '.jarvis',
+    'CommandProcessor': '.command_processor',
+    'IntentRecognizer': '.intent_recognizer',
+    'Validator': '.validator'
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'Jarvis',
-    'get_jarvis',
-    'CommandProcessor',
-    'IntentRecognizer',
-    'Validator'
-]
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,402 @@
+"""
+API Server for Jarvis V2
+Local HTTP API and WebSocket event stream for automation clients
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import socket
+import struct
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread, Event, Lock
+from typing import Callable, Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit, parse_qs
+from utils.logger import get_logger
+from utils.config_manager import get_config
+from core.scheduler import PRIORITY_NAMES
+
+logger = get_logger()
+config = get_config()
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+# Host names that always reach this machine; anything else may be DNS rebinding
+LOOPBACK_HOSTS = {'localhost', '127.0.0.1', '::1'}
+
+# Largest command request body accepted, in bytes
+MAX_BODY = 64 * 1024
+
+# WebSocket opcodes
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+def _encode_frame(payload: bytes, opcode: int = OP_TEXT) -> bytes:
+    """Encode a single unmasked server-to-client WebSocket frame"""
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 1 << 16:
+        header += bytes([126]) + struct.pack('!H', length)
+    else:
+        header += bytes([127]) + struct.pack('!Q', length)
+    return header + payload
+
+
+def _read_frame(read: Callable[[int], bytes], max_size: int = 1 << 16) -> Tuple[int, bytes]:
+    """Read a client WebSocket frame with read(n); returns (opcode, payload)"""
+    head = read(2)
+    opcode = head[0] & 0x0F
+    masked = head[1] & 0x80
+    length = head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack('!H', read(2))[0]
+    elif length == 127:
+        length = struct.unpack('!Q', read(8))[0]
+    if length > max_size:
+        raise ConnectionError("frame too large")
+    
+    mask = read(4) if masked else b'\0\0\0\0'
+    payload = read(length) if length else b''
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+class _ApiRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for the API server
+    
+    Speaks HTTP/1.1, so clients can keep a connection open across requests.
+    Commands must be posted as JSON: browsers cannot send that cross-origin
+    without a CORS preflight, which this server never approves. Requests
+    naming another host (a web page that rebound its domain to 127.0.0.1)
+    or coming from another origin are refused whether or not a token is
+    configured.
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    server_version = 'JarvisAPI/2.0'
+    
+    # Idle keep-alive connections are closed after this many seconds
+    timeout = 300
+    
+    # Headers and body go out as separate writes; don't let them wait on delayed ACKs
+    disable_nagle_algorithm = True
+    
+    @property
+    def api(self) -> 'ApiServer':
+        return self.server.api
+    
+    def log_message(self, format, *args):
+        logger.debug(f"API {self.address_string()} - {format % args}")
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if not self._trusted() or not self._authorized(url):
+            return
+        
+        if url.path == '/status':
+            self._send_json(200, self.api.get_status())
+        elif url.path == '/events':
+            self._stream_events(url)
+        else:
+            self._send_json(404, {'success': False, 'response': 'Not found'})
+    
+    def do_POST(self):
+        url = urlsplit(self.path)
+        
+        # Refused requests are answered without reading their body, so the
+        # connection can't be reused for another request
+        close_connection, self.close_connection = self.close_connection, True
+        if not self._trusted() or not self._authorized(url):
+            return
+        if url.path != '/commands':
+            self._send_json(404, {'success': False, 'response': 'Not found'})
+            return
+        if self.headers.get_content_type() != 'application/json':
+            self._send_json(415, {'success': False, 'response': 'Expected application/json'})
+            return
+        
+        length = self.headers.get('Content-Length', '0').strip()
+        if not (length.isascii() and length.isdigit()):
+            self._send_json(400, {'success': False, 'response': 'Invalid Content-Length'})
+            return
+        if int(length) > MAX_BODY:
+            self._send_json(413, {'success': False, 'response': f"Request body over {MAX_BODY} bytes"})
+            return
+        body = self.rfile.read(int(length))
+        self.close_connection = close_connection
+        
+        try:
+            request = json.loads(body)
+            command = request['command']
+            if not isinstance(command, str) or not command.strip():
+                raise ValueError('command must be a non-empty string')
+            
+            priority = request.get('priority')
+            # bool and float compare equal to ints, and would pass the range check
+            if priority is not None and (type(priority) is not int or
+                                         priority not in range(len(PRIORITY_NAMES))):
+                raise ValueError(f"priority must be 0 ({PRIORITY_NAMES[0]}) "
+                                 f"to {len(PRIORITY_NAMES) - 1} ({PRIORITY_NAMES[-1]})")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {'success': False, 'response': f"Invalid request: {e}"})
+            return
+        
+        result = self.api.jarvis.process_command(
+            command,
+            speak_response=bool(request.get('speak')),
+            source='api',
+            priority=priority
+        )
+        self._send_json(200, result)
+    
+    def _trusted(self) -> bool:
+        """Check that the request names this server and comes from an allowed origin"""
+        host = urlsplit(f"//{self.headers.get('Host', '')}").hostname
+        if host not in self.api.allowed_hosts:
+            self._send_json(403, {'success': False, 'response': 'Host not allowed'})
+            return False
+        
+        # Browsers send Origin on cross-origin requests and WebSocket handshakes
+        origin = self.headers.get('Origin')
+        if origin and origin not in self.api.allowed_origins and \
+                urlsplit(origin).netloc != self.headers.get('Host'):
+            self._send_json(403, {'success': False, 'response': 'Origin not allowed'})
+            return False
+        return True
+    
+    def _authorized(self, url) -> bool:
+        """Check the API token, if one is configured"""
+        token = self.api.token
+        if not token:
+            return True
+        
+        supplied = self.headers.get('Authorization', '')
+        supplied = supplied[7:] if supplied.startswith('Bearer ') else \
+            parse_qs(url.query).get('token', [''])[0]
+        if hmac.compare_digest(supplied.encode(), token.encode()):
+            return True
+        
+        self._send_json(401, {'success': False, 'response': 'Unauthorized'})
+        return False
+    
+    def _send_json(self, status: int, data: Dict):
+        body = json.dumps(data, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _stream_events(self, url):
+        """Upgrade to a WebSocket and send events until the client goes away"""
+        key = self.headers.get('Sec-WebSocket-Key')
+        if self.headers.get('Upgrade', '').lower() != 'websocket' or not key:
+            self._send_json(426, {'success': False, 'response': 'WebSocket upgrade required'})
+            return
+        
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        self.send_response(101)
+        self.send_header('Upgrade', 'websocket')
+        self.send_header('Connection', 'Upgrade')
+        self.send_header('Sec-WebSocket-Accept', accept)
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+        
+        # Clients wait for the handshake before sending frames, so nothing is
+        # left in rfile and the stream can read the socket directly
+        types = parse_qs(url.query).get('types', [''])[0]
+        self.api.stream_events(self.connection, '%s:%d' % self.client_address[:2],
+                               set(filter(None, types.split(','))))
+
+
+class ApiServer:
+    """
+    Optional local HTTP API for automation clients
+    
+    POST /commands  {"command": "...", "speak": false, "priority": 2}
+    GET  /status    readiness and statistics
+    GET  /events    WebSocket stream of Jarvis events (see core.events) and
+                    metrics events; ?types=response,metrics narrows it down
+    
+    Every WebSocket client reads from its own bounded subscription to the
+    Jarvis event bus. A client that cannot keep up loses its oldest
+    events (and is told how many) instead of holding up the command path;
+    one that stops reading entirely is disconnected after send_timeout.
+    """
+    
+    def __init__(self, jarvis, host: Optional[str] = None, port: Optional[int] = None):
+        self.jarvis = jarvis
+        self.host = host or config.get('api.host', '127.0.0.1')
+        self.port = port if port is not None else config.get('api.port', 8765)
+        self.token = config.get('api.token', '')
+        self.allowed_origins = set(config.get('api.allowed_origins', []))
+        self.allowed_hosts = LOOPBACK_HOSTS | set(config.get('api.allowed_hosts', []))
+        if self.host not in ('', '0.0.0.0', '::'):
+            self.allowed_hosts.add(self.host)
+        self.metrics_interval = config.get('api.metrics_interval', 5)
+        self.send_timeout = config.get('api.send_timeout', 10)
+        self.ping_interval = 20
+        
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._threads = []
+        self._stop_event = Event()
+        self._subscriptions: Set = set()
+        
+        # Statistics
+        self.websocket_clients = 0
+    
+    @property
+    def is_running(self) -> bool:
+        return self._server is not None
+    
+    def start(self) -> bool:
+        """Start serving; returns False if the port could not be opened"""
+        if self.is_running:
+            return True
+        
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), _ApiRequestHandler)
+        except OSError as e:
+            logger.error(f"Could not start API server on {self.host}:{self.port}: {e}")
+            return False
+        
+        self._server.daemon_threads = True
+        self._server.api = self
+        self.port = self._server.server_address[1]
+        self._stop_event.clear()
+        
+        self._threads = [
+            Thread(target=self._server.serve_forever, name='api-server', daemon=True),
+            Thread(target=self._publish_metrics, name='api-metrics', daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        
+        logger.info(f"API server listening on http://{self.host}:{self.port}")
+        return True
+    
+    def stop(self):
+        """Stop serving and disconnect event streams"""
+        if not self.is_running:
+            return
+        
+        self._stop_event.set()
+        for subscription in list(self._subscriptions):
+            subscription.close()
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        
+        for thread in self._threads:
+            thread.join(timeout=2)
+        logger.info("API server stopped")
+    
+    def get_status(self) -> Dict:
+        """Readiness and statistics for GET /status and metrics events"""
+        return {
+            'running': self.jarvis.is_running,
+            'readiness': self.jarvis.get_readiness(),
+            'scheduler': self.jarvis.scheduler.get_stats(),
+            'events': self.jarvis.events.get_stats(),
+            'speech': self.jarvis.text_to_speech.get_stats()
+            if self.jarvis.is_ready('text_to_speech') else None,
+            'recognition': self.jarvis.speech_recognizer.get_stats()
+            if self.jarvis.is_ready('speech_recognition') else None,
+            'websocket_clients': self.websocket_clients
+        }
+    
+    def stream_events(self, connection: socket.socket, client: str, types: Set[str]):
+        """Send events to an upgraded WebSocket connection until it closes"""
+        subscription = self.jarvis.events.subscribe(
+            f"websocket {client}", types or None,
+            max_queue=config.get('api.subscriber_queue_size', 256)
+        )
+        self._subscriptions.add(subscription)
+        closed = Event()
+        reported_drops = 0
+        
+        # The reader thread answers pings too; whole frames must not interleave
+        send_lock = Lock()
+        
+        def send(frame: bytes):
+            with send_lock:
+                connection.sendall(frame)
+        
+        # Bounds how long a client that stopped reading can block its sender
+        connection.settimeout(self.send_timeout)
+        reader = Thread(target=self._read_client, args=(connection, send, closed, subscription),
+                        name='api-websocket-reader', daemon=True)
+        reader.start()
+        self.websocket_clients += 1
+        
+        try:
+            while not closed.is_set() and not subscription.closed:
+                event = subscription.get(timeout=self.ping_interval)
+                
+                if subscription.dropped > reported_drops:
+                    lost = subscription.dropped - reported_drops
+                    reported_drops = subscription.dropped
+                    send(self._encode_event({'type': 'events_dropped', 'count': lost}))
+                
+                if event is None:
+                    send(_encode_frame(b'', OP_PING))
+                else:
+                    send(self._encode_event(event))
+        except OSError as e:
+            logger.debug(f"Event stream to {client} ended: {e}")
+        finally:
+            self.websocket_clients -= 1
+            self._subscriptions.discard(subscription)
+            subscription.close()
+            closed.set()
+            try:
+                send(_encode_frame(b'', OP_CLOSE))
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _encode_event(event: Dict) -> bytes:
+        return _encode_frame(json.dumps(event, default=str).encode('utf-8'))
+    
+    def _read_client(self, connection: socket.socket, send: Callable[[bytes], None],
+                     closed: Event, subscription):
+        """Answer pings and notice when the client closes the stream"""
+        def read(size: int) -> bytes:
+            data = b''
+            while len(data) < size:
+                try:
+                    chunk = connection.recv(size - len(data))
+                except socket.timeout:
+                    if closed.is_set():
+                        raise
+                    continue
+                if not chunk:
+                    raise ConnectionError("connection closed")
+                data += chunk
+            return data
+        
+        try:
+            while not closed.is_set():
+                opcode, payload = _read_frame(read)
+                if opcode == OP_CLOSE:
+                    break
+                if opcode == OP_PING:
+                    send(_encode_frame(payload, OP_PONG))
+        except (OSError, struct.error):
+            pass
+        finally:
+            closed.set()
+            subscription.close()
+    
+    def _publish_metrics(self):
+        """Publish metrics events while anyone is watching"""
+        while not self._stop_event.wait(self.metrics_interval):
+            if self.jarvis.events.subscriber_count:
+                self.jarvis.events.publish('metrics', **self.get_status())
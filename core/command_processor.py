@@ -3,52 +3,214 @@ Command Processor for Jarvis V2
 Processes commands and routes them to appropriate modules
 """
 
-from typing import Dict, Any, Optional
+import importlib
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 from utils.logger import get_logger
+from utils.config_manager import get_config
+from utils.helpers import normalize_app_name
+from utils.cancellation import CancellationToken, OperationCancelled
 from core.intent_recognizer import IntentRecognizer
+from core.fallback_classifier import FallbackClassifier
+from core.spell_corrector import SpellCorrector
 from core.validator import Validator
+from core.events import EventBus, INTENT_RECOGNIZED, EXECUTION_STARTED, EXECUTION_FINISHED
 from personality.response_generator import ResponseGenerator
-from modules import (
-    ApplicationManager,
-    ScreenshotManager,
-    SystemController,
-    FileManager,
-    WindowManager
-)
 from datetime import datetime
 
+# asyncio and the async adapter are only imported by the async API, whose
+# callers already run an event loop
+if TYPE_CHECKING:
+    from modules.async_adapter import AsyncModule
+
 logger = get_logger()
+config = get_config()
+
+
+class _LazyModule:
+    """
+    Desktop control module that is imported and built on first access
+    
+    The built module is stored on the processor instance, which shadows this
+    descriptor, so later accesses are plain attribute lookups.
+    """
+    
+    def __init__(self, module: str, class_name: str):
+        self.module = module
+        self.class_name = class_name
+        self.name = None
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, processor, owner=None):
+        if processor is None:
+            return self
+        
+        with processor._module_locks[self.name]:
+            instance = processor.__dict__.get(self.name)
+            if instance is None:
+                start = time.perf_counter()
+                module_class = getattr(importlib.import_module(self.module), self.class_name)
+                instance = module_class()
+                elapsed = time.perf_counter() - start
+                
+                processor.module_startup_times[self.name] = elapsed
+                processor.__dict__[self.name] = instance
+                logger.info(f"{self.class_name} loaded in {elapsed * 1000:.1f} ms")
+        
+        return instance
 
 
 class CommandProcessor:
     """Processes and executes commands"""
     
-    def __init__(self):
+    # Desktop control modules, built by the first command that needs them
+    app_manager = _LazyModule('modules.application_manager', 'ApplicationManager')
+    screenshot_manager = _LazyModule('modules.screenshot_manager', 'ScreenshotManager')
+    system_controller = _LazyModule('modules.system_controller', 'SystemController')
+    file_manager = _LazyModule('modules.file_manager', 'FileManager')
+    window_manager = _LazyModule('modules.window_manager', 'WindowManager')
+    
+    # Module attributes that can be wrapped with get_async_module
+    MODULE_NAMES = ('app_manager', 'screenshot_manager', 'system_controller',
+                    'file_manager', 'window_manager')
+    
+    # Separators between sequenced sub-commands ("..., then ...", "... and then ...")
+    SEQUENCE_SEPARATOR = re.compile(r'\s*[,;]?\s*\b(?:and\s+then|then|after\s+that)\b\s*|\s*;\s*', re.I)
+    
+    # Separators between independent sub-commands ("... and ...", "..., ...")
+    PARALLEL_SEPARATOR = re.compile(r'\s*,\s*(?:and\s+)?|\s+and\s+', re.I)
+    
+    # Intents whose handlers take a cancellation token after their parameters
+    CANCELLABLE_INTENTS = frozenset({'screenshot', 'find_files', 'copy_file'})
+    
+    def __init__(self, events: Optional[EventBus] = None):
+        self.events = events
         self.intent_recognizer = IntentRecognizer()
+        self.fallback_classifier = FallbackClassifier()
+        
+        # Spelling correction against intent words and known app names
+        if config.get('advanced.spell_correction', True):
+            self.spell_corrector = SpellCorrector()
+            self.spell_corrector.set_terms('apps', config.get('applications.common_apps', {}).keys())
+        else:
+            self.spell_corrector = None
+        self._vocabulary_version = None
         self.validator = Validator()
         self.response_generator = ResponseGenerator()
         
-        # Initialize modules
-        self.app_manager = ApplicationManager()
-        self.screenshot_manager = ScreenshotManager()
-        self.system_controller = SystemController()
-        self.file_manager = FileManager()
-        self.window_manager = WindowManager()
+        # Deadline for a command unless the caller brings its own token
+        self.command_timeout = config.get('advanced.command_timeout', 60)
+        
+        # Independent sub-commands of compound commands run concurrently
+        self.split_compound = config.get('advanced.split_compound_commands', True)
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.get('advanced.max_parallel_commands', 4),
+            thread_name_prefix='command'
+        )
+        
+        # Speculative preparations queue on their own thread, apart from real commands
+        self._prepare_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prepare')
+        
+        # Modules are built on first use; import and setup time is recorded per module
+        self._module_locks = {name: Lock() for name in self.MODULE_NAMES}
+        self.module_startup_times: Dict[str, float] = {}
         
         logger.info("Command processor initialized")
     
-    def process(self, command: str) -> Dict[str, Any]:
+    def process(self, command: str, token: Optional[CancellationToken] = None) -> Dict[str, Any]:
         """
         Process a command and return response
         
+        Long operations stop once the token is cancelled or its deadline
+        passes (a token with the default command_timeout is made if none is
+        given) and return what they have so far.
+        
         Returns dict with:
         - success: bool
         - response: str (message to user)
         - data: any (additional data)
         - requires_confirmation: bool
+        - cancelled: bool (only when the command was stopped)
+        """
+        logger.command(command)
+        token = token or CancellationToken(self.command_timeout)
+        
+        # Correct misheard words before matching
+        command = self.correct_spelling(command)
+        
+        # Split compound commands ("open chrome and spotify, then take a screenshot")
+        if self.split_compound:
+            stages = self._split_compound(command)
+            if stages:
+                return self._process_compound(stages, token)
+        
+        return self._process_single(command, token)
+    
+    def analyze(self, command: str) -> List[Dict]:
+        """Recognize each sub-command of a command without executing anything"""
+        command = self.correct_spelling(command)
+        
+        stages = self._split_compound(command) if self.split_compound else None
+        parts = [part for stage in stages for part in stage] if stages else [command]
+        
+        return [self.intent_recognizer.recognize(part) for part in parts]
+    
+    async def process_command_async(self, command: str,
+                                    token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """
+        Process a command without blocking the event loop
+        
+        Recognition, validation and execution run on the command executor, so
+        any number of commands can be awaited concurrently on one loop.
+        Returns the same dict as process().
         """
         logger.command(command)
+        token = token or CancellationToken(self.command_timeout)
         
+        command = self.correct_spelling(command)
+        
+        if self.split_compound:
+            stages = self._split_compound(command)
+            if stages:
+                return await self._process_compound_async(stages, token)
+        
+        return await self._run_blocking(self._process_single, command, token)
+    
+    def get_async_module(self, name: str) -> 'AsyncModule':
+        """
+        Get an awaitable view of a module (e.g. 'app_manager', 'file_manager')
+        Its methods run on the command executor.
+        """
+        if name not in self.MODULE_NAMES:
+            raise ValueError(f"Unknown module: {name}")
+        
+        from modules.async_adapter import AsyncModule
+        return AsyncModule(getattr(self, name), self._executor)
+    
+    def get_module_stats(self) -> Dict[str, Dict]:
+        """Get which modules have been loaded and what their startup cost"""
+        return {
+            name: {
+                'loaded': name in self.__dict__,
+                'startup_ms': round(self.module_startup_times[name] * 1000, 1)
+                if name in self.module_startup_times else None
+            }
+            for name in self.MODULE_NAMES
+        }
+    
+    async def _run_blocking(self, function, *args):
+        """Run a blocking call on the command executor"""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+    
+    def _process_single(self, command: str, token: CancellationToken) -> Dict[str, Any]:
+        """Recognize, validate and execute a single command"""
         # Recognize intent
         intent_result = self.intent_recognizer.recognize(command)
         intent = intent_result['intent']
@@ -57,20 +219,38 @@ class CommandProcessor:
         
         logger.debug(f"Intent: {intent}, Confidence: {confidence:.2f}, Params: {parameters}")
         
-        # Handle unknown intent
+        # Fall back to the n-gram classifier when no pattern is confident
         if intent == 'unknown' or confidence < 0.3:
-            response = self.response_generator.generate('unknown')
-            return {
-                'success': False,
-                'response': response,
-                'intent': 'unknown'
-            }
+            intent_result = self.fallback_classifier.classify(command)
+            
+            # Handle unknown intent
+            if not intent_result:
+                self._publish(INTENT_RECOGNIZED, command=command, intent='unknown',
+                              confidence=confidence, parameters={}, source='none')
+                response = self.response_generator.generate('unknown')
+                return {
+                    'success': False,
+                    'response': response,
+                    'intent': 'unknown'
+                }
+            
+            intent = intent_result['intent']
+            confidence = intent_result['confidence']
+            parameters = intent_result['parameters']
+            logger.debug(f"Fallback intent: {intent}, Confidence: {confidence:.2f}")
+        
+        self._publish(INTENT_RECOGNIZED, command=command, intent=intent, confidence=confidence,
+                      parameters=parameters, source=intent_result.get('source', 'patterns'))
         
         # Validate command
         is_valid, error, warning = self.validator.validate(intent, parameters)
         
         if not is_valid:
-            response = self.response_generator.generate('error', intent=intent, error=error)
+            if intent_result.get('source') == 'fallback':
+                # The fallback knows the intent but could not find its parameters - ask for them
+                response = self.response_generator.generate('clarification', intent=intent)
+            else:
+                response = self.response_generator.generate('error', intent=intent, error=error)
             return {
                 'success': False,
                 'response': response,
@@ -91,10 +271,248 @@ class CommandProcessor:
             }
         
         # Execute command
-        return self._execute_command(intent, parameters)
+        self._publish(EXECUTION_STARTED, command=command, intent=intent)
+        start = time.perf_counter()
+        result = self._execute_command(intent, parameters, token)
+        self._publish(EXECUTION_FINISHED, command=command, intent=intent,
+                      success=result.get('success', False),
+                      duration_ms=round((time.perf_counter() - start) * 1000, 1))
+        return result
+    
+    def _publish(self, event_type: str, **data):
+        """Publish an event if the processor is attached to an event bus"""
+        if self.events is not None:
+            self.events.publish(event_type, **data)
+    
+    def _split_compound(self, command: str) -> Optional[List[List[str]]]:
+        """
+        Split a compound command into ordered stages of sub-commands
+        
+        Sub-commands within a stage are independent; stages are sequenced by
+        "then". A bare target ("spotify" in "open chrome and spotify") reuses
+        the verb of the sub-command before it. Returns None unless there are
+        several sub-commands and every one matches an intent, so targets that
+        merely contain "and" are left whole.
+        """
+        stages = []
+        for stage_text in self.SEQUENCE_SEPARATOR.split(command):
+            parts = [part.strip(' ,.') for part in self.PARALLEL_SEPARATOR.split(stage_text)]
+            parts = [part for part in parts if part]
+            if parts:
+                stages.append(parts)
+        
+        if sum(len(stage) for stage in stages) < 2:
+            return None
+        
+        verb = None
+        for stage in stages:
+            for i, part in enumerate(stage):
+                resolved = self._resolve_sub_command(part, verb)
+                if resolved is None:
+                    return None
+                stage[i], verb = resolved
+        
+        return stages
+    
+    def _resolve_sub_command(self, part: str, verb: Optional[str]) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Resolve one part of a compound command
+        Returns the sub-command and the verb a following bare target may reuse,
+        or None if the part matches no intent
+        """
+        result = self.intent_recognizer.recognize(part)
+        
+        if result['intent'] == 'unknown' or result['confidence'] < 0.3:
+            if not verb:
+                return None
+            part = f"{verb} {part}"
+            result = self.intent_recognizer.recognize(part)
+            if result['intent'] == 'unknown' or result['confidence'] < 0.3:
+                return None
+        
+        # Everything before the target is the verb ("open", "i need", "close")
+        target = result['parameters'].get('target')
+        position = part.lower().rfind(target.lower()) if target else -1
+        verb = part[:position].strip() if position > 0 else None
+        
+        return part, verb
+    
+    def _process_compound(self, stages: List[List[str]], token: CancellationToken) -> Dict[str, Any]:
+        """
+        Process the stages of a compound command
+        Sub-commands within a stage run concurrently; a stage only runs once
+        every sub-command of the previous stage has succeeded.
+        """
+        logger.info("Compound command: " + " | then | ".join(" + ".join(stage) for stage in stages))
+        
+        results = []
+        skipped = []
+        for index, stage in enumerate(stages):
+            if len(stage) == 1:
+                stage_results = [self._process_single(stage[0], token)]
+            else:
+                stage_results = list(self._executor.map(
+                    lambda command: self._process_single(command, token), stage
+                ))
+            results.extend(stage_results)
+            
+            if not all(result.get('success') for result in stage_results):
+                skipped = self._skipped_after(stages, index)
+                break
+        
+        return self._aggregate_compound(results, skipped)
+    
+    async def _process_compound_async(self, stages: List[List[str]],
+                                      token: CancellationToken) -> Dict[str, Any]:
+        """Process the stages of a compound command on the event loop"""
+        logger.info("Compound command: " + " | then | ".join(" + ".join(stage) for stage in stages))
+        
+        import asyncio
+        
+        results = []
+        skipped = []
+        for index, stage in enumerate(stages):
+            stage_results = await asyncio.gather(
+                *(self._run_blocking(self._process_single, command, token) for command in stage)
+            )
+            results.extend(stage_results)
+            
+            if not all(result.get('success') for result in stage_results):
+                skipped = self._skipped_after(stages, index)
+                break
+        
+        return self._aggregate_compound(results, skipped)
+    
+    @staticmethod
+    def _skipped_after(stages: List[List[str]], index: int) -> List[str]:
+        """Get the sub-commands sequenced after a failed stage"""
+        skipped = [command for later in stages[index + 1:] for command in later]
+        if skipped:
+            logger.info(f"Skipping sequenced commands after failure: {skipped}")
+        return skipped
+    
+    @staticmethod
+    def _aggregate_compound(results: List[Dict], skipped: List[str]) -> Dict[str, Any]:
+        """Combine sub-command results into one result"""
+        return {
+            'success': not skipped and all(result.get('success') for result in results),
+            'response': ' '.join(result.get('response', '') for result in results),
+            'intent': 'compound',
+            'results': results,
+            'skipped': skipped
+        }
+    
+    def correct_spelling(self, command: str) -> str:
+        """
+        Correct misheard words in a command
+        
+        Only the words that select an intent are corrected. Each sub-command
+        that already matches an intent is left as it is; one that only
+        matches once corrected keeps the original spelling and case inside
+        its parameters (app, file and folder names, search queries).
+        """
+        if not self.spell_corrector:
+            return command
+        
+        self._refresh_vocabulary()
+        pieces = re.split(f"({self.SEQUENCE_SEPARATOR.pattern}|{self.PARALLEL_SEPARATOR.pattern})",
+                          command, flags=re.I)
+        # Odd pieces are the separators, kept as they were
+        corrected = ''.join(piece if i % 2 else self._correct_part(piece)
+                            for i, piece in enumerate(pieces))
+        
+        if corrected != command:
+            logger.debug(f"Corrected command: '{command}' -> '{corrected}'")
+        return corrected
     
-    def _execute_command(self, intent: str, parameters: Dict) -> Dict[str, Any]:
-        """Execute a command based on intent"""
+    def _correct_part(self, part: str) -> str:
+        """Correct one sub-command, leaving its parameter words alone"""
+        if not part.strip() or self._matches_intent(self.intent_recognizer.recognize(part)):
+            return part
+        
+        pieces = self.spell_corrector.correct_pieces(part)
+        if all(original == corrected for original, corrected in pieces):
+            return part
+        
+        text = ' '.join(corrected for _, corrected in pieces)
+        result = self.intent_recognizer.recognize(text)
+        if not self._matches_intent(result):
+            return part
+        
+        # Where each parameter lies in the corrected text
+        lowered = text.lower()
+        spans = []
+        for name in ('target', 'name', 'query'):
+            value = result['parameters'].get(name)
+            position = lowered.find(value.lower()) if value else -1
+            if position >= 0:
+                spans.append((position, position + len(value)))
+        
+        words = []
+        offset = 0
+        for original, corrected in pieces:
+            end = offset + len(corrected)
+            inside = any(start < end and offset < stop for start, stop in spans)
+            words.append(original if inside else corrected)
+            offset = end + 1
+        
+        leading = part[:len(part) - len(part.lstrip())]
+        trailing = part[len(part.rstrip()):]
+        return leading + ' '.join(words) + trailing
+    
+    @staticmethod
+    def _matches_intent(result: Dict) -> bool:
+        return result['intent'] != 'unknown' and result['confidence'] >= 0.3
+    
+    def _refresh_vocabulary(self):
+        """Refresh the intent vocabulary if the patterns changed"""
+        version = self.intent_recognizer.pattern_version
+        if version != self._vocabulary_version:
+            self._vocabulary_version = version
+            self.spell_corrector.set_terms('intents', self.intent_recognizer.get_vocabulary())
+    
+    def can_prepare(self, intent: str) -> bool:
+        """Check whether an intent has work that can be done ahead of time"""
+        return hasattr(self, f'_prepare_{intent}')
+    
+    def prepare_async(self, intent: str, parameters: Dict) -> Future:
+        """Prepare a likely command in the background"""
+        return self._prepare_executor.submit(self.prepare, intent, parameters)
+    
+    def prepare(self, intent: str, parameters: Dict) -> bool:
+        """
+        Warm up a likely command before it is confirmed
+        Preparation has no visible effect; the command still has to be processed
+        """
+        preparer = getattr(self, f'_prepare_{intent}', None)
+        if not preparer:
+            return False
+        
+        try:
+            preparer(parameters)
+            return True
+        except Exception as e:
+            logger.debug(f"Could not prepare {intent}: {e}")
+            return False
+    
+    def _prepare_launch_app(self, params: Dict):
+        if params.get('target'):
+            self.app_manager.prepare_launch(params['target'])
+    
+    def _prepare_close_app(self, params: Dict):
+        target = params.get('target', '')
+        if target and 'all' not in target.lower():
+            self.app_manager.prepare_close(target)
+    
+    def _prepare_screenshot(self, params: Dict):
+        self.screenshot_manager.prepare_capture()
+    
+    def _execute_command(self, intent: str, parameters: Dict, token: CancellationToken) -> Dict[str, Any]:
+        """
+        Execute a command based on intent
+        Handlers are called as _execute_<intent>(params), or as
+        _execute_<intent>(params, token) for intents in CANCELLABLE_INTENTS.
+        """
         
         # Get execution method
         executor = getattr(self, f'_execute_{intent}', None)
@@ -103,9 +521,15 @@ class CommandProcessor:
             # Try generic execution
             return self._execute_generic(intent, parameters)
         
+        if token.cancelled:
+            return self._cancelled_result(intent, token.reason)
+        
         try:
-            result = executor(parameters)
-            return result
+            if intent in self.CANCELLABLE_INTENTS:
+                return executor(parameters, token)
+            return executor(parameters)
+        except OperationCancelled as e:
+            return self._cancelled_result(intent, e.reason)
         except Exception as e:
             logger.error(f"Error executing command {intent}: {e}")
             response = self.response_generator.generate('error', 
@@ -117,6 +541,17 @@ class CommandProcessor:
                 'intent': intent
             }
     
+    def _cancelled_result(self, intent: str, reason: str) -> Dict[str, Any]:
+        """Result for a command stopped before it finished"""
+        logger.info(f"Command {intent} stopped: {reason}")
+        return {
+            'success': False,
+            'cancelled': True,
+            'reason': reason,
+            'response': self.response_generator.generate('cancelled', reason=reason),
+            'intent': intent
+        }
+    
     # Application Control
     def _execute_launch_app(self, params: Dict) -> Dict:
         target = params.get('target', '')
@@ -200,6 +635,11 @@ class CommandProcessor:
     def _execute_list_apps(self, params: Dict) -> Dict:
         result = self.app_manager.list_running()
         
+        if result['success'] and self.spell_corrector:
+            # Running apps teach the corrector names it has not seen
+            names = [normalize_app_name(app['name']) for app in result['apps']]
+            self.spell_corrector.add_terms('discovered', (word for name in names for word in name.split()))
+        
         if result['success']:
             apps = result['apps'][:10]  # Top 10
             app_list = '\n'.join([f"- {app['name']} ({app['memory_mb']} MB)" 
@@ -225,8 +665,15 @@ class CommandProcessor:
         }
     
     # Screenshot Operations
-    def _execute_screenshot(self, params: Dict) -> Dict:
-        result = self.screenshot_manager.capture_full_screen()
+    def _execute_screenshot(self, params: Dict, token: CancellationToken) -> Dict:
+        delay = params.get('value')
+        if delay:
+            result = self.screenshot_manager.capture_with_delay(delay, token=token)
+        else:
+            result = self.screenshot_manager.capture_full_screen()
+        
+        if result.get('cancelled'):
+            return self._cancelled_result('screenshot', token.reason)
         
         if result['success']:
             response = self.response_generator.generate(
@@ -423,9 +870,9 @@ class CommandProcessor:
             'intent': 'open_file'
         }
     
-    def _execute_find_files(self, params: Dict) -> Dict:
+    def _execute_find_files(self, params: Dict, token: CancellationToken) -> Dict:
         query = params.get('query', '')
-        result = self.file_manager.find_files(query)
+        result = self.file_manager.find_files(query, token=token)
         
         if result['success']:
             count = result['count']
@@ -439,6 +886,10 @@ class CommandProcessor:
             else:
                 details = f"I couldn't find any files matching '{query}'"
             
+            if result.get('cancelled'):
+                # Partial results of a search that was stopped early
+                details = f"Search stopped early ({result['reason']}). {details}"
+            
             response = self.response_generator.generate(
                 'success',
                 intent='find_files',
@@ -455,7 +906,33 @@ class CommandProcessor:
             'success': result['success'],
             'response': response,
             'intent': 'find_files',
-            'data': result.get('files', [])
+            'data': result.get('files', []),
+            'cancelled': result.get('cancelled', False)
+        }
+    
+    def _execute_copy_file(self, params: Dict, token: CancellationToken) -> Dict:
+        target = params.get('target', '')
+        destination = params.get('destination', '')
+        result = self.file_manager.copy_file(target, destination, token=token)
+        
+        if result['success']:
+            response = self.response_generator.generate(
+                'success',
+                intent='copy_file',
+                details=result.get('message', '')
+            )
+        else:
+            response = self.response_generator.generate(
+                'error',
+                intent='copy_file',
+                error=result.get('message', 'Failed to copy file')
+            )
+        
+        return {
+            'success': result['success'],
+            'response': response,
+            'intent': 'copy_file',
+            'cancelled': result.get('cancelled', False)
         }
     
     def _execute_create_folder(self, params: Dict) -> Dict:
@@ -603,6 +1080,14 @@ class CommandProcessor:
             'intent': 'thank'
         }
     
+    def _execute_cancel(self, params: Dict) -> Dict:
+        # Running commands are cancelled by the scheduler; on its own there is nothing to stop
+        return {
+            'success': True,
+            'response': self.response_generator.generate('cancelled', count=0),
+            'intent': 'cancel'
+        }
+    
     def _execute_generic(self, intent: str, parameters: Dict) -> Dict:
         """Generic execution for unhandled intents"""
         response = f"I understand you want to {intent.replace('_', ' ')}, but I haven't implemented that yet, sir."
@@ -0,0 +1,220 @@
+"""
+Event Bus for Jarvis V2
+Delivers assistant events to any number of subscribers without holding up
+the command path
+"""
+
+import time
+from collections import deque
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Event types and their data
+COMMAND_RECEIVED = 'command_received'      # command, source
+INTENT_RECOGNIZED = 'intent_recognized'    # command, intent, confidence, parameters, source
+EXECUTION_STARTED = 'execution_started'    # command, intent
+EXECUTION_FINISHED = 'execution_finished'  # command, intent, success, duration_ms
+RESPONSE = 'response'                      # command, result
+SPOKEN = 'spoken'                          # text, outcome, duration_ms, time_to_first_audio_ms, queue_depth
+
+EVENT_TYPES = (COMMAND_RECEIVED, INTENT_RECOGNIZED, EXECUTION_STARTED,
+               EXECUTION_FINISHED, RESPONSE, SPOKEN)
+
+# What to do with a new event when a subscriber's queue is full
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+BLOCK = 'block'  # wait up to block_timeout for room, then drop the new event
+
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class Subscription:
+    """
+    A subscriber's bounded queue of events
+    
+    Events are read with get(), or handed to a callback on the
+    subscription's own thread when it was created with listen().
+    """
+    
+    def __init__(self, bus: 'EventBus', name: str, types: Optional[Iterable[str]],
+                 max_queue: int, drop_policy: str, block_timeout: float):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        
+        self.bus = bus
+        self.name = name
+        self.types = frozenset(types) if types else None
+        self.max_queue = max_queue
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        self.closed = False
+        
+        self._queue = deque()
+        self._condition = Condition()
+        
+        # Statistics
+        self.delivered = 0
+        self.dropped = 0
+        self.max_lag = 0.0
+        self._total_lag = 0.0
+    
+    def wants(self, event_type: str) -> bool:
+        return self.types is None or event_type in self.types
+    
+    def put(self, event: Dict[str, Any]):
+        """Queue an event (called by the bus on the publishing thread)"""
+        with self._condition:
+            if self.closed:
+                return
+            
+            if len(self._queue) >= self.max_queue:
+                if self.drop_policy == DROP_OLDEST:
+                    self._queue.popleft()
+                    self.dropped += 1
+                elif self.drop_policy == DROP_NEWEST or not self._wait_for_room():
+                    self.dropped += 1
+                    return
+            
+            self._queue.append(event)
+            self._condition.notify_all()
+    
+    def _wait_for_room(self) -> bool:
+        """Wait up to block_timeout for the reader to make room (condition held)"""
+        return self._condition.wait_for(
+            lambda: len(self._queue) < self.max_queue or self.closed,
+            self.block_timeout
+        ) and not self.closed
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Get the next event, or None if none arrives in time or the subscription is closed"""
+        with self._condition:
+            if not self._queue and not self.closed:
+                self._condition.wait(timeout)
+            if not self._queue:
+                return None
+            
+            event = self._queue.popleft()
+            self._condition.notify_all()
+        
+        lag = time.time() - event['time']
+        self.delivered += 1
+        self._total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        return event
+    
+    def pending(self) -> int:
+        """Number of events waiting to be read"""
+        return len(self._queue)
+    
+    def lag(self) -> float:
+        """Age in seconds of the oldest unread event"""
+        try:
+            return max(0.0, time.time() - self._queue[0]['time'])
+        except IndexError:
+            return 0.0
+    
+    def close(self):
+        """Unsubscribe and wake a waiting reader"""
+        self.bus.unsubscribe(self)
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+    
+    def get_stats(self) -> Dict:
+        """Get delivery and lag statistics"""
+        return {
+            'name': self.name,
+            'types': sorted(self.types) if self.types else None,
+            'drop_policy': self.drop_policy,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'pending': self.pending(),
+            'lag_ms': round(self.lag() * 1000, 1),
+            'max_lag_ms': round(self.max_lag * 1000, 1),
+            'average_lag_ms': round(self._total_lag / self.delivered * 1000, 1)
+            if self.delivered else 0.0
+        }
+
+
+class EventBus:
+    """
+    Publish/subscribe hub for assistant events
+    
+    Events are dicts with a 'type' (see EVENT_TYPES), the wall-clock 'time'
+    they were published and their data. Publishing only appends the event to
+    each interested subscriber's bounded queue, so it never runs subscriber
+    code on the command thread. Every subscriber has its own queue and drop
+    policy, so one slow subscriber only loses its own events.
+    """
+    
+    def __init__(self, max_queue: int = 256, drop_policy: str = DROP_OLDEST,
+                 block_timeout: float = 0.05):
+        self.max_queue = max_queue
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        self.published = 0
+        self._subscriptions: List[Subscription] = []
+        self._lock = Lock()
+    
+    def subscribe(self, name: str = '', types: Optional[Iterable[str]] = None,
+                  max_queue: Optional[int] = None,
+                  drop_policy: Optional[str] = None) -> Subscription:
+        """Start queueing events (of the given types) to be read with get()"""
+        subscription = Subscription(self, name, types, max_queue or self.max_queue,
+                                    drop_policy or self.drop_policy, self.block_timeout)
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+    
+    def listen(self, callback: Callable[[Dict[str, Any]], None],
+               types: Optional[Iterable[str]] = None, name: Optional[str] = None,
+               max_queue: Optional[int] = None,
+               drop_policy: Optional[str] = None) -> Subscription:
+        """
+        Call callback with each event (of the given types) on a dispatch thread
+        Close the returned subscription to stop listening.
+        """
+        name = name or getattr(callback, '__qualname__', repr(callback))
+        subscription = self.subscribe(name, types, max_queue, drop_policy)
+        
+        def dispatch():
+            while not subscription.closed:
+                event = subscription.get()
+                if event is None:
+                    continue
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error(f"Event listener {name} failed on {event['type']}: {e}")
+        
+        Thread(target=dispatch, name=f'events-{name}', daemon=True).start()
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        """Stop delivering events to a subscription"""
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+    
+    def publish(self, event_type: str, **data) -> Dict[str, Any]:
+        """Send an event to every interested subscriber"""
+        event = {'type': event_type, 'time': time.time(), **data}
+        self.published += 1
+        
+        for subscription in self._subscriptions:
+            if subscription.wants(event_type):
+                subscription.put(event)
+        return event
+    
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+    
+    def get_stats(self) -> Dict:
+        """Get bus and per-subscriber statistics"""
+        return {
+            'published': self.published,
+            'subscribers': [s.get_stats() for s in self._subscriptions]
+        }
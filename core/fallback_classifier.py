@@ -0,0 +1,245 @@
+"""
+Fallback Intent Classifier for Jarvis V2
+Classifies commands the regex patterns miss using character n-gram TF-IDF
+"""
+
+import importlib.util
+import json
+import math
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from utils.logger import get_logger
+from utils.config_manager import get_config
+
+logger = get_logger()
+config = get_config()
+
+DEFAULT_CORPUS = Path(__file__).parent / "data" / "intent_examples.json"
+
+
+class _FallbackModel:
+    """Vectorized example utterances"""
+    
+    def __init__(self, vocabulary: Dict[str, int], idf, examples, intents: List[str], offsets,
+                 parameters: Dict[str, str], templates: Dict[str, List[Tuple]]):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.examples = examples
+        self.intents = intents
+        self.offsets = offsets
+        self.parameters = parameters
+        self.templates = templates
+
+
+class FallbackClassifier:
+    """
+    Nearest-example classifier over character n-gram TF-IDF vectors
+    
+    Example utterances for each intent are vectorized once into a
+    row-normalized matrix. A command is scored against every example with a
+    single matrix-vector product and takes the intent of its best-scoring
+    example. Commands closest to the 'unknown' examples, or scoring below
+    min_score, are left unclassified.
+    
+    Only intents present in the corpus can be returned; power and
+    destructive intents are deliberately left out of the bundled corpus.
+    
+    Examples of intents that take a parameter mark it in braces
+    ("fire up {chrome}"). The parameter of a command is the text that lines
+    up with the braces in the example whose other words it shares best;
+    if no example lines up, the result carries no parameters.
+    """
+    
+    NGRAM_SIZES = (3, 4)
+    
+    # Parameter slot in an example utterance
+    SLOT = re.compile(r'\{[^}]*\}')
+    
+    # Words dropped from the start of an extracted parameter
+    LEADING_WORDS = ('the', 'a', 'an', 'my')
+    
+    def __init__(self, corpus_path: Optional[str] = None, min_score: Optional[float] = None):
+        self.corpus_path = Path(corpus_path) if corpus_path else DEFAULT_CORPUS
+        self.min_score = min_score if min_score is not None else \
+            config.get('advanced.fallback_min_score', 0.45)
+        self.enabled = config.get('advanced.fallback_classifier', True)
+        self._model: Optional[_FallbackModel] = None
+        self._model_lock = Lock()
+        self.np = None
+        
+        # numpy is imported with the model, the first time a command needs the fallback
+        self.available = importlib.util.find_spec('numpy') is not None
+        if not self.available:
+            logger.warning("numpy not available - fallback intent classifier disabled")
+    
+    def classify(self, command: str) -> Optional[Dict]:
+        """
+        Classify a command
+        Returns a recognition result like IntentRecognizer.recognize, or None
+        """
+        if not self.enabled or not self.available or not command.strip():
+            return None
+        
+        model = self._get_model()
+        if model is None:
+            return None
+        
+        vector = self._vectorize(command, model)
+        if vector is None:
+            return None
+        
+        # Best example score per intent (rows are grouped by intent)
+        scores = self.np.maximum.reduceat(model.examples @ vector, model.offsets)
+        best = int(scores.argmax())
+        intent = model.intents[best]
+        score = float(scores[best])
+        
+        logger.debug(f"Fallback classifier: {intent} (score: {score:.2f})")
+        
+        if intent == 'unknown' or score < self.min_score:
+            return None
+        
+        return {
+            'intent': intent,
+            'confidence': score,
+            'parameters': self._extract_parameters(command, intent, model),
+            'raw_command': command,
+            'source': 'fallback'
+        }
+    
+    def _get_model(self) -> Optional[_FallbackModel]:
+        """Build the model on first use"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    try:
+                        import numpy
+                        self.np = numpy
+                        self._model = self._build_model()
+                    except (ImportError, OSError, ValueError) as e:
+                        logger.error(f"Could not build fallback classifier: {e}")
+                        self.enabled = False
+        return self._model
+    
+    def _build_model(self) -> _FallbackModel:
+        """Vectorize the example corpus"""
+        np = self.np
+        
+        with open(self.corpus_path, 'r', encoding='utf-8') as f:
+            corpus = json.load(f)
+        
+        intents = []
+        offsets = []
+        documents = []
+        templates = {}
+        for intent, utterances in corpus['examples'].items():
+            if not utterances:
+                continue
+            intents.append(intent)
+            offsets.append(len(documents))
+            documents.extend(self._ngrams(utterance) for utterance in utterances)
+            templates[intent] = [self._template(utterance) for utterance in utterances]
+        
+        if not documents:
+            raise ValueError(f"No example utterances in {self.corpus_path}")
+        
+        # Vocabulary and smoothed inverse document frequency
+        document_frequency = Counter()
+        for ngrams in documents:
+            document_frequency.update(ngrams.keys())
+        
+        vocabulary = {ngram: i for i, ngram in enumerate(sorted(document_frequency))}
+        idf = np.empty(len(vocabulary), dtype=np.float32)
+        for ngram, i in vocabulary.items():
+            idf[i] = math.log((1 + len(documents)) / (1 + document_frequency[ngram])) + 1
+        
+        examples = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+        for row, ngrams in enumerate(documents):
+            for ngram, count in ngrams.items():
+                examples[row, vocabulary[ngram]] = 1 + math.log(count)
+        
+        examples *= idf
+        examples /= np.linalg.norm(examples, axis=1, keepdims=True)
+        
+        logger.info(f"Fallback classifier built: {len(documents)} examples, "
+                    f"{len(intents)} intents, {len(vocabulary)} n-grams")
+        
+        return _FallbackModel(vocabulary, idf, examples, intents, np.array(offsets),
+                              corpus.get('parameters', {}), templates)
+    
+    def _vectorize(self, command: str, model: _FallbackModel):
+        """Get the normalized TF-IDF vector of a command, or None if no n-gram is known"""
+        vector = self.np.zeros(len(model.vocabulary), dtype=self.np.float32)
+        
+        for ngram, count in self._ngrams(command).items():
+            index = model.vocabulary.get(ngram)
+            if index is not None:
+                vector[index] = 1 + math.log(count)
+        
+        vector *= model.idf
+        norm = float(self.np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        
+        return vector / norm
+    
+    def _extract_parameters(self, command: str, intent: str, model: _FallbackModel) -> Dict:
+        """Get a command's parameter from the example of its intent it lines up with best"""
+        name = model.parameters.get(intent)
+        if not name:
+            return {}
+        
+        tokens = command.split()
+        keys = [' '.join(self._words(token)) for token in tokens]
+        best = None
+        
+        for template in model.templates[intent]:
+            blocks = SequenceMatcher(None, keys, template, autojunk=False).get_matching_blocks()[:-1]
+            matched = sum(block.size for block in blocks)
+            if not matched:
+                continue
+            
+            span = []
+            if None in template:
+                slot = template.index(None)
+                start = max((block.a + block.size for block in blocks if block.b < slot), default=0)
+                end = min((block.a for block in blocks if block.b > slot), default=len(tokens))
+                span = tokens[start:end]
+                while span and span[0].lower() in self.LEADING_WORDS:
+                    span = span[1:]
+            
+            # Share of words in common, then the tighter parameter
+            rank = (2 * matched / (len(keys) + len(template) - (None in template)), -len(span))
+            if best is None or rank > best[0]:
+                best = (rank, span)
+        
+        if best is None or not best[1]:
+            return {}
+        return {name: ' '.join(best[1])}
+    
+    def _template(self, utterance: str) -> Tuple:
+        """Get an example's words with None in place of its parameter"""
+        match = self.SLOT.search(utterance)
+        if not match:
+            return tuple(self._words(utterance))
+        return tuple(self._words(utterance[:match.start()]) + [None] +
+                     self._words(utterance[match.end():]))
+    
+    def _words(self, text: str) -> List[str]:
+        """Split text into normalized words"""
+        return re.sub(r"[^a-z0-9']+", ' ', text.lower()).split()
+    
+    def _ngrams(self, text: str) -> Counter:
+        """Count character n-grams of normalized text, padded at word edges"""
+        text = ' ' + ' '.join(self._words(text)) + ' '
+        
+        ngrams = Counter()
+        for size in self.NGRAM_SIZES:
+            for i in range(len(text) - size + 1):
+                ngrams[text[i:i + size]] += 1
+        
+        return ngrams
@@ -0,0 +1,202 @@
+"""
+Intent Catalog for Jarvis V2
+Loads custom intent patterns from a JSON or YAML catalog file
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Parameter group specs understood by IntentRecognizer._extract_parameters
+PARAMETER_GROUPS = ('target_group', 'value_group', 'direction_group', 'destination_group',
+                    'query_group', 'name_group')
+
+# Relative catalog paths and cache directories are resolved against the project,
+# whatever the working directory
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class LazyPattern:
+    """Regex that is only compiled the first time it is searched"""
+    
+    def __init__(self, pattern: str, flags: int = 0):
+        self.pattern = pattern
+        self.flags = flags
+        self._compiled: Optional[re.Pattern] = None
+    
+    def search(self, string: str, *args) -> Optional[re.Match]:
+        if self._compiled is None:
+            self._compiled = re.compile(self.pattern, self.flags)
+        return self._compiled.search(string, *args)
+    
+    def __getstate__(self):
+        # Compiled patterns are rebuilt on demand after unpickling
+        return {'pattern': self.pattern, 'flags': self.flags, '_compiled': None}
+    
+    def __repr__(self):
+        return f"LazyPattern({self.pattern!r}, {self.flags})"
+
+
+class IntentCatalog:
+    """
+    Custom intent patterns loaded from a catalog file
+    
+    Catalog format (JSON, or YAML when PyYAML is installed):
+        
+        {
+          "intents": {
+            "open_project": [
+              {"pattern": "\\\\bopen\\\\s+project\\\\s+(.+)", "name_group": 1}
+            ]
+          }
+        }
+    
+    Each entry takes a regex "pattern", optional parameter group specs
+    (target_group, value_group, direction_group, destination_group,
+    query_group, name_group)
+    and an optional "ignore_case" flag (default true).
+    
+    Parsing and validating a catalog compiles every regex once. The
+    validated entries are written to an on-disk cache keyed by a hash of
+    the catalog contents, so later startups load them without compiling
+    anything; patterns are then compiled lazily on first use.
+    """
+    
+    # Bump when the cached entry format changes
+    CACHE_VERSION = 1
+    
+    def __init__(self, path: str, cache_dir: str = "cache"):
+        self.path = PROJECT_ROOT / path
+        self.cache_path = PROJECT_ROOT / cache_dir / "intent_catalog.json"
+        self._signature = None
+    
+    def load(self) -> Dict[str, List[Tuple[LazyPattern, Dict]]]:
+        """
+        Load the catalog
+        Raises ValueError for an invalid catalog and OSError if it cannot be read
+        """
+        self._signature = self._stat_signature()
+        
+        if self._signature is None:
+            logger.debug(f"No intent catalog at {self.path}")
+            return {}
+        
+        raw = self.path.read_bytes()
+        digest = hashlib.sha256(raw + str(self.CACHE_VERSION).encode()).hexdigest()
+        
+        entries = self._read_cache(digest)
+        if entries is None:
+            entries = self._parse(raw)
+            self._write_cache(digest, entries)
+        
+        patterns: Dict[str, List[Tuple[LazyPattern, Dict]]] = {}
+        for entry in entries:
+            pattern = LazyPattern(entry['pattern'], entry['flags'])
+            patterns.setdefault(entry['intent'], []).append((pattern, entry['config']))
+        
+        logger.info(f"Intent catalog loaded: {len(entries)} pattern(s) for "
+                    f"{len(patterns)} intent(s) from {self.path}")
+        return patterns
+    
+    def has_changed(self) -> bool:
+        """Check whether the catalog file changed since it was last loaded"""
+        return self._stat_signature() != self._signature
+    
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        """Get modification time and size of the catalog, or None if missing"""
+        try:
+            stat = self.path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+    
+    def _parse(self, raw: bytes) -> List[Dict]:
+        """Parse and validate catalog contents into cacheable entries"""
+        text = raw.decode('utf-8')
+        
+        try:
+            if self.path.suffix.lower() in ('.yaml', '.yml'):
+                import yaml
+                data = yaml.safe_load(text)
+            else:
+                data = json.loads(text)
+        except ImportError:
+            raise ValueError("YAML intent catalogs require the pyyaml library")
+        except Exception as e:
+            raise ValueError(f"Could not parse intent catalog {self.path}: {e}")
+        
+        intents = data.get('intents') if isinstance(data, dict) else None
+        if not isinstance(intents, dict):
+            raise ValueError(f"Intent catalog {self.path} has no 'intents' mapping")
+        
+        entries = []
+        for intent, specs in intents.items():
+            if not isinstance(specs, list):
+                raise ValueError(f"Intent '{intent}' must list its patterns")
+            
+            for spec in specs:
+                entries.append(self._parse_entry(intent, spec))
+        
+        return entries
+    
+    def _parse_entry(self, intent: str, spec: Dict) -> Dict:
+        """Validate a single catalog pattern"""
+        if not isinstance(spec, dict) or not isinstance(spec.get('pattern'), str):
+            raise ValueError(f"Intent '{intent}' has an entry without a pattern")
+        
+        flags = re.I if spec.get('ignore_case', True) else 0
+        
+        try:
+            compiled = re.compile(spec['pattern'], flags)
+        except re.error as e:
+            raise ValueError(f"Invalid pattern for intent '{intent}': {e}")
+        
+        pattern_config = {}
+        for key in PARAMETER_GROUPS:
+            if key not in spec:
+                continue
+            
+            group = spec[key]
+            if not isinstance(group, int) or not 0 < group <= compiled.groups:
+                raise ValueError(f"Intent '{intent}': {key} {group!r} is not a group of "
+                                 f"{spec['pattern']!r}")
+            pattern_config[key] = group
+        
+        return {
+            'intent': intent,
+            'pattern': spec['pattern'],
+            'flags': flags,
+            'config': pattern_config
+        }
+    
+    def _read_cache(self, digest: str) -> Optional[List[Dict]]:
+        """Get cached entries if they were built from the same catalog contents"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        # Anything but a cache this class wrote is a miss
+        if not isinstance(cached, dict) or cached.get('hash') != digest or \
+                not isinstance(cached.get('entries'), list):
+            return None
+        
+        logger.debug("Using cached intent catalog")
+        return cached['entries']
+    
+    def _write_cache(self, digest: str, entries: List[Dict]):
+        """Store validated entries for later startups"""
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'hash': digest, 'entries': entries}, f)
+            temp_path.replace(self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write intent catalog cache: {e}")
@@ -4,22 +4,111 @@ Identifies user intent from natural language commands
 """
 
 import re
-from typing import Dict, List, Optional, Tuple
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from utils.logger import get_logger
+from utils.config_manager import get_config
+from core.intent_catalog import IntentCatalog
 
 logger = get_logger()
+config = get_config()
 
 
 class IntentRecognizer:
     """Recognizes user intent from commands"""
     
-    def __init__(self):
-        self.intent_patterns = self._build_patterns()
+    # Parameters holding free text from the command
+    TEXT_PARAMETERS = ('target', 'destination', 'query', 'name')
+    
+    def __init__(self, cache_size: Optional[int] = None,
+                 catalog_path: Optional[str] = None):
+        self.builtin_patterns = self._build_patterns()
+        self.intent_patterns = self.builtin_patterns
+        
+        # LRU cache of recognition results keyed on case-folded command text
+        if cache_size is None:
+            if config.get('advanced.cache_enabled', True):
+                cache_size = config.get('advanced.intent_cache_size', 256)
+            else:
+                cache_size = 0
+        self.cache_size = max(0, cache_size)
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = Lock()
+        self._cache_generation = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # Custom patterns from the intent catalog ('' disables it)
+        if catalog_path is None:
+            catalog_path = config.get('advanced.intent_catalog', 'config/intents.json')
+        self.catalog = IntentCatalog(catalog_path) if catalog_path else None
+        self.catalog_poll_interval = config.get('advanced.intent_catalog_poll_interval', 2.0)
+        self._next_catalog_check = 0.0
+        self._reload_lock = Lock()
+        
+        if self.catalog:
+            self.reload_catalog()
+        else:
+            self.rebuild_index()
+    
+    def reload_catalog(self) -> bool:
+        """
+        Reload the intent catalog and rebuild the pattern set
+        Keeps the current patterns if the catalog is invalid
+        """
+        if not self.catalog:
+            return False
+        
+        try:
+            catalog_patterns = self.catalog.load()
+        except (ValueError, OSError) as e:
+            logger.error(f"Error loading intent catalog: {e}")
+            if not hasattr(self, '_index'):
+                self.rebuild_index()
+            return False
+        
+        # Catalog patterns are tried first so they win ties with built-in ones
+        patterns = {}
+        for intent, entries in catalog_patterns.items():
+            patterns[intent] = entries + self.builtin_patterns.get(intent, [])
+        for intent, entries in self.builtin_patterns.items():
+            patterns.setdefault(intent, entries)
+        
+        self.intent_patterns = patterns
+        self.rebuild_index()
+        return True
+    
+    def _check_catalog(self):
+        """Hot-reload the catalog if its file changed, polling at most every poll interval"""
+        now = time.monotonic()
+        if now < self._next_catalog_check:
+            return
+        self._next_catalog_check = now + self.catalog_poll_interval
+        
+        if not self.catalog.has_changed():
+            return
+        
+        # Only one caller reloads; the others keep using the current index
+        if self._reload_lock.acquire(blocking=False):
+            try:
+                if self.catalog.has_changed():
+                    logger.info("Intent catalog changed - reloading")
+                    self.reload_catalog()
+            finally:
+                self._reload_lock.release()
     
     def _build_patterns(self) -> Dict[str, List[Tuple[re.Pattern, Dict]]]:
         """Build regex patterns for intent recognition"""
         
         patterns = {
+            # Cancellation (ahead of close_app so "stop that" is not an app called "that")
+            'cancel': [
+                (re.compile(r'\b(cancel|abort|never\s*mind|stop(\s+(that|it|this))?)\b', re.I), {}),
+            ],
+            
             # Application Control
             'launch_app': [
                 (re.compile(r'\b(open|launch|start|run)\s+(.+)', re.I), {'target_group': 2}),
@@ -42,6 +131,7 @@ class IntentRecognizer:
             
             # Screenshot Operations
             'screenshot': [
+                (re.compile(r'\b(take\s+)?(a\s+)?screenshot\s+in\s+(\d+)\s+seconds?', re.I), {'value_group': 3}),
                 (re.compile(r'\b(take|capture|grab|screenshot|screencap)\s+(a\s+)?(screenshot|screen|capture)', re.I), {}),
                 (re.compile(r'\bscreenshot\b', re.I), {}),
             ],
@@ -103,6 +193,10 @@ class IntentRecognizer:
                 (re.compile(r'\bwhere\s+(is|are)\s+(.+)', re.I), {'query_group': 2}),
             ],
             
+            'copy_file': [
+                (re.compile(r'\bcopy\s+(.+?)\s+(to|into)\s+(.+)', re.I), {'target_group': 1, 'destination_group': 3}),
+            ],
+            
             'create_folder': [
                 (re.compile(r'\bcreate\s+(a\s+)?(new\s+)?(folder|directory)\s+(.+)', re.I), {'name_group': 4}),
                 (re.compile(r'\bnew\s+folder\s+(.+)', re.I), {'name_group': 1}),
@@ -160,11 +254,161 @@ class IntentRecognizer:
         
         return patterns
     
+    def rebuild_index(self):
+        """
+        Compile the pattern set into a keyword index
+        
+        Each pattern starting with a word boundary followed by literal words
+        (or a group of literal alternatives) is indexed under the leading word
+        of every alternative. A command can only match such a pattern if one of
+        its tokens starts with that word, so recognize() only has to search the
+        patterns reachable from the command's tokens. Patterns that cannot be
+        indexed are always searched.
+        
+        Must be called after intent_patterns is modified. Clears the
+        recognition cache.
+        """
+        table: List[Tuple[str, re.Pattern, Dict]] = []
+        keyword_index: Dict[str, List[int]] = {}
+        unindexed: List[int] = []
+        
+        for intent, patterns in self.intent_patterns.items():
+            for pattern, pattern_config in patterns:
+                index = len(table)
+                table.append((intent, pattern, pattern_config))
+                
+                keywords = self._leading_keywords(pattern)
+                if keywords is None:
+                    unindexed.append(index)
+                    continue
+                
+                for keyword in keywords:
+                    keyword_index.setdefault(keyword, []).append(index)
+        
+        max_keyword_length = max((len(k) for k in keyword_index), default=0)
+        
+        # Swap in as one object so concurrent recognize() calls see a consistent index
+        self._index = (table, keyword_index, unindexed, max_keyword_length)
+        self.pattern_version = getattr(self, 'pattern_version', 0) + 1
+        self.clear_cache()
+        
+        logger.debug(f"Intent index built: {len(table)} patterns, "
+                     f"{len(keyword_index)} keywords, {len(unindexed)} unindexed")
+    
+    @staticmethod
+    def _split_alternatives(source: str) -> Optional[List[str]]:
+        """
+        Split regex source on top-level '|'
+        Returns None for sources this simple scanner cannot follow
+        """
+        alternatives, depth, start, i = [], 0, 0, 0
+        
+        while i < len(source):
+            char = source[i]
+            if char == '\\':
+                i += 2
+                continue
+            if char == '[':
+                return None
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif char == '|' and depth == 0:
+                alternatives.append(source[start:i])
+                start = i + 1
+            i += 1
+        
+        if depth != 0:
+            return None
+        
+        alternatives.append(source[start:])
+        return alternatives
+    
+    @classmethod
+    def _leading_keywords(cls, pattern: re.Pattern) -> Optional[List[str]]:
+        """
+        Get the words one of which must start a token for the pattern to match
+        Returns None if the pattern cannot be indexed
+        """
+        source = pattern.pattern
+        if not source.startswith(r'\b') or not pattern.flags & re.I:
+            return None
+        source = source[2:]
+        
+        top_level = cls._split_alternatives(source)
+        if top_level is None or len(top_level) > 1:
+            return None
+        
+        if source.startswith('('):
+            # Find the end of the leading group
+            depth, end = 0, 0
+            while end < len(source):
+                char = source[end]
+                if char == '\\':
+                    end += 2
+                    continue
+                if char == '(':
+                    depth += 1
+                elif char == ')':
+                    depth -= 1
+                    if depth == 0:
+                        break
+                end += 1
+            
+            # An optional group may be skipped entirely
+            if source[end + 1:end + 2] in ('?', '*', '{'):
+                return None
+            
+            body = source[1:end]
+            if body.startswith('?:'):
+                body = body[2:]
+            
+            alternatives = cls._split_alternatives(body)
+            if alternatives is None:
+                return None
+        else:
+            alternatives = [source]
+        
+        keywords = []
+        for alternative in alternatives:
+            word = re.match(r'[a-z0-9_]+', alternative, re.I)
+            if not word:
+                return None
+            
+            # A quantifier makes the last literal character optional
+            keyword = word.group(0)
+            if alternative[len(keyword):len(keyword) + 1] in ('?', '*', '{'):
+                keyword = keyword[:-1]
+            if not keyword:
+                return None
+            
+            keywords.append(keyword.lower())
+        
+        return keywords
+    
+    @staticmethod
+    def _candidate_patterns(command: str, index: Tuple) -> List[int]:
+        """Get indices of patterns that could match the command, in pattern order"""
+        _, keyword_index, unindexed, max_keyword_length = index
+        candidates = set(unindexed)
+        
+        for token in re.findall(r'\w+', command.casefold()):
+            for length in range(1, min(len(token), max_keyword_length) + 1):
+                indices = keyword_index.get(token[:length])
+                if indices:
+                    candidates.update(indices)
+        
+        return sorted(candidates)
+    
     def recognize(self, command: str) -> Dict:
         """
         Recognize intent from command
         Returns dict with: intent, confidence, parameters
         """
+        if self.catalog:
+            self._check_catalog()
+        
         command = command.strip()
         
         if not command:
@@ -175,31 +419,159 @@ class IntentRecognizer:
                 'raw_command': command
             }
         
-        # Try to match against all patterns
-        best_match = {
-            'intent': 'unknown',
-            'confidence': 0.0,
-            'parameters': {},
-            'raw_command': command
-        }
+        if self.cache_size:
+            result = self._recognize_cached(command)
+        else:
+            result = self._match(command)
         
-        for intent, patterns in self.intent_patterns.items():
-            for pattern, config in patterns:
-                match = pattern.search(command)
-                if match:
-                    confidence = self._calculate_confidence(match, command)
+        # Hand out a copy so callers cannot alter cached entries
+        result = dict(result, parameters=dict(result['parameters']), raw_command=command)
+        
+        logger.debug(f"Intent recognized: {result['intent']} (confidence: {result['confidence']:.2f})")
+        return result
+    
+    def recognize_many(self, commands: Iterable[str], workers: int = 1,
+                       chunk_size: int = 500) -> Iterator[Dict]:
+        """
+        Recognize intents for many commands, yielding results in input order
+        
+        Bypasses the LRU cache so bulk replays do not evict live entries or
+        skew its statistics; repeated commands within the batch are matched
+        once. With workers > 1, chunks of commands are spread across a
+        process pool.
+        """
+        if workers > 1:
+            yield from self._recognize_many_parallel(commands, workers, chunk_size)
+            return
+        
+        yield from self._recognize_batch(commands)
+    
+    def _recognize_batch(self, commands: Iterable[str]) -> Iterator[Dict]:
+        """Recognize commands in-process, matching each distinct command once"""
+        unknown = {'intent': 'unknown', 'confidence': 0.0, 'parameters': {}}
+        matched: Dict[str, Dict] = {}
+        
+        for command in commands:
+            command = command.strip()
+            
+            if not command:
+                result = unknown
+            else:
+                result = matched.get(command)
+                if result is None:
+                    result = matched[command] = self._match(command)
+            
+            yield dict(result, parameters=dict(result['parameters']), raw_command=command)
+    
+    def _recognize_many_parallel(self, commands: Iterable[str], workers: int,
+                                 chunk_size: int) -> Iterator[Dict]:
+        """Recognize commands on a process pool, keeping a bounded number of chunks in flight"""
+        from concurrent.futures import ProcessPoolExecutor
+        
+        commands = iter(commands)
+        pending = deque()
+        
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_batch_worker,
+                                 initargs=(self.intent_patterns,)) as executor:
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = list(islice(commands, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(executor.submit(_recognize_batch_chunk, chunk))
+                
+                if not pending:
+                    break
+                
+                yield from pending.popleft().result()
+    
+    def _recognize_cached(self, command: str) -> Dict:
+        """Look up a command in the LRU cache, matching on a miss"""
+        key = command.casefold()
+        
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            
+            # Entries differing only in case are shared unless they carry free text
+            if entry is not None and (entry[0] == command or
+                                      not any(p in entry[1]['parameters']
+                                              for p in self.TEXT_PARAMETERS)):
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return entry[1]
+            
+            self.cache_misses += 1
+            generation = self._cache_generation
+        
+        result = self._match(command)
+        
+        with self._cache_lock:
+            # Skip results computed against a pattern set that has since changed
+            if generation == self._cache_generation:
+                self._cache[key] = (command, result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        
+        return result
+    
+    def _match(self, command: str) -> Dict:
+        """Match a command against the pattern set"""
+        # Find the first pattern with the highest confidence
+        best_confidence = 0.0
+        best = None
+        index = self._index
+        table = index[0]
+        
+        for position in self._candidate_patterns(command, index):
+            intent, pattern, pattern_config = table[position]
+            match = pattern.search(command)
+            if match:
+                confidence = self._calculate_confidence(match, command)
+                
+                if confidence > best_confidence:
+                    best_confidence = confidence
+                    best = (intent, match, pattern_config)
                     
-                    if confidence > best_match['confidence']:
-                        parameters = self._extract_parameters(match, config, command)
-                        best_match = {
-                            'intent': intent,
-                            'confidence': confidence,
-                            'parameters': parameters,
-                            'raw_command': command
-                        }
-        
-        logger.debug(f"Intent recognized: {best_match['intent']} (confidence: {best_match['confidence']:.2f})")
-        return best_match
+                    # Nothing later can beat a full match
+                    if confidence >= 1.0:
+                        break
+        
+        if best is None:
+            return {
+                'intent': 'unknown',
+                'confidence': 0.0,
+                'parameters': {},
+                'raw_command': command
+            }
+        
+        intent, match, pattern_config = best
+        return {
+            'intent': intent,
+            'confidence': best_confidence,
+            'parameters': self._extract_parameters(match, pattern_config, command),
+            'raw_command': command
+        }
+    
+    def clear_cache(self):
+        """Drop all cached recognition results"""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_generation += 1
+    
+    def get_cache_stats(self) -> Dict:
+        """Get recognition cache statistics"""
+        with self._cache_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'enabled': self.cache_size > 0,
+                'size': len(self._cache),
+                'capacity': self.cache_size,
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'hit_rate': self.cache_hits / lookups if lookups else 0.0
+            }
     
     def _calculate_confidence(self, match: re.Match, command: str) -> float:
         """Calculate confidence score for a match"""
@@ -241,6 +613,11 @@ class IntentRecognizer:
             direction = match.group(config['direction_group']).lower()
             parameters['direction'] = direction
         
+        # Extract destination (copy target)
+        if 'destination_group' in config:
+            destination = match.group(config['destination_group']).strip()
+            parameters['destination'] = destination
+        
         # Extract query string
         if 'query_group' in config:
             query = match.group(config['query_group']).strip()
@@ -266,6 +643,31 @@ class IntentRecognizer:
         
         return target.strip()
     
+    def get_vocabulary(self) -> Set[str]:
+        """Get the literal words used by the current patterns"""
+        vocabulary = set()
+        for _, pattern, _ in self._index[0]:
+            source = re.sub(r'\\.', ' ', pattern.pattern)
+            vocabulary.update(word.lower() for word in re.findall(r'[a-z]+', source, re.I))
+        return vocabulary
+    
     def get_possible_intents(self) -> List[str]:
         """Get list of all possible intents"""
         return list(self.intent_patterns.keys())
+
+
+# Recognizer used by batch worker processes
+_batch_recognizer: Optional[IntentRecognizer] = None
+
+
+def _init_batch_worker(intent_patterns: Dict[str, List[Tuple[re.Pattern, Dict]]]):
+    """Build the worker's recognizer from the parent's pattern set"""
+    global _batch_recognizer
+    _batch_recognizer = IntentRecognizer(cache_size=0, catalog_path='')
+    _batch_recognizer.intent_patterns = intent_patterns
+    _batch_recognizer.rebuild_index()
+
+
+def _recognize_batch_chunk(commands: List[str]) -> List[Dict]:
+    """Recognize a chunk of commands in a worker process"""
+    return list(_batch_recognizer._recognize_batch(commands))
@@ -0,0 +1,144 @@
+"""
+IPC Client for Jarvis V2
+Forwards commands to a running Jarvis daemon
+
+This module only imports the standard library pieces it needs, so that
+`main.py --command` can reach a daemon without loading the assistant.
+"""
+
+import json
+import os
+import socket
+from typing import Dict, Iterable, List, Optional
+
+PIPE_PREFIX = '\\\\.\\pipe\\'
+
+# Seconds to wait for a response before giving up on the daemon
+RESPONSE_TIMEOUT = 30.0
+
+
+def default_address() -> str:
+    """
+    Get the daemon's address
+    A named pipe on Windows, a Unix-domain socket elsewhere; the
+    JARVIS_IPC_ADDRESS environment variable overrides both.
+    """
+    address = os.environ.get('JARVIS_IPC_ADDRESS')
+    if address:
+        return address
+    
+    if os.name == 'nt':
+        return PIPE_PREFIX + 'jarvis-' + os.environ.get('USERNAME', 'user')
+    
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(runtime_dir, f'jarvis-{os.getuid()}.sock')
+
+
+class CommandClient:
+    """
+    Connection to a Jarvis daemon
+    
+    Requests and responses are single lines of JSON. Several requests may be
+    sent before reading any response (pipelining); the daemon runs them
+    concurrently and answers them in the order they were sent. On a socket,
+    a daemon that stops answering raises TimeoutError after timeout seconds
+    (None waits forever).
+    """
+    
+    def __init__(self, address: Optional[str] = None, connect_timeout: float = 1.0,
+                 timeout: Optional[float] = RESPONSE_TIMEOUT):
+        self.address = address or default_address()
+        self.timeout = timeout
+        self._next_id = 1
+        self._buffer = b''
+        
+        if self.address.startswith(PIPE_PREFIX):
+            self._socket = None
+            self._stream = open(self.address, 'r+b', buffering=0)
+        else:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                self._socket.settimeout(connect_timeout)
+                self._socket.connect(self.address)
+                self._socket.settimeout(timeout)
+            except OSError:
+                self._socket.close()
+                raise
+            self._stream = self._socket.makefile('rwb', buffering=0)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def send(self, command: str, speak: bool = False) -> int:
+        """Send a command without waiting for its response; returns the request id"""
+        request_id = self._next_id
+        self._next_id += 1
+        
+        request = {'id': request_id, 'command': command, 'speak': speak}
+        self._stream.write(json.dumps(request).encode('utf-8') + b'\n')
+        return request_id
+    
+    def receive(self) -> Dict:
+        """Read the next response"""
+        while b'\n' not in self._buffer:
+            try:
+                data = self._stream.read(65536)
+            except socket.timeout:
+                raise TimeoutError(f"Jarvis daemon did not respond within {self.timeout} s") from None
+            if not data:
+                raise ConnectionError("Jarvis daemon closed the connection")
+            self._buffer += data
+        
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return json.loads(line)
+    
+    def execute(self, command: str, speak: bool = False) -> Dict:
+        """Run a command on the daemon and wait for its result"""
+        self.send(command, speak)
+        return self.receive()
+    
+    def execute_many(self, commands: Iterable[str], speak: bool = False,
+                     window: int = 32) -> List[Dict]:
+        """
+        Pipeline several commands over the connection; results are in order
+        At most window requests are sent ahead of the responses read, so
+        neither side can stall with full buffers.
+        """
+        results = []
+        in_flight = 0
+        
+        for command in commands:
+            if in_flight >= window:
+                results.append(self.receive())
+                in_flight -= 1
+            self.send(command, speak)
+            in_flight += 1
+        
+        results.extend(self.receive() for _ in range(in_flight))
+        return results
+    
+    def close(self):
+        """Close the connection"""
+        self._stream.close()
+        if self._socket is not None:
+            self._socket.close()
+
+
+def forward_command(command: str, address: Optional[str] = None,
+                    timeout: Optional[float] = RESPONSE_TIMEOUT) -> Optional[Dict]:
+    """
+    Run a command on a running daemon
+    Returns None if no daemon is listening, so the caller can run it itself.
+    A daemon that accepts the command but does not answer raises TimeoutError;
+    the command may already have run, so it is not retried in-process.
+    """
+    try:
+        client = CommandClient(address, timeout=timeout)
+    except OSError:
+        return None
+    
+    with client:
+        return client.execute(command)
@@ -0,0 +1,254 @@
+"""
+IPC Server for Jarvis V2
+Command endpoint of the Jarvis daemon for local clients
+"""
+
+import json
+import os
+import queue
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, Event
+from typing import Dict, Optional
+from utils.logger import get_logger
+from utils.config_manager import get_config
+from core.ipc_client import PIPE_PREFIX, CommandClient, default_address
+
+logger = get_logger()
+config = get_config()
+
+
+class _SocketChannel:
+    """Line-oriented connection over a Unix-domain socket"""
+    
+    def __init__(self, connection: socket.socket):
+        self._connection = connection
+        self._reader = connection.makefile('rb')
+    
+    def read_line(self) -> Optional[bytes]:
+        line = self._reader.readline()
+        return line or None
+    
+    def write_line(self, data: bytes):
+        self._connection.sendall(data)
+    
+    def close(self):
+        self._reader.close()
+        self._connection.close()
+
+
+class _PipeChannel:
+    """Line-oriented connection over a message-mode named pipe"""
+    
+    def __init__(self, connection):
+        self._connection = connection
+        self._lines = []
+    
+    def read_line(self) -> Optional[bytes]:
+        # A client writes each request as one message
+        while not self._lines:
+            try:
+                message = self._connection.recv_bytes()
+            except (EOFError, OSError):
+                return None
+            self._lines = message.splitlines(keepends=True)
+        return self._lines.pop(0)
+    
+    def write_line(self, data: bytes):
+        self._connection.send_bytes(data)
+    
+    def close(self):
+        self._connection.close()
+
+
+class CommandServer:
+    """
+    Local command endpoint for the Jarvis daemon
+    
+    Listens on a Unix-domain socket (a named pipe on Windows) for lines of
+    JSON such as {"id": 1, "command": "open chrome"}. Each connection may
+    pipeline requests: they are run concurrently through Jarvis (and so
+    through the command scheduler) and answered in the order they arrived.
+    At most max_pending requests per connection are in flight; reading
+    further requests waits until earlier responses are written.
+    """
+    
+    def __init__(self, jarvis, address: Optional[str] = None,
+                 workers: Optional[int] = None, max_pending: int = 64):
+        self.jarvis = jarvis
+        self.address = address or default_address()
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or config.get('advanced.ipc_workers', 8),
+            thread_name_prefix='ipc'
+        )
+        self._listener = None
+        self._accept_thread: Optional[Thread] = None
+        self._stop_event = Event()
+        
+        # Statistics
+        self.connections = 0
+        self.requests = 0
+    
+    @property
+    def is_running(self) -> bool:
+        return self._accept_thread is not None and self._accept_thread.is_alive()
+    
+    def start(self) -> bool:
+        """Start listening; returns False if the endpoint could not be opened"""
+        if self.is_running:
+            return True
+        
+        try:
+            self._listener = self._listen()
+        except OSError as e:
+            logger.error(f"Could not open command endpoint {self.address}: {e}")
+            return False
+        
+        self._stop_event.clear()
+        self._accept_thread = Thread(target=self._accept_loop, name='ipc-accept', daemon=True)
+        self._accept_thread.start()
+        
+        logger.info(f"Command endpoint listening on {self.address}")
+        return True
+    
+    def stop(self):
+        """Stop accepting connections"""
+        if not self.is_running:
+            return
+        
+        self._stop_event.set()
+        
+        # Wake the accept loop with a throwaway connection
+        try:
+            CommandClient(self.address).close()
+        except OSError:
+            pass
+        
+        self._accept_thread.join(timeout=2)
+        self._listener.close()
+        if not self._is_pipe():
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+        
+        self._executor.shutdown(wait=False)
+        logger.info("Command endpoint closed")
+    
+    def get_stats(self) -> Dict:
+        """Get endpoint statistics"""
+        return {
+            'address': self.address,
+            'running': self.is_running,
+            'connections': self.connections,
+            'requests': self.requests
+        }
+    
+    def _is_pipe(self) -> bool:
+        return self.address.startswith(PIPE_PREFIX)
+    
+    def _listen(self):
+        """Open the listening endpoint"""
+        if self._is_pipe():
+            from multiprocessing.connection import Listener
+            return Listener(self.address, family='AF_PIPE')
+        
+        # A socket file left by a daemon that died can be replaced; a live one can't
+        if os.path.exists(self.address):
+            try:
+                CommandClient(self.address).close()
+            except OSError:
+                os.unlink(self.address)
+            else:
+                raise OSError(f"another Jarvis daemon is listening on {self.address}")
+        
+        # The socket file is created owner-only; chmod after bind would leave a window
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            listener.bind(self.address)
+            listener.listen()
+        except OSError:
+            listener.close()
+            raise
+        finally:
+            os.umask(umask)
+        return listener
+    
+    def _accept(self):
+        """Wait for the next client connection"""
+        if self._is_pipe():
+            return _PipeChannel(self._listener.accept())
+        connection, _ = self._listener.accept()
+        return _SocketChannel(connection)
+    
+    def _accept_loop(self):
+        """Hand each client connection to its own thread"""
+        while not self._stop_event.is_set():
+            try:
+                channel = self._accept()
+            except OSError as e:
+                if not self._stop_event.is_set():
+                    logger.error(f"Command endpoint error: {e}")
+                break
+            
+            if self._stop_event.is_set():
+                channel.close()
+                break
+            
+            self.connections += 1
+            Thread(target=self._serve, args=(channel,), name='ipc-connection', daemon=True).start()
+    
+    def _serve(self, channel):
+        """Read a connection's requests and queue them for execution"""
+        pending = queue.Queue(maxsize=self.max_pending)
+        writer = Thread(target=self._write_responses, args=(channel, pending),
+                        name='ipc-writer', daemon=True)
+        writer.start()
+        
+        try:
+            while True:
+                line = channel.read_line()
+                if line is None:
+                    break
+                if line.strip():
+                    self.requests += 1
+                    pending.put(self._executor.submit(self._handle, line))
+        except OSError as e:
+            logger.debug(f"Command connection closed: {e}")
+        finally:
+            pending.put(None)
+            writer.join()
+            channel.close()
+    
+    def _write_responses(self, channel, pending: queue.Queue):
+        """Write responses in request order"""
+        while True:
+            future = pending.get()
+            if future is None:
+                return
+            
+            try:
+                channel.write_line(json.dumps(future.result(), default=str).encode('utf-8') + b'\n')
+            except OSError as e:
+                logger.debug(f"Could not send response: {e}")
+    
+    def _handle(self, line: bytes) -> Dict:
+        """Run one request through Jarvis"""
+        try:
+            request = json.loads(line)
+            command = request['command']
+            if not isinstance(command, str):
+                raise TypeError('command must be a string')
+        except (ValueError, KeyError, TypeError) as e:
+            return {'id': None, 'success': False, 'response': f"Invalid request: {e}"}
+        
+        try:
+            result = self.jarvis.process_command(command, speak_response=bool(request.get('speak')),
+                                                 source='ipc')
+        except Exception as e:
+            logger.error(f"Error processing forwarded command: {e}")
+            result = {'success': False, 'response': f"Error processing command: {e}"}
+        
+        return dict(result, id=request.get('id'))
@@ -3,14 +3,23 @@ Main Jarvis Controller
 Central control system for Jarvis V2
 """
 
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from threading import Thread, Event
-from typing import Optional, Callable
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
 from utils.logger import get_logger, log_startup
 from utils.config_manager import get_config
 from utils.helpers import get_time_greeting
 from core.command_processor import CommandProcessor
-from voice import SpeechRecognizer, TextToSpeech, WakeWordDetector, SimpleWakeWordDetector
+from core.speculation import CommandSpeculator
+from core.scheduler import CommandScheduler
+from core.events import EventBus, COMMAND_RECEIVED, RESPONSE, SPOKEN
 from personality.response_generator import ResponseGenerator
+import voice
+
+if TYPE_CHECKING:
+    from voice import SpeechRecognizer, TextToSpeech
 
 logger = get_logger()
 config = get_config()
@@ -19,45 +28,168 @@ config = get_config()
 class Jarvis:
     """Main Jarvis AI Assistant Controller"""
     
+    # Subsystem readiness states
+    STATE_STARTING = 'starting'
+    STATE_READY = 'ready'
+    STATE_UNAVAILABLE = 'unavailable'
+    STATE_FAILED = 'failed'
+    STATE_DISABLED = 'disabled'
+    
+    # Said when the wake word is heard
+    WAKE_ACKNOWLEDGMENT = "Yes, sir?"
+    
     def __init__(self):
         log_startup()
         logger.info("Initializing Jarvis V2...")
         
-        # Core components
-        self.command_processor = CommandProcessor()
         self.response_generator = ResponseGenerator()
-        
-        # Voice components
         self.voice_enabled = config.get('voice.enabled', True)
-        if self.voice_enabled:
-            self.speech_recognizer = SpeechRecognizer()
-            self.text_to_speech = TextToSpeech()
-            
-            # Wake word detection
-            self.wake_word_enabled = config.get('voice.wake_word_enabled', False)
-            if self.wake_word_enabled:
-                try:
-                    self.wake_word_detector = WakeWordDetector()
-                except:
-                    self.wake_word_detector = SimpleWakeWordDetector()
-            else:
-                self.wake_word_detector = None
-        else:
-            self.speech_recognizer = None
-            self.text_to_speech = None
-            self.wake_word_detector = None
+        self.wake_word_enabled = self.voice_enabled and config.get('voice.wake_word_enabled', False)
+        self.interrupt_on_command = config.get('voice.interrupt_on_command', True)
+        self.wake_word_preroll = config.get('voice.wake_word_preroll', 0.15)
+        self.wake_word_followup = config.get('voice.wake_word_followup_timeout', 1.0)
+        
+        # Typed events for any number of subscribers (GUI, API clients, ...)
+        self.events = EventBus(config.get('advanced.event_queue_size', 256),
+                               config.get('advanced.event_drop_policy', 'drop_oldest'))
+        
+        # Subsystems start concurrently; voice keeps warming up (microphone
+        # calibration, TTS and wake word engines) after the command pipeline is ready
+        self._subsystems: Dict[str, Future] = {}
+        self._subsystem_states: Dict[str, str] = {}
+        self._subsystem_times: Dict[str, float] = {}
+        startup_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='startup')
+        
+        self._start_subsystem(startup_executor, 'commands', self._init_commands)
+        self._start_subsystem(startup_executor, 'speech_recognition',
+                              lambda: voice.SpeechRecognizer(), enabled=self.voice_enabled)
+        self._start_subsystem(startup_executor, 'text_to_speech', self._init_text_to_speech,
+                              enabled=self.voice_enabled)
+        self._start_subsystem(startup_executor, 'wake_word', self._init_wake_word,
+                              enabled=self.wake_word_enabled)
+        startup_executor.shutdown(wait=False)
+        
+        # Text commands only need the command pipeline
+        self._subsystems['commands'].result()
         
         # State
         self.is_running = False
         self.listening_continuously = False
         self.stop_event = Event()
         
-        # Callbacks
-        self.on_command_callback: Optional[Callable] = None
-        self.on_response_callback: Optional[Callable] = None
+        # Responses to commands that finish in the background, and speech
+        # requested before the TTS engine has started
+        self._speech_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='speech')
         
         logger.info("Jarvis V2 initialized successfully")
     
+    def _init_commands(self) -> CommandProcessor:
+        """Build the command pipeline"""
+        self._command_processor = CommandProcessor(self.events)
+        self.scheduler = CommandScheduler(self._command_processor)
+        self.speculator = CommandSpeculator(self._command_processor)
+        return self._command_processor
+    
+    @property
+    def command_processor(self) -> CommandProcessor:
+        return self._command_processor
+    
+    @command_processor.setter
+    def command_processor(self, processor: CommandProcessor):
+        """Replace the command processor, e.g. with a subclass that adds commands"""
+        if processor.events is None:
+            processor.events = self.events
+        self._command_processor = processor
+        self.scheduler.command_processor = processor
+        self.speculator.command_processor = processor
+        self.speculator.reset()
+    
+    def _init_text_to_speech(self):
+        """Build the TTS engine and start pre-rendering the stock phrases"""
+        text_to_speech = voice.TextToSpeech()
+        text_to_speech.warm_cache(self.response_generator.get_fixed_phrases() +
+                                  [self.WAKE_ACKNOWLEDGMENT])
+        return text_to_speech
+    
+    def _init_wake_word(self):
+        """Build the wake word detector, falling back to speech recognition"""
+        try:
+            return voice.WakeWordDetector()
+        except:
+            return voice.SimpleWakeWordDetector(recognizer=self._subsystem('speech_recognition'))
+    
+    def _start_subsystem(self, executor: ThreadPoolExecutor, name: str,
+                         factory: Callable[[], Any], enabled: bool = True):
+        """Start building a subsystem on the startup executor"""
+        if not enabled:
+            future = Future()
+            future.set_result(None)
+            self._subsystems[name] = future
+            self._subsystem_states[name] = self.STATE_DISABLED
+            return
+        
+        def build():
+            start = time.perf_counter()
+            try:
+                subsystem = factory()
+            except Exception as e:
+                self._subsystem_states[name] = self.STATE_FAILED
+                logger.error(f"Subsystem {name} failed to start: {e}")
+                raise
+            finally:
+                self._subsystem_times[name] = time.perf_counter() - start
+            
+            # Components that degrade gracefully report it through 'available'
+            if getattr(subsystem, 'available', True):
+                self._subsystem_states[name] = self.STATE_READY
+            else:
+                self._subsystem_states[name] = self.STATE_UNAVAILABLE
+            logger.info(f"Subsystem {name} {self._subsystem_states[name]} "
+                        f"in {self._subsystem_times[name] * 1000:.0f} ms")
+            return subsystem
+        
+        self._subsystem_states[name] = self.STATE_STARTING
+        self._subsystems[name] = executor.submit(build)
+    
+    def _subsystem(self, name: str, timeout: Optional[float] = None):
+        """Get a subsystem, waiting for it to start; None if disabled or failed"""
+        try:
+            return self._subsystems[name].result(timeout)
+        except Exception:
+            return None
+    
+    def get_readiness(self) -> Dict[str, Dict]:
+        """Get the readiness state and startup time of each subsystem"""
+        return {
+            name: {
+                'state': state,
+                'startup_ms': round(self._subsystem_times[name] * 1000, 1)
+                if name in self._subsystem_times else None
+            }
+            for name, state in self._subsystem_states.items()
+        }
+    
+    def is_ready(self, name: str) -> bool:
+        """Check whether a subsystem has started successfully"""
+        return self._subsystem_states.get(name) == self.STATE_READY
+    
+    def wait_until_ready(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Wait for a subsystem to finish starting; True if it is ready"""
+        self._subsystem(name, timeout)
+        return self.is_ready(name)
+    
+    @property
+    def speech_recognizer(self) -> Optional['SpeechRecognizer']:
+        return self._subsystem('speech_recognition')
+    
+    @property
+    def text_to_speech(self) -> Optional['TextToSpeech']:
+        return self._subsystem('text_to_speech')
+    
+    @property
+    def wake_word_detector(self):
+        return self._subsystem('wake_word')
+    
     def start(self):
         """Start Jarvis"""
         if self.is_running:
@@ -86,19 +218,31 @@ class Jarvis:
         if self.listening_continuously:
             self.stop_listening()
         
-        if self.wake_word_detector:
+        if self.is_ready('wake_word'):
             self.wake_word_detector.stop()
         
+        self.interrupt_speech()
+        
+        # Release the microphone; listening opens it again
+        if self.voice_enabled:
+            voice.get_audio_bus().stop()
+        
         logger.info("Jarvis stopped")
     
-    def process_command(self, command: str, speak_response: bool = True) -> dict:
+    def process_command(self, command: str, speak_response: bool = True,
+                        source: str = 'text', priority: Optional[int] = None,
+                        wait: bool = True) -> dict:
         """
         Process a text command
         
         Args:
             command: The command text
             speak_response: Whether to speak the response
-            
+            source: Where the command came from (text, voice, ...)
+            priority: Scheduler priority, derived from the command if not given
+            wait: If False, return once the command is queued and respond
+                  (speech and callbacks) when it finishes
+        
         Returns:
             dict with processing result
         """
@@ -108,12 +252,34 @@ class Jarvis:
                 'response': 'Jarvis is not running'
             }
         
-        # Trigger callback
-        if self.on_command_callback:
-            self.on_command_callback(command)
+        job = self._submit_command(command, priority, source)
         
-        # Process command
-        result = self.command_processor.process(command)
+        if not wait:
+            job.future.add_done_callback(lambda future: self._speech_executor.submit(
+                self._finish_command, command, future.result(), speak_response
+            ))
+            return {
+                'success': True,
+                'queued': True,
+                'response': ''
+            }
+        
+        return self._finish_command(command, job.result(), speak_response)
+    
+    def _submit_command(self, command: str, priority: Optional[int], source: str):
+        """Announce a command and queue it for processing"""
+        self.events.publish(COMMAND_RECEIVED, command=command, source=source)
+        
+        # Don't keep talking over the user
+        if self.interrupt_on_command:
+            self.interrupt_speech()
+        
+        # Process command (queued behind or alongside other clients' commands)
+        return self.scheduler.submit(command, priority, source)
+    
+    def _finish_command(self, command: str, result: dict, speak_response: bool) -> dict:
+        """Respond to a processed command"""
+        self.events.publish(RESPONSE, command=command, result=result)
         
         # Handle confirmation required
         if result.get('requires_confirmation'):
@@ -121,21 +287,56 @@ class Jarvis:
             return result
         
         # Speak response
-        if speak_response and self.text_to_speech:
+        if speak_response:
             self.speak(result['response'])
         
-        # Trigger callback
-        if self.on_response_callback:
-            self.on_response_callback(result)
-        
         logger.response(result['response'])
         
         return result
     
-    def process_voice_command(self) -> dict:
+    async def process_command_async(self, command: str, speak_response: bool = True,
+                                    source: str = 'text', priority: Optional[int] = None) -> dict:
+        """
+        Process a text command without blocking the event loop
+        
+        Args:
+            command: The command text
+            speak_response: Whether to speak the response
+            source: Where the command came from (text, voice, ...)
+            priority: Scheduler priority, derived from the command if not given
+        
+        Returns:
+            dict with processing result
+        """
+        if not self.is_running:
+            return {
+                'success': False,
+                'response': 'Jarvis is not running'
+            }
+        
+        import asyncio
+        
+        job = self._submit_command(command, priority, source)
+        result = await asyncio.wrap_future(job.future)
+        return self._finish_command(command, result, speak_response)
+    
+    def emergency_stop(self) -> int:
+        """Cancel every queued and running command"""
+        cancelled = self.scheduler.cancel_all('emergency stop')
+        logger.warning(f"Emergency stop: cancelled {cancelled} command(s)")
+        return cancelled
+    
+    def process_voice_command(self, wait: bool = True, audio_position: Optional[int] = None,
+                              timeout: Optional[float] = None) -> dict:
         """
         Listen for and process a voice command
         
+        Args:
+            wait: If False, return once the command is queued
+            audio_position: Audio bus position to start listening from (the
+                            end of the wake word), instead of now
+            timeout: Seconds to wait for speech to start
+        
         Returns:
             dict with processing result
         """
@@ -147,8 +348,14 @@ class Jarvis:
         
         logger.info("Listening for voice command...")
         
-        # Listen
-        listen_result = self.speech_recognizer.listen()
+        # Listen, preparing likely commands from partial transcripts
+        self.speculator.reset()
+        listen_result = self.speech_recognizer.listen(
+            timeout=timeout,
+            on_partial=self.speculator.feed,
+            start_position=audio_position,
+            preroll=self.wake_word_preroll if audio_position is not None else 0.0
+        )
         
         if not listen_result['success']:
             error = listen_result.get('error', 'unknown')
@@ -161,7 +368,10 @@ class Jarvis:
         
         # Process command
         command = listen_result['text']
-        return self.process_command(command, speak_response=True)
+        if audio_position is not None:
+            command = self._strip_wake_word(command)
+        self.speculator.confirm(command)
+        return self.process_command(command, speak_response=True, source='voice', wait=wait)
     
     def start_listening(self):
         """Start continuous voice listening"""
@@ -180,7 +390,8 @@ class Jarvis:
             
             while self.listening_continuously and not self.stop_event.is_set():
                 try:
-                    self.process_voice_command()
+                    # Keep listening while the command runs so "stop that" can cancel it
+                    self.process_voice_command(wait=False)
                 except Exception as e:
                     logger.error(f"Error in listening loop: {e}")
             
@@ -201,20 +412,74 @@ class Jarvis:
             logger.warning("Wake word detection not available")
             return
         
-        def on_wake_word():
+        def on_wake_word(audio_position: Optional[int] = None, command: Optional[str] = None):
             logger.info("Wake word detected - processing command")
-            self.speak("Yes, sir?")
+            self.interrupt_speech()
+            
+            if command:
+                self.process_command(command, source='voice')
+                return
+            
+            # "Jarvis, open chrome" in one breath: recognize what followed the
+            # wake word, which the audio bus has kept, without a prompt
+            if audio_position is not None:
+                result = self.process_voice_command(audio_position=audio_position,
+                                                    timeout=self.wake_word_followup)
+                if result.get('error') != 'timeout':
+                    return
+            
+            # Nothing followed; finish prompting before listening, so the
+            # microphone doesn't hear it
+            self.speak(self.WAKE_ACKNOWLEDGMENT, wait=True)
             self.process_voice_command()
         
         self.wake_word_detector.start(on_wake_word)
     
-    def speak(self, text: str, wait: bool = True):
-        """Speak text using text-to-speech"""
+    def _strip_wake_word(self, command: str) -> str:
+        """Remove the wake word if the pre-roll audio caught it"""
+        wake_word = re.escape(config.get('voice.wake_word', 'jarvis'))
+        return re.sub(rf'^\s*(hey\s+)?{wake_word}\b[\s,.!?]*', '', command, flags=re.I) or command
+    
+    def speak(self, text: str, wait: bool = False, priority: Optional[int] = None):
+        """
+        Speak text using text-to-speech
+        
+        Args:
+            text: Text to speak
+            wait: Whether to wait until it has been spoken; otherwise it is
+                  queued and this returns immediately
+            priority: Speech priority (see voice.text_to_speech), lower first
+        """
+        # Don't hold up the caller while the engine is still warming up
+        if not wait and not self._subsystems['text_to_speech'].done():
+            self._speech_executor.submit(self.speak, text, wait, priority)
+            return
+        
         if self.text_to_speech and self.text_to_speech.available:
-            self.text_to_speech.speak(text, wait)
+            options = {} if priority is None else {'priority': priority}
+            self.text_to_speech.speak(text, wait, on_finished=self._on_spoken, **options)
         else:
             logger.debug(f"[JARVIS WOULD SAY]: {text}")
     
+    def _on_spoken(self, utterance):
+        """Publish what happened to a queued utterance"""
+        started = utterance.started_at or utterance.finished_at
+        first_audio = utterance.time_to_first_audio
+        self.events.publish(
+            SPOKEN,
+            text=utterance.text,
+            outcome=utterance.outcome,
+            duration_ms=round((utterance.finished_at - started) * 1000, 1),
+            time_to_first_audio_ms=round(first_audio * 1000, 1) if first_audio is not None else None,
+            queue_depth=self.text_to_speech.queue_depth()
+        )
+    
+    def interrupt_speech(self) -> int:
+        """Stop speaking and drop queued speech; returns how many utterances were cut"""
+        if not self.is_ready('text_to_speech'):
+            return 0
+        return self.text_to_speech.interrupt()
+    
     def set_voice_rate(self, rate: int):
         """Set speech rate"""
         if self.text_to_speech:
@@ -247,12 +512,20 @@ class Jarvis:
         return False
     
     def on_command(self, callback: Callable):
-        """Register callback for when command is received"""
-        self.on_command_callback = callback
+        """
+        Register a callback for received commands, called with the command text
+        Callbacks run on an event dispatch thread, not the command thread.
+        """
+        return self.events.listen(lambda event: callback(event['command']),
+                                  types=[COMMAND_RECEIVED], name=callback.__qualname__)
     
     def on_response(self, callback: Callable):
-        """Register callback for when response is generated"""
-        self.on_response_callback = callback
+        """
+        Register a callback for responses, called with the result dict
+        Callbacks run on an event dispatch thread, not the command thread.
+        """
+        return self.events.listen(lambda event: callback(event['result']),
+                                  types=[RESPONSE], name=callback.__qualname__)
 
 
 # Global Jarvis instance
@@ -0,0 +1,378 @@
+"""
+Command Scheduler for Jarvis V2
+Queues commands by priority and serializes commands that share a resource
+"""
+
+import heapq
+import itertools
+import time
+from concurrent.futures import Future
+from threading import Condition, Lock, Thread
+from typing import Dict, List, Optional, Set
+from utils.logger import get_logger
+from utils.config_manager import get_config
+from utils.helpers import normalize_app_name
+from utils.cancellation import CancellationToken
+
+logger = get_logger()
+config = get_config()
+
+# Priorities (lower runs first)
+PRIORITY_CRITICAL = 0
+PRIORITY_HIGH = 1
+PRIORITY_NORMAL = 2
+PRIORITY_LOW = 3
+
+PRIORITY_NAMES = ('critical', 'high', 'normal', 'low')
+
+
+class ScheduledCommand:
+    """A command waiting in or running on the scheduler"""
+    
+    def __init__(self, command: str, priority: int, resources: Set[str], source: str,
+                 timeout: Optional[float] = None):
+        self.command = command
+        self.priority = priority
+        self.resources = resources
+        self.source = source
+        self.future: Future = Future()
+        self.token = CancellationToken(timeout)
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+    
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+    
+    def result(self, timeout: Optional[float] = None) -> Dict:
+        """Wait for the command's result"""
+        return self.future.result(timeout)
+    
+    def __repr__(self):
+        return f"ScheduledCommand({self.command!r}, {PRIORITY_NAMES[self.priority]})"
+
+
+class CommandScheduler:
+    """
+    Priority scheduler for commands from the GUI, voice loop and other clients
+    
+    Commands are queued by priority and run on a small pool of worker
+    threads. Each command claims the resources it touches (an application,
+    a file, the audio device, the screen); a command whose resources are
+    held waits while later, independent commands go ahead of it.
+    
+    Critical commands (power actions) never queue: they start on their own
+    thread straight away, and power actions cancel all lower-priority work.
+    A "cancel" / "stop that" command cancels everything else except
+    critical commands; only an emergency stop (cancel_all) stops those.
+    
+    Every command carries a cancellation token whose deadline (the
+    processor's command_timeout) counts from submission. A queued command
+    that is cancelled or runs out of time resolves at once. A running one
+    has its token cancelled so it can stop at its next checkpoint and
+    return partial results; if it has not finished cancel_grace seconds
+    later, its caller gets a cancelled result anyway, which bounds how long
+    any caller waits.
+    """
+    
+    # Intents that run ahead of normal commands
+    INTENT_PRIORITIES = {
+        'shutdown': PRIORITY_CRITICAL,
+        'restart': PRIORITY_CRITICAL,
+        'sleep': PRIORITY_CRITICAL,
+        'lock_screen': PRIORITY_CRITICAL,
+        'time': PRIORITY_HIGH,
+        'date': PRIORITY_HIGH,
+        'greeting': PRIORITY_HIGH,
+        'status': PRIORITY_HIGH,
+        'help': PRIORITY_HIGH,
+        'thank': PRIORITY_HIGH,
+        'find_files': PRIORITY_LOW,
+    }
+    
+    # Intents that cancel everything of lower priority
+    PREEMPTING_INTENTS = {'shutdown', 'restart', 'sleep'}
+    
+    def __init__(self, command_processor, workers: Optional[int] = None):
+        self.command_processor = command_processor
+        self.workers = workers or config.get('advanced.scheduler_workers', 4)
+        self.cancel_grace = config.get('advanced.cancel_grace_period', 2)
+        
+        self._condition = Condition()
+        self._queue: List = []
+        self._sequence = itertools.count()
+        self._running: Set[ScheduledCommand] = set()
+        self._busy_resources: Set[str] = set()
+        self._threads: List[Thread] = []
+        self._result_lock = Lock()
+        
+        # Deadlines and grace periods watched by a timer thread
+        self._timer_condition = Condition()
+        self._timers: List = []
+        self._timer_thread: Optional[Thread] = None
+        
+        # Per-priority metrics
+        self._stats = {name: {'submitted': 0, 'started': 0, 'cancelled': 0,
+                              'total_wait': 0.0, 'max_wait': 0.0}
+                       for name in PRIORITY_NAMES}
+    
+    def submit(self, command: str, priority: Optional[int] = None,
+               source: str = 'text') -> ScheduledCommand:
+        """
+        Queue a command
+        Priority and resources are derived from the command's intents unless
+        a priority is given.
+        """
+        results = self.command_processor.analyze(command)
+        intents = {result['intent'] for result in results}
+        
+        if intents == {'cancel'}:
+            return self._submit_cancel(command, source)
+        
+        if priority is None:
+            priority = min(self.INTENT_PRIORITIES.get(intent, PRIORITY_NORMAL) for intent in intents)
+        
+        job = ScheduledCommand(command, priority, self._resources(results), source,
+                               self.command_processor.command_timeout)
+        if job.token.deadline is not None:
+            self._add_timer(job.token.deadline, 'deadline', job)
+        
+        with self._condition:
+            self._stats[PRIORITY_NAMES[priority]]['submitted'] += 1
+            
+            if intents & self.PREEMPTING_INTENTS:
+                self._cancel_below(priority, f"preempted by '{command}'")
+            
+            if priority == PRIORITY_CRITICAL:
+                self._start(job)
+                Thread(target=self._run, args=(job,), name='command-critical', daemon=True).start()
+            else:
+                self._ensure_workers()
+                heapq.heappush(self._queue, (priority, next(self._sequence), job))
+                self._condition.notify()
+        
+        logger.debug(f"Scheduled {job} from {source}, resources: {sorted(job.resources) or 'none'}")
+        return job
+    
+    def _submit_cancel(self, command: str, source: str) -> ScheduledCommand:
+        """Handle a "cancel" command by cancelling everything below critical"""
+        job = ScheduledCommand(command, PRIORITY_CRITICAL, set(), source)
+        
+        with self._condition:
+            count = self._cancel_below(PRIORITY_CRITICAL, f"cancelled by '{command}'")
+        
+        logger.info(f"'{command}' from {source} cancelled {count} command(s)")
+        self._resolve(job, {
+            'success': True,
+            'response': self.command_processor.response_generator.generate('cancelled', count=count),
+            'intent': 'cancel',
+            'cancelled_count': count
+        })
+        return job
+    
+    def process(self, command: str, priority: Optional[int] = None,
+                source: str = 'text', timeout: Optional[float] = None) -> Dict:
+        """Queue a command and wait for its result"""
+        return self.submit(command, priority, source).result(timeout)
+    
+    def cancel(self, job: ScheduledCommand, reason: str = 'cancelled') -> bool:
+        """Cancel a queued or running command; returns False if it already finished"""
+        with self._condition:
+            return self._cancel(job, reason)
+    
+    def cancel_all(self, reason: str = 'cancelled') -> int:
+        """Cancel every queued and running command, critical ones included (emergency stop)"""
+        with self._condition:
+            return self._cancel_below(PRIORITY_CRITICAL - 1, reason)  # every priority
+    
+    def get_stats(self) -> Dict:
+        """Get queue depth and wait time metrics per priority"""
+        with self._condition:
+            depth = {name: 0 for name in PRIORITY_NAMES}
+            for _, _, job in self._queue:
+                if not job.cancelled:
+                    depth[PRIORITY_NAMES[job.priority]] += 1
+            
+            queues = {}
+            for name, stats in self._stats.items():
+                queues[name] = dict(
+                    stats,
+                    depth=depth[name],
+                    average_wait=stats['total_wait'] / stats['started'] if stats['started'] else 0.0
+                )
+            
+            return {
+                'queues': queues,
+                'running': len(self._running),
+                'busy_resources': sorted(self._busy_resources),
+                'workers': len(self._threads)
+            }
+    
+    def _resources(self, results: List[Dict]) -> Set[str]:
+        """Get the resources the recognized sub-commands touch"""
+        resources = set()
+        
+        for result in results:
+            intent = result['intent']
+            parameters = result['parameters']
+            target = parameters.get('target')
+            
+            if intent in ('launch_app', 'close_app', 'switch_app') and target:
+                resources.add(f"app:{normalize_app_name(target).lower()}")
+            elif intent in ('open_file', 'delete_file') and target:
+                resources.add(f"file:{target.lower()}")
+            elif intent == 'copy_file' and target:
+                resources.add(f"file:{target.lower()}")
+                if parameters.get('destination'):
+                    resources.add(f"file:{parameters['destination'].lower()}")
+            elif intent == 'create_folder' and parameters.get('name'):
+                resources.add(f"file:{parameters['name'].lower()}")
+            elif intent in ('volume', 'mute'):
+                resources.add('audio')
+            elif intent in ('screenshot', 'screenshot_window'):
+                resources.add('screen')
+            elif intent in ('maximize', 'minimize'):
+                resources.add('window')
+        
+        return resources
+    
+    def _ensure_workers(self):
+        """Start worker threads on first use"""
+        while len(self._threads) < self.workers:
+            thread = Thread(target=self._worker, name=f'command-{len(self._threads)}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+    
+    def _worker(self):
+        """Run queued commands whose resources are free"""
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    self._condition.wait()
+                    job = self._next_job()
+                self._start(job)
+            
+            self._run(job)
+    
+    def _next_job(self) -> Optional[ScheduledCommand]:
+        """Take the highest-priority queued command that can run now"""
+        # Pop in heap order, setting aside commands whose resources are held
+        deferred = []
+        job = None
+        
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            if entry[2].cancelled:
+                self._cancel(entry[2], entry[2].token.reason)
+            elif entry[2].resources & self._busy_resources:
+                deferred.append(entry)
+            else:
+                job = entry[2]
+                break
+        
+        for entry in deferred:
+            heapq.heappush(self._queue, entry)
+        return job
+    
+    def _start(self, job: ScheduledCommand):
+        """Mark a command as running (caller holds the condition)"""
+        job.started_at = time.monotonic()
+        wait = job.started_at - job.submitted_at
+        
+        stats = self._stats[PRIORITY_NAMES[job.priority]]
+        stats['started'] += 1
+        stats['total_wait'] += wait
+        stats['max_wait'] = max(stats['max_wait'], wait)
+        
+        self._running.add(job)
+        self._busy_resources |= job.resources
+    
+    def _run(self, job: ScheduledCommand):
+        """Process a command and release its resources"""
+        try:
+            result = self.command_processor.process(job.command, job.token)
+        except Exception as e:
+            logger.error(f"Error processing scheduled command '{job.command}': {e}")
+            result = {'success': False, 'response': f"Error: {e}", 'intent': 'unknown'}
+        
+        self._resolve(job, result)
+        
+        with self._condition:
+            self._running.discard(job)
+            self._busy_resources -= job.resources
+            self._condition.notify_all()
+    
+    def _resolve(self, job: ScheduledCommand, result: Dict):
+        """Set a command's result unless it was already resolved"""
+        with self._result_lock:
+            if not job.future.done():
+                job.future.set_result(result)
+    
+    def _cancel(self, job: ScheduledCommand, reason: str) -> bool:
+        """
+        Cancel a command (caller holds the condition)
+        A running command gets cancel_grace seconds to stop and report
+        partial results before its caller is answered without them.
+        """
+        if job.future.done():
+            return False
+        
+        job.token.cancel(reason)
+        reason = job.token.reason
+        self._stats[PRIORITY_NAMES[job.priority]]['cancelled'] += 1
+        logger.info(f"Cancelled {job}: {reason}")
+        
+        if job in self._running:
+            self._add_timer(time.monotonic() + self.cancel_grace, 'grace', job)
+        else:
+            self._resolve(job, self._cancelled_result(job))
+        return True
+    
+    def _cancelled_result(self, job: ScheduledCommand) -> Dict:
+        """Result for a command that was stopped without a result of its own"""
+        reason = job.token.reason
+        return {
+            'success': False,
+            'cancelled': True,
+            'reason': reason,
+            'response': self.command_processor.response_generator.generate('cancelled', reason=reason),
+            'intent': 'cancelled'
+        }
+    
+    def _add_timer(self, when: float, kind: str, job: ScheduledCommand):
+        """Check on a command at its deadline or the end of its grace period"""
+        with self._timer_condition:
+            heapq.heappush(self._timers, (when, next(self._sequence), kind, job))
+            
+            if self._timer_thread is None:
+                self._timer_thread = Thread(target=self._watch, name='command-timers', daemon=True)
+                self._timer_thread.start()
+            self._timer_condition.notify()
+    
+    def _watch(self):
+        """Cancel commands past their deadline and answer ones that ignore cancellation"""
+        while True:
+            with self._timer_condition:
+                while not self._timers or self._timers[0][0] > time.monotonic():
+                    timeout = self._timers[0][0] - time.monotonic() if self._timers else None
+                    self._timer_condition.wait(timeout)
+                _, _, kind, job = heapq.heappop(self._timers)
+            
+            if job.future.done():
+                continue
+            
+            with self._condition:
+                if kind == 'deadline':
+                    self._cancel(job, 'timed out')
+                    self._condition.notify_all()
+                else:
+                    logger.warning(f"{job} did not stop within {self.cancel_grace}s")
+                    self._resolve(job, self._cancelled_result(job))
+    
+    def _cancel_below(self, priority: int, reason: str) -> int:
+        """Cancel queued and running commands of lower priority (caller holds the condition)"""
+        jobs = [entry[2] for entry in self._queue] + list(self._running)
+        cancelled = sum(self._cancel(job, reason) for job in jobs if job.priority > priority)
+        self._condition.notify_all()
+        return cancelled
@@ -0,0 +1,152 @@
+"""
+Command Speculation for Jarvis V2
+Pre-warms likely commands from partial speech recognition hypotheses
+"""
+
+import time
+from concurrent.futures import Future
+from threading import Lock
+from typing import Dict, Optional, Tuple
+from utils.logger import get_logger
+from utils.config_manager import get_config
+
+logger = get_logger()
+config = get_config()
+
+
+class CommandSpeculator:
+    """
+    Speculative intent recognition on partial transcripts
+    
+    Each partial hypothesis is matched against the intent patterns (bypassing
+    the recognition cache, which is kept for whole commands). Once the same
+    intent and target have been seen in stable_count consecutive partials,
+    the command processor prepares that command in the background
+    (resolving an executable, snapshotting the process table, ...). A newer
+    preparation supersedes one that has not started yet. confirm() never
+    waits: a preparation still running when the final transcript arrives is
+    ignored and the command does its own work, and one for anything else is
+    simply left unused.
+    
+    One speculator follows one utterance at a time; call reset() before
+    listening for the next one.
+    """
+    
+    def __init__(self, command_processor, stable_count: Optional[int] = None):
+        self.command_processor = command_processor
+        self.stable_count = stable_count or config.get('voice.speculation_stable_partials', 2)
+        self.enabled = config.get('voice.speculative_recognition', True)
+        
+        self._lock = Lock()
+        self._last_key: Optional[Tuple[str, str]] = None
+        self._seen = 0
+        self._prepared_key: Optional[Tuple[str, str]] = None
+        self._prepared: Optional[Future] = None
+        self._prepared_at = 0.0
+        
+        # Statistics
+        self.preparations = 0
+        self.hits = 0
+        self.misses = 0
+        self.late = 0
+        self.lead_time = 0.0
+    
+    def reset(self):
+        """Forget the hypotheses of the previous utterance"""
+        with self._lock:
+            self._last_key = None
+            self._seen = 0
+            self._prepared_key = None
+            self._prepared = None
+    
+    def feed(self, partial: str):
+        """Handle a partial hypothesis (called from the recognition thread)"""
+        if not self.enabled or not partial:
+            return
+        
+        # Spelling correction would look partials up in the cache too
+        partial = partial.strip()
+        if not partial:
+            return
+        
+        result = self.command_processor.intent_recognizer._match(partial)
+        intent = result['intent']
+        if intent == 'unknown' or result['confidence'] < 0.3 or \
+           not self.command_processor.can_prepare(intent):
+            with self._lock:
+                self._last_key = None
+                self._seen = 0
+            return
+        
+        key = self._key(result)
+        with self._lock:
+            if key == self._last_key:
+                self._seen += 1
+            else:
+                self._last_key = key
+                self._seen = 1
+            
+            if self._seen < self.stable_count or key == self._prepared_key:
+                return
+            
+            if self._prepared is not None:
+                self._prepared.cancel()
+            self._prepared_key = key
+            self._prepared_at = time.perf_counter()
+            self._prepared = self.command_processor.prepare_async(intent, result['parameters'])
+            self.preparations += 1
+        
+        logger.debug(f"Speculatively preparing {intent} from partial '{partial}'")
+    
+    def confirm(self, text: str) -> bool:
+        """
+        Check the final transcript against the speculation
+        Returns True if a matching preparation has finished; one still queued
+        or running is left behind rather than waited for
+        """
+        with self._lock:
+            key, prepared, started = self._prepared_key, self._prepared, self._prepared_at
+            self._last_key = None
+            self._seen = 0
+            self._prepared_key = None
+            self._prepared = None
+        
+        if key is None:
+            return False
+        
+        result = self.command_processor.intent_recognizer.recognize(
+            self.command_processor.correct_spelling(text))
+        if self._key(result) != key:
+            prepared.cancel()
+            self.misses += 1
+            logger.debug(f"Speculation for {key[0]} discarded by final text '{text}'")
+            return False
+        
+        if not prepared.done():
+            prepared.cancel()
+            self.late += 1
+            logger.debug(f"Preparation of {key[0]} still running at commit - not waiting")
+            return False
+        
+        self.hits += 1
+        self.lead_time += time.perf_counter() - started
+        return True
+    
+    def get_stats(self) -> Dict:
+        """Get speculation statistics"""
+        confirmed = self.hits + self.misses + self.late
+        return {
+            'enabled': self.enabled,
+            'preparations': self.preparations,
+            'hits': self.hits,
+            'misses': self.misses,
+            'late': self.late,
+            'hit_rate': self.hits / confirmed if confirmed else 0.0,
+            'average_lead_time': self.lead_time / self.hits if self.hits else 0.0
+        }
+    
+    @staticmethod
+    def _key(result: Dict) -> Tuple[str, str]:
+        """Intent and normalized target of a recognition result"""
+        target = result['parameters'].get('target') or ''
+        return result['intent'], ' '.join(target.lower().split())
@@ -0,0 +1,248 @@
+"""
+Spell Corrector for Jarvis V2
+Corrects misheard or mistyped command words against a known vocabulary
+"""
+
+import re
+from threading import RLock
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class SpellCorrector:
+    """
+    Symmetric-delete spelling correction index
+    
+    Every vocabulary term is stored under each string obtained by deleting up
+    to max_distance characters from it. A word is looked up by generating its
+    own deletes and checking the terms stored under them, so lookups cost a
+    few dozen dictionary hits regardless of vocabulary size.
+    
+    Terms are grouped by source (intent words, configured apps, discovered
+    apps). Replacing a source only indexes the terms that were added and
+    unindexes the ones that were dropped.
+    """
+    
+    def __init__(self, max_distance: int = 2, min_length: int = 4):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self._sources: Dict[str, Set[str]] = {}
+        self._term_counts: Dict[str, int] = {}
+        self._deletes: Dict[str, Set[str]] = {}
+        self._lock = RLock()
+    
+    def __len__(self):
+        return len(self._term_counts)
+    
+    def set_terms(self, source: str, terms: Iterable[str]):
+        """Replace the terms of a source, updating the index incrementally"""
+        new_terms = self._clean_terms(terms)
+        
+        with self._lock:
+            old_terms = self._sources.get(source, set())
+            for term in old_terms - new_terms:
+                self._remove_term(term)
+            for term in new_terms - old_terms:
+                self._add_term(term)
+            self._sources[source] = new_terms
+        
+        logger.debug(f"Spelling vocabulary '{source}': {len(new_terms)} terms "
+                     f"({len(self._term_counts)} total)")
+    
+    def add_terms(self, source: str, terms: Iterable[str]):
+        """Add terms to a source"""
+        new_terms = self._clean_terms(terms)
+        
+        with self._lock:
+            current = self._sources.setdefault(source, set())
+            for term in new_terms - current:
+                self._add_term(term)
+            current |= new_terms
+    
+    def is_known(self, word: str) -> bool:
+        """Check whether a word is in the vocabulary"""
+        return word.lower() in self._term_counts
+    
+    def lookup(self, word: str) -> Optional[str]:
+        """
+        Get the closest vocabulary term to a word
+        Returns None if the word is known, too short, or has no close term
+        """
+        word = word.lower()
+        max_distance = self._max_distance_for(word)
+        
+        if max_distance == 0 or word in self._term_counts:
+            return None
+        
+        best_term = None
+        best_distance = max_distance
+        checked = set()
+        
+        with self._lock:
+            # Strings k deletes away from the word can only hold terms at distance >= k
+            for level, variants in enumerate(self._variant_levels(word, max_distance)):
+                if best_term is not None and level > best_distance:
+                    break
+                
+                for variant in variants:
+                    for term in self._deletes.get(variant, ()):
+                        if term in checked or abs(len(term) - len(word)) > best_distance:
+                            continue
+                        checked.add(term)
+                        
+                        distance = self._distance(word, term, best_distance)
+                        if distance > best_distance:
+                            continue
+                        
+                        # Ties go to the alphabetically first term so results are stable
+                        if best_term is None or distance < best_distance or term < best_term:
+                            best_term = term
+                            best_distance = distance
+        
+        return best_term
+    
+    def correct(self, text: str) -> str:
+        """
+        Correct the words of a command
+        Joins split compounds ("screen shot") and replaces unknown words with
+        their closest vocabulary term; everything else is left untouched.
+        """
+        return ' '.join(corrected for _, corrected in self.correct_pieces(text))
+    
+    def correct_pieces(self, text: str) -> List[Tuple[str, str]]:
+        """
+        Correct the words of a command, keeping track of what each correction replaced
+        Returns (original, corrected) pairs in order; the original is two
+        words for a joined compound and equals the corrected text for words
+        left alone.
+        """
+        tokens = text.split()
+        if not self._term_counts:
+            return [(token, token) for token in tokens]
+        
+        with self._lock:
+            return self._correct_tokens(tokens)
+    
+    def _correct_tokens(self, tokens: List[str]) -> List[Tuple[str, str]]:
+        """Correct a list of command tokens"""
+        corrected: List[Tuple[str, str]] = []
+        i = 0
+        
+        while i < len(tokens):
+            token = tokens[i]
+            
+            # Join two words whose concatenation is a term, unless both are already known
+            if i + 1 < len(tokens) and token.isalpha():
+                second = re.fullmatch(r'([A-Za-z]+)([,.!?]*)', tokens[i + 1])
+                if second:
+                    joined = (token + second.group(1)).lower()
+                    if self.is_known(joined) and \
+                       not (self.is_known(token) and self.is_known(second.group(1))):
+                        corrected.append((f"{token} {tokens[i + 1]}", joined + second.group(2)))
+                        i += 2
+                        continue
+            
+            # Replace an unknown word, keeping trailing punctuation
+            replacement = token
+            match = re.fullmatch(r'([A-Za-z]+)([,.!?]*)', token)
+            if match:
+                term = self.lookup(match.group(1))
+                if term:
+                    replacement = term + match.group(2)
+            
+            corrected.append((token, replacement))
+            i += 1
+        
+        return corrected
+    
+    def _clean_terms(self, terms: Iterable[str]) -> Set[str]:
+        """Lowercase terms and drop ones that cannot take part in corrections"""
+        return {term.lower() for term in terms
+                if term and term.isalpha() and len(term) >= self.min_length}
+    
+    def _add_term(self, term: str):
+        """Index a term (reference counted across sources)"""
+        count = self._term_counts.get(term, 0)
+        self._term_counts[term] = count + 1
+        if count:
+            return
+        
+        for variant in self._variants(term, self.max_distance):
+            self._deletes.setdefault(variant, set()).add(term)
+    
+    def _remove_term(self, term: str):
+        """Unindex a term once no source refers to it"""
+        count = self._term_counts.get(term, 0) - 1
+        if count > 0:
+            self._term_counts[term] = count
+            return
+        
+        self._term_counts.pop(term, None)
+        for variant in self._variants(term, self.max_distance):
+            terms = self._deletes.get(variant)
+            if terms:
+                terms.discard(term)
+                if not terms:
+                    del self._deletes[variant]
+    
+    def _max_distance_for(self, word: str) -> int:
+        """Allowed edit distance for a word of this length"""
+        if len(word) < self.min_length:
+            return 0
+        if len(word) < 7:
+            return min(1, self.max_distance)
+        return self.max_distance
+    
+    @classmethod
+    def _variants(cls, word: str, max_distance: int) -> Set[str]:
+        """Get the word and every string made by deleting up to max_distance characters"""
+        variants = set()
+        for level in cls._variant_levels(word, max_distance):
+            variants |= level
+        return variants
+    
+    @staticmethod
+    def _variant_levels(word: str, max_distance: int) -> List[Set[str]]:
+        """Get the strings made by deleting exactly 0, 1, ... max_distance characters"""
+        levels = [{word}]
+        seen = {word}
+        
+        for _ in range(max_distance):
+            next_level = set()
+            for current in levels[-1]:
+                if len(current) <= 1:
+                    continue
+                for i in range(len(current)):
+                    next_level.add(current[:i] + current[i + 1:])
+            next_level -= seen
+            seen |= next_level
+            levels.append(next_level)
+        
+        return levels
+    
+    @staticmethod
+    def _distance(a: str, b: str, limit: int) -> int:
+        """Optimal string alignment distance, or limit + 1 once it exceeds limit"""
+        if a == b:
+            return 0
+        
+        previous_row = None
+        row = list(range(len(b) + 1))
+        
+        for i in range(1, len(a) + 1):
+            before_row, previous_row = previous_row, row
+            row = [i] + [0] * len(b)
+            
+            for j in range(1, len(b) + 1):
+                cost = 0 if a[i - 1] == b[j - 1] else 1
+                row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+                
+                if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                    row[j] = min(row[j], before_row[j - 2] + 1)
+            
+            if min(row) > limit:
+                return limit + 1
+        
+        return row[len(b)]
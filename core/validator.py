@@ -55,6 +55,13 @@ class Validator:
         
         return True, None, None
     
+    def _validate_switch_app(self, params: Dict) -> Tuple[bool, Optional[str], Optional[str]]:
+        """Validate app switch command"""
+        if not params.get('target'):
+            return False, "No application specified", None
+        
+        return True, None, None
+    
     def _validate_screenshot(self, params: Dict) -> Tuple[bool, Optional[str], Optional[str]]:
         """Validate screenshot command"""
         # Check if save path is valid
@@ -133,6 +140,27 @@ class Validator:
         
         return True, None, None
     
+    def _validate_find_files(self, params: Dict) -> Tuple[bool, Optional[str], Optional[str]]:
+        """Validate file search command"""
+        if not params.get('query'):
+            return False, "No search query specified", None
+        
+        return True, None, None
+    
+    def _validate_copy_file(self, params: Dict) -> Tuple[bool, Optional[str], Optional[str]]:
+        """Validate file copy command"""
+        if not params.get('target'):
+            return False, "No file or folder specified", None
+        
+        destination = params.get('destination')
+        if not destination:
+            return False, "No destination specified", None
+        
+        if self._is_system_path(destination):
+            return False, "Cannot copy into system files or directories", None
+        
+        return True, None, None
+    
     def _validate_create_folder(self, params: Dict) -> Tuple[bool, Optional[str], Optional[str]]:
         """Validate create folder command"""
         name = params.get('name')
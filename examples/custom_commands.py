@@ -1,5 +1,10 @@
 """
 Example: Custom command handler
+
+The patterns that trigger these intents come from the intent catalog
+(advanced.intent_catalog, default config/intents.json). Copy
+config/intents.example.json there to try this example; edits to the
+catalog are picked up without restarting Jarvis.
 """
 
 from core import get_jarvis, CommandProcessor
@@ -8,6 +13,9 @@ from core import get_jarvis, CommandProcessor
 class CustomCommandProcessor(CommandProcessor):
     """Custom command processor with additional commands"""
     
+    # Handlers of these intents also take a cancellation token
+    CANCELLABLE_INTENTS = CommandProcessor.CANCELLABLE_INTENTS | {'open_project'}
+    
     def _execute_custom_greeting(self, params):
         """Custom greeting command"""
         return {
@@ -16,12 +24,18 @@ class CustomCommandProcessor(CommandProcessor):
             'intent': 'custom_greeting'
         }
     
-    def _execute_open_project(self, params):
-        """Open specific project"""
+    def _execute_open_project(self, params, token):
+        """
+        Open specific project
+        Handlers listed in CANCELLABLE_INTENTS also take a token and can stop early when the command is
+        cancelled ("stop that") or runs out of time.
+        """
         project_name = params.get('name', 'default')
         
         # Custom logic to open project
         # For example, open VSCode with specific folder
+        if token.cancelled:
+            return self._cancelled_result('open_project', token.reason)
         
         return {
             'success': True,
@@ -30,7 +44,7 @@ class CustomCommandProcessor(CommandProcessor):
         }
 
 
-# Use custom processor
+# Use custom processor; the scheduler and event bus switch over to it
 jarvis = get_jarvis()
 jarvis.command_processor = CustomCommandProcessor()
 
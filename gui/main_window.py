@@ -38,6 +38,11 @@ class JarvisGUI:
         self.jarvis.on_command(self._on_command)
         self.jarvis.on_response(self._on_response)
         
+        # Keyboard shortcuts
+        emergency_stop = config.get('shortcuts.emergency_stop')
+        if emergency_stop:
+            self.root.bind_all(self._tk_sequence(emergency_stop), self._on_emergency_stop)
+        
         logger.info("GUI initialized")
     
     def _setup_ui(self):
@@ -199,17 +204,31 @@ class JarvisGUI:
             self._append_to_chat("SYSTEM", "No speech detected", "yellow")
     
     def _on_command(self, command: str):
-        """Callback when command is received"""
+        """Callback when command is received (on an event thread)"""
         # Already displayed in _on_send_clicked
         pass
     
     def _on_response(self, result: dict):
-        """Callback when response is generated"""
+        """Callback when response is generated (on an event thread)"""
         response = result.get('response', '')
         success = result.get('success', False)
         
+        # Tk may only be touched from its own thread
         color = "green" if success else "red"
-        self._append_to_chat("JARVIS", response, color)
+        self.root.after(0, self._append_to_chat, "JARVIS", response, color)
+    
+    def _on_emergency_stop(self, event=None):
+        """Cancel all queued and running commands"""
+        cancelled = self.jarvis.emergency_stop()
+        self._append_to_chat("SYSTEM", f"Emergency stop: {cancelled} command(s) cancelled", "yellow")
+    
+    @staticmethod
+    def _tk_sequence(shortcut: str) -> str:
+        """Convert a shortcut like 'Ctrl+Shift+Esc' to a Tk event sequence"""
+        names = {'ctrl': 'Control', 'alt': 'Alt', 'shift': 'Shift', 'esc': 'Escape'}
+        keys = [names.get(key.lower(), key.lower() if len(key) == 1 else key)
+                for key in shortcut.split('+')]
+        return f"<{'-'.join(keys)}>"
     
     def _toggle_wake_word(self):
         """Toggle wake word detection"""
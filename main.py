@@ -3,19 +3,33 @@ Jarvis V2 - Desktop AI Assistant
 Main entry point
 """
 
+import time
+
+STARTED_AT = time.perf_counter()
+
+import os
 import sys
+import re
+import glob
 import argparse
-from pathlib import Path
 
 # Add project root to path
-project_root = Path(__file__).parent
-sys.path.insert(0, str(project_root))
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
 
-from utils import get_logger, log_startup, log_shutdown, get_config
-from core import get_jarvis
+# The assistant itself is imported once the arguments are known, so a
+# command forwarded to a running daemon only pays for the thin IPC client
+logger = None
+config = None
 
-logger = get_logger()
-config = get_config()
+
+def load_runtime():
+    """Import and set up logging and configuration"""
+    global logger, config
+    from utils import get_logger, get_config
+    
+    logger = get_logger()
+    config = get_config()
 
 
 def parse_arguments():
@@ -47,7 +61,33 @@ def parse_arguments():
     parser.add_argument(
         '--command',
         type=str,
-        help='Execute a single command and exit'
+        help='Execute a single command and exit (on the running daemon, if any)'
+    )
+    
+    parser.add_argument(
+        '--no-daemon',
+        action='store_true',
+        help='Execute --command in this process even if a daemon is running'
+    )
+    
+    parser.add_argument(
+        '--replay-log',
+        nargs='+',
+        metavar='LOG',
+        help='Replay commands from log files (globs allowed) and print an intent histogram'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes for --replay-log (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Report import times and startup phase timings (with --command, for that command)'
     )
     
     return parser.parse_args()
@@ -153,8 +193,21 @@ def run_daemon_mode(jarvis):
     print("Daemon mode - Running in background...")
     print("Press Ctrl+C to stop")
     
+    from core.ipc_server import CommandServer
+    from core.api_server import ApiServer
+    
     jarvis.start()
     
+    # Serve --command clients
+    server = CommandServer(jarvis) if config.get('advanced.ipc_enabled', True) else None
+    if server and server.start():
+        print(f"Accepting commands on {server.address}")
+    
+    # Serve automation clients and event watchers
+    api = ApiServer(jarvis) if config.get('api.enabled', False) else None
+    if api and api.start():
+        print(f"API listening on http://{api.host}:{api.port}")
+    
     try:
         # Start wake word or continuous listening
         if jarvis.wake_word_detector:
@@ -170,6 +223,10 @@ def run_daemon_mode(jarvis):
     except KeyboardInterrupt:
         print("\nStopping daemon...")
     finally:
+        if api:
+            api.stop()
+        if server:
+            server.stop()
         jarvis.stop()
 
 
@@ -179,34 +236,175 @@ def execute_single_command(jarvis, command: str):
     
     jarvis.start()
     result = jarvis.process_command(command, speak_response=False)
+    print_command_result(command, result)
+    jarvis.stop()
+    
+    return 0 if result['success'] else 1
+
+
+def forward_single_command(command: str):
+    """
+    Execute a single command on a running daemon
+    Returns the exit code, or None if no daemon is running
+    """
+    from core.ipc_client import forward_command
+    
+    try:
+        result = forward_command(command)
+    except (OSError, ValueError) as e:
+        print(f"\nJarvis daemon error: {e}")
+        return 1
+    
+    if result is None:
+        return None
     
+    print_command_result(command, result)
+    return 0 if result['success'] else 1
+
+
+def print_command_result(command: str, result: dict):
+    """Print the result of a single command"""
     print(f"\nCommand: {command}")
     print(f"Response: {result['response']}")
     print(f"Success: {result['success']}")
+
+
+def run_startup_profile(jarvis, profiler, command: str = None):
+    """Finish starting up (and run a command), then report where the time went"""
+    from utils.profiling import profile_imports, format_import_tree, loaded_optional_dependencies
+    
+    jarvis.start()
+    profiler.mark('start')
+    
+    if command:
+        result = jarvis.process_command(command, speak_response=False)
+        profiler.mark('command')
     
     jarvis.stop()
+    profiler.mark('stop')
     
-    return 0 if result['success'] else 1
+    # Subsystems still warming up in the background don't count towards startup
+    for name in jarvis.get_readiness():
+        jarvis.wait_until_ready(name)
+    
+    details = {
+        'jarvis init': {
+            f"{name} ({info['state']})": info['startup_ms']
+            for name, info in jarvis.get_readiness().items()
+        }
+    }
+    if command:
+        details['command'] = {
+            f"{name} module": info['startup_ms']
+            for name, info in jarvis.command_processor.get_module_stats().items()
+            if info['loaded']
+        }
+    
+    print()
+    print(format_import_tree(profile_imports('main', 'utils', 'core.jarvis'),
+                             min_ms=config.get('advanced.profile_min_import_ms', 1.0)))
+    print()
+    print(profiler.format_phases(details))
+    print()
+    print(f"Optional dependencies loaded: {', '.join(loaded_optional_dependencies()) or 'none'}")
+    
+    if command:
+        print(f"Command: {command} -> {result['response']}")
+    
+    # Interpreter startup comes before STARTED_AT and is not included
+    budget = config.get('advanced.cold_start_budget_ms', 300)
+    total = profiler.total() * 1000
+    print(f"Startup: {total:.1f} ms (budget {budget} ms)"
+          f"{'' if total <= budget else ' - OVER BUDGET'}")
+    
+    return 0 if total <= budget else 1
+
+
+COMMAND_LOG_PATTERN = re.compile(r'\[COMMAND [A-Z_]+\] (.*)$')
+
+
+def read_logged_commands(paths):
+    """Yield command texts from Jarvis log files"""
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    match = COMMAND_LOG_PATTERN.search(line.rstrip('\n'))
+                    if match:
+                        yield match.group(1)
+
+
+def replay_command_log(paths, workers: int = 1):
+    """Run logged commands through the intent recognizer and print a histogram"""
+    from collections import Counter
+    from core import IntentRecognizer
+    
+    recognizer = IntentRecognizer(cache_size=0)
+    counts = Counter()
+    low_confidence = Counter()
+    
+    try:
+        for result in recognizer.recognize_many(read_logged_commands(paths), workers=workers):
+            counts[result['intent']] += 1
+            if result['intent'] != 'unknown' and result['confidence'] < 0.3:
+                low_confidence[result['intent']] += 1
+    except OSError as e:
+        print(f"\nCould not read log: {e}")
+        return 1
+    
+    total = sum(counts.values())
+    print(f"\nReplayed {total} command(s)\n")
+    
+    if total:
+        print(f"  {'Intent':<20} {'Count':>8} {'Share':>7} {'Low conf':>9}")
+        for intent, count in counts.most_common():
+            print(f"  {intent:<20} {count:>8} {count / total:>7.1%} {low_confidence[intent]:>9}")
+    
+    return 0
 
 
 def main():
     """Main entry point"""
     args = parse_arguments()
     
+    # Hand a single command to a running daemon when there is one
+    if args.command and not (args.no_daemon or args.profile_startup):
+        exit_code = forward_single_command(args.command)
+        if exit_code is not None:
+            return exit_code
+    
+    load_runtime()
+    from utils import StartupProfiler, log_shutdown
+    from core import get_jarvis
+    
+    profiler = StartupProfiler(STARTED_AT)
+    profiler.mark('imports')
+    
     # Set debug mode
     if args.debug:
         import logging
         logger.logger.setLevel(logging.DEBUG)
         config.set('general.debug_mode', True, save=False)
     
-    # Disable voice if requested
-    if args.no_voice:
+    # Disable voice if requested; a single command prints its response
+    # instead of speaking it, so it never needs the voice engines
+    if args.no_voice or args.command:
         config.set('voice.enabled', False, save=False)
     
+    # Log replay only needs the intent recognizer
+    if args.replay_log:
+        return replay_command_log(args.replay_log, args.workers)
+    
+    profiler.mark('configuration')
+    
     # Get Jarvis instance
     jarvis = get_jarvis()
+    profiler.mark('jarvis init')
     
     try:
+        if args.profile_startup:
+            return run_startup_profile(jarvis, profiler, args.command)
+        
         # Single command mode
         if args.command:
             return execute_single_command(jarvis, args.command)
@@ -1,18 +1,39 @@
 """
 Modules package for Jarvis V2
 Desktop control modules
+
+Modules are imported on first access, so using one of them does not pull in
+the dependencies (pyautogui, PIL, pywin32) of all the others.
 """
 
-from .application_manager import ApplicationManager
-from .screenshot_manager import ScreenshotManager
-from .system_controller import SystemController
-from .file_manager import FileManager
-from .window_manager import WindowManager
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .application_manager import ApplicationManager
+    from .screenshot_manager import ScreenshotManager
+    from .system_controller import SystemController
+    from .file_manager import FileManager
+    from .window_manager import WindowManager
+    from .async_adapter import AsyncModule
+
+# Exported name -> submodule defining it
+_EXPORTS = {
+    'ApplicationManager': '.application_manager',
+    'ScreenshotManager': '.screenshot_manager',
+    'SystemController': '.system_controller',
+    'FileManager': '.file_manager',
+    'WindowManager': '.window_manager',
+    'AsyncModule': '.async_adapter'
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'ApplicationManager',
-    'ScreenshotManager',
-    'SystemController',
-    'FileManager',
-    'WindowManager'
-]
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
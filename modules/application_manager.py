@@ -6,6 +6,8 @@ Handles launching, closing, and managing applications
 import psutil
 import subprocess
 import time
+from collections import OrderedDict
+from threading import Lock
 from typing import List, Optional, Dict
 from pathlib import Path
 from utils.logger import get_logger
@@ -19,8 +21,22 @@ config = get_config()
 class ApplicationManager:
     """Manages desktop applications"""
     
+    # Seconds a prepared executable lookup / process snapshot stays usable
+    RESOLVE_TTL = 30.0
+    SNAPSHOT_TTL = 5.0
+    
+    # Bounds on speculative work: most recent apps kept, and the shortest name
+    # worth a search (partial hypotheses are often a word cut short)
+    MAX_PREPARED = 16
+    MIN_PREPARE_LENGTH = 3
+    
     def __init__(self):
         self.common_apps = config.get('applications.common_apps', {})
+        
+        # Work done ahead of likely launches and closes, keyed by normalized app name
+        self._prepared_executables: OrderedDict = OrderedDict()
+        self._prepared_processes: OrderedDict = OrderedDict()
+        self._prepared_lock = Lock()
     
     def launch(self, app_name: str) -> Dict[str, any]:
         """
@@ -30,12 +46,12 @@ class ApplicationManager:
         try:
             logger.info(f"Attempting to launch: {app_name}")
             
-            # Check common apps first
-            executable = self._resolve_app_name(app_name)
-            
-            if not executable:
-                # Try to find it using Windows search
-                executable = find_executable(app_name)
+            # Use an executable resolved ahead of time, if any
+            prepared = self._get_prepared(self._prepared_executables, app_name, self.RESOLVE_TTL)
+            if prepared:
+                executable = prepared[0]
+            else:
+                executable = self._find_app_executable(app_name)
             
             # If still not found, try using Windows start command with app name
             if not executable:
@@ -123,8 +139,10 @@ class ApplicationManager:
         try:
             logger.info(f"Attempting to close: {app_name}")
             
-            # Find running processes matching the app name
-            processes = self._find_processes(app_name)
+            # Find running processes matching the app name (a fresh snapshot may be prepared)
+            prepared = self._get_prepared(self._prepared_processes, app_name,
+                                          self.SNAPSHOT_TTL, consume=True)
+            processes = prepared[0] if prepared and prepared[0] else self._find_processes(app_name)
             
             if not processes:
                 return {
@@ -160,6 +178,53 @@ class ApplicationManager:
                 'message': f"Error closing application: {str(e)}"
             }
     
+    def prepare_launch(self, app_name: str):
+        """Resolve an application's executable ahead of a likely launch"""
+        if len(normalize_app_name(app_name)) < self.MIN_PREPARE_LENGTH:
+            return
+        executable = self._find_app_executable(app_name)
+        self._store_prepared(self._prepared_executables, app_name, executable, self.RESOLVE_TTL)
+        logger.debug(f"Prepared launch of {app_name}: {executable or 'start command'}")
+    
+    def prepare_close(self, app_name: str):
+        """Snapshot the processes of an application ahead of a likely close"""
+        if len(normalize_app_name(app_name)) < self.MIN_PREPARE_LENGTH:
+            return
+        processes = self._find_processes(app_name)
+        self._store_prepared(self._prepared_processes, app_name, processes, self.SNAPSHOT_TTL)
+        logger.debug(f"Prepared close of {app_name}: {len(processes)} process(es)")
+    
+    def _store_prepared(self, prepared: OrderedDict, app_name: str, value, ttl: float):
+        """Keep prepared work for an app, dropping expired and least recent entries"""
+        key = normalize_app_name(app_name).lower()
+        now = time.monotonic()
+        with self._prepared_lock:
+            prepared[key] = (value, now)
+            prepared.move_to_end(key)
+            
+            # Entries are in preparation order, so expired ones are at the front
+            while prepared and (len(prepared) > self.MAX_PREPARED or
+                                now - next(iter(prepared.values()))[1] > ttl):
+                prepared.popitem(last=False)
+    
+    def _get_prepared(self, prepared: OrderedDict, app_name: str, ttl: float,
+                      consume: bool = False) -> Optional[tuple]:
+        """Get prepared work for an app if it is recent enough"""
+        key = normalize_app_name(app_name).lower()
+        with self._prepared_lock:
+            entry = prepared.get(key)
+            if entry and (consume or time.monotonic() - entry[1] > ttl):
+                del prepared[key]
+        
+        if entry and time.monotonic() - entry[1] <= ttl:
+            return entry
+        return None
+    
+    def _find_app_executable(self, app_name: str) -> Optional[str]:
+        """Resolve an app name through common apps, then a search"""
+        # Check common apps first, then try to find it using Windows search
+        return self._resolve_app_name(app_name) or find_executable(app_name)
+    
     def close_all(self, app_type: str) -> Dict[str, any]:
         """
         Close all applications of a certain type (e.g., "browsers")
@@ -0,0 +1,50 @@
+"""
+Async Module Adapter for Jarvis V2
+Awaitable wrappers around the blocking desktop control modules
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, Optional
+
+
+class AsyncModule:
+    """
+    Awaitable view of a module
+    
+    Public methods of the wrapped module become coroutines that run the
+    original call on an executor, so sleeps, process scans, directory walks
+    and similar blocking work never stall the event loop:
+        
+        apps = AsyncModule(ApplicationManager())
+        result = await apps.launch('chrome')
+    
+    Attributes that are not methods are returned unchanged.
+    """
+    
+    def __init__(self, module: Any, executor: Optional[Executor] = None):
+        self._module = module
+        self._executor = executor
+    
+    @property
+    def module(self) -> Any:
+        """The wrapped module"""
+        return self._module
+    
+    def __getattr__(self, name: str):
+        attribute = getattr(self._module, name)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+        
+        @functools.wraps(attribute)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(attribute, *args, **kwargs)
+            )
+        
+        return call
+    
+    def __repr__(self):
+        return f"AsyncModule({self._module!r})"
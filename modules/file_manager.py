@@ -10,6 +10,7 @@ from typing import List, Dict, Optional
 import subprocess
 from utils.logger import get_logger
 from utils.config_manager import get_config
+from utils.cancellation import CancellationToken, OperationCancelled
 from utils.helpers import format_file_size, get_desktop_path, get_documents_path, get_downloads_path
 
 logger = get_logger()
@@ -64,22 +65,32 @@ class FileManager:
             }
     
     def find_files(self, query: str, location: Optional[str] = None,
-                  file_type: Optional[str] = None) -> Dict[str, any]:
+                  file_type: Optional[str] = None,
+                  token: Optional[CancellationToken] = None) -> Dict[str, any]:
         """
         Search for files matching query
+        Stops after search_timeout seconds or when the token is cancelled,
+        returning what was found so far.
         """
         try:
             logger.info(f"Searching for files: {query}")
             
+            token = token.child(self.search_timeout) if token else CancellationToken(self.search_timeout)
             search_paths = [location] if location else self.search_locations
             results = []
             
             for search_path in search_paths:
+                if token.cancelled:
+                    break
+                
                 if not os.path.exists(search_path):
                     continue
                 
                 # Search recursively
                 for root, dirs, files in os.walk(search_path):
+                    if token.cancelled:
+                        break
+                    
                     # Check files
                     for file in files:
                         if self._matches_query(file, query, file_type):
@@ -100,12 +111,18 @@ class FileManager:
             # Sort by modified date (newest first)
             results.sort(key=lambda x: x['modified'], reverse=True)
             
-            logger.info(f"Found {len(results)} file(s)")
+            if token.cancelled:
+                logger.info(f"File search stopped ({token.reason}) after {len(results)} file(s)")
+            else:
+                logger.info(f"Found {len(results)} file(s)")
+            
             return {
                 'success': True,
                 'files': results,
                 'count': len(results),
-                'truncated': len(results) >= self.max_results
+                'truncated': len(results) >= self.max_results,
+                'cancelled': token.cancelled,
+                'reason': token.reason
             }
             
         except Exception as e:
@@ -212,10 +229,15 @@ class FileManager:
                 'message': f"Error: {str(e)}"
             }
     
-    def copy_file(self, source: str, destination: str) -> Dict[str, any]:
+    def copy_file(self, source: str, destination: str,
+                 token: Optional[CancellationToken] = None) -> Dict[str, any]:
         """
         Copy a file or folder
+        A folder copy stops between files once the token is cancelled,
+        leaving the files copied so far in place.
         """
+        copied = 0
+        
         try:
             src_path = Path(source)
             dst_path = Path(destination)
@@ -229,8 +251,17 @@ class FileManager:
             logger.info(f"Copying {src_path} to {dst_path}")
             
             if src_path.is_dir():
-                shutil.copytree(str(src_path), str(dst_path))
+                def copy_checked(src, dst):
+                    nonlocal copied
+                    if token:
+                        token.raise_if_cancelled()
+                    copied += 1
+                    return shutil.copy2(src, dst)
+                
+                shutil.copytree(str(src_path), str(dst_path), copy_function=copy_checked)
             else:
+                if token:
+                    token.raise_if_cancelled()
                 shutil.copy2(str(src_path), str(dst_path))
             
             return {
@@ -238,6 +269,14 @@ class FileManager:
                 'message': f"Copied {src_path.name} to {dst_path}"
             }
             
+        except OperationCancelled as e:
+            logger.info(f"Copy of {source} stopped ({e.reason}) after {copied} file(s)")
+            return {
+                'success': False,
+                'cancelled': True,
+                'copied': copied,
+                'message': f"Copy stopped ({e.reason}) after {copied} file(s)"
+            }
         except Exception as e:
             logger.error(f"Error copying file: {e}")
             return {
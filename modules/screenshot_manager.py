@@ -10,6 +10,7 @@ from datetime import datetime
 from typing import Optional, Dict, Tuple
 from utils.logger import get_logger
 from utils.config_manager import get_config
+from utils.cancellation import CancellationToken
 from utils.helpers import ensure_directory, sanitize_filename
 
 logger = get_logger()
@@ -63,6 +64,13 @@ class ScreenshotManager:
                 'message': f"Screenshot failed: {str(e)}"
             }
     
+    def prepare_capture(self):
+        """Warm up screen capture ahead of a likely screenshot"""
+        ensure_directory(self.default_path)
+        
+        # Querying the screen sets up the display connection the capture uses
+        pyautogui.size()
+    
     def capture_window(self, save_path: Optional[str] = None,
                       filename: Optional[str] = None) -> Dict[str, any]:
         """
@@ -198,14 +206,21 @@ class ScreenshotManager:
     
     def capture_with_delay(self, delay: int = 3, 
                           capture_type: str = 'full',
+                          token: Optional[CancellationToken] = None,
                           **kwargs) -> Dict[str, any]:
         """
         Capture screenshot after a delay
+        The delay is abandoned if the token is cancelled.
         """
-        import time
-        
         logger.info(f"Screenshot scheduled in {delay} seconds")
-        time.sleep(delay)
+        
+        if (token or CancellationToken()).wait(delay):
+            logger.info(f"Delayed screenshot cancelled ({token.reason})")
+            return {
+                'success': False,
+                'cancelled': True,
+                'message': f"Screenshot cancelled ({token.reason})"
+            }
         
         if capture_type == 'window':
             return self.capture_window(**kwargs)
@@ -2,7 +2,7 @@
 Response templates and personality framework for Jarvis V2
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import random
 from datetime import datetime
 from utils.config_manager import get_config
@@ -14,6 +14,35 @@ config = get_config()
 class ResponseTemplates:
     """Response templates for various situations"""
     
+    # Quick acknowledgments by intent
+    ACKNOWLEDGMENTS = {
+        'launch_app': [
+            "Opening now, {sir}.",
+            "Launching {sir}.",
+            "Right away, {sir}.",
+        ],
+        'close_app': [
+            "Closing now, {sir}.",
+            "Terminating application, {sir}.",
+        ],
+        'screenshot': [
+            "Taking screenshot, {sir}.",
+            "Capturing screen, {sir}.",
+        ],
+        'volume': [
+            "Adjusting volume, {sir}.",
+        ],
+        'lock_screen': [
+            "Locking workstation now, {sir}.",
+        ],
+        'shutdown': [
+            "Initiating shutdown sequence, {sir}.",
+        ],
+        'restart': [
+            "Initiating restart, {sir}.",
+        ],
+    }
+    
     def __init__(self):
         self.personality_config = config.get('personality', {})
         self.formality = self.personality_config.get('formality_level', 'professional')
@@ -22,50 +51,31 @@ class ResponseTemplates:
     
     def get_greeting(self) -> str:
         """Get greeting message"""
+        return random.choice(self._greetings())
+    
+    def _greetings(self) -> List[str]:
         time_greeting = get_time_greeting()
-        greetings = [
+        return [
             f"{time_greeting}, {self.address_as}. Jarvis online and ready.",
             f"{time_greeting}, {self.address_as}. All systems operational. How may I assist you today?",
             f"{time_greeting}, {self.address_as}. At your service.",
         ]
-        return random.choice(greetings)
     
     def get_acknowledgment(self, intent: str) -> Optional[str]:
         """Get quick acknowledgment for command"""
-        acknowledgments = {
-            'launch_app': [
-                "Opening now, {sir}.",
-                "Launching {sir}.",
-                "Right away, {sir}.",
-            ],
-            'close_app': [
-                "Closing now, {sir}.",
-                "Terminating application, {sir}.",
-            ],
-            'screenshot': [
-                "Taking screenshot, {sir}.",
-                "Capturing screen, {sir}.",
-            ],
-            'volume': [
-                "Adjusting volume, {sir}.",
-            ],
-            'lock_screen': [
-                "Locking workstation now, {sir}.",
-            ],
-            'shutdown': [
-                "Initiating shutdown sequence, {sir}.",
-            ],
-            'restart': [
-                "Initiating restart, {sir}.",
-            ],
-        }
-        
-        templates = acknowledgments.get(intent, [])
+        templates = self.ACKNOWLEDGMENTS.get(intent, [])
         if templates:
             template = random.choice(templates)
             return template.replace('{sir}', self.address_as)
         return None
     
+    def get_fixed_phrases(self) -> List[str]:
+        """Get the greetings, acknowledgments and stock replies, which have no variable parts"""
+        acknowledgments = [template.replace('{sir}', self.address_as)
+                           for templates in self.ACKNOWLEDGMENTS.values() for template in templates]
+        return (self._greetings() + acknowledgments + self._status_responses() +
+                self._thank_responses() + self._unknown_intent_responses())
+    
     def format_success(self, intent: str, details: Optional[str] = None) -> str:
         """Format success message"""
         
@@ -192,6 +202,22 @@ class ResponseTemplates:
         
         return message
     
+    def format_cancelled(self, reason: Optional[str] = None, count: Optional[int] = None) -> str:
+        """Format message for cancelled or timed out work"""
+        if count == 0:
+            template = "There's nothing to cancel, {sir}."
+        elif count:
+            template = random.choice([
+                "Stopped, {sir}.",
+                "Consider it cancelled, {sir}.",
+            ])
+        elif reason == 'timed out':
+            template = "That was taking too long, {sir}, so I stopped it."
+        else:
+            template = "Cancelled, {sir}."
+        
+        return template.replace('{sir}', self.address_as)
+    
     def format_suggestion(self, suggestions: list) -> str:
         """Format proactive suggestions"""
         if not suggestions:
@@ -234,12 +260,14 @@ class ResponseTemplates:
     
     def get_status_response(self) -> str:
         """Get system status response"""
-        responses = [
+        return random.choice(self._status_responses())
+    
+    def _status_responses(self) -> List[str]:
+        return [
             f"All systems nominal, {self.address_as}. Ready to assist.",
             f"Online and operational, {self.address_as}.",
             f"Fully functional and at your service, {self.address_as}.",
         ]
-        return random.choice(responses)
     
     def get_help_response(self) -> str:
         """Get help message"""
@@ -266,22 +294,26 @@ Just speak naturally, and I'll understand what you need."""
     
     def get_thank_response(self) -> str:
         """Get response to thank you"""
-        responses = [
+        return random.choice(self._thank_responses())
+    
+    def _thank_responses(self) -> List[str]:
+        return [
             f"You're welcome, {self.address_as}.",
             f"Always a pleasure, {self.address_as}.",
             f"Happy to help, {self.address_as}.",
             f"At your service, {self.address_as}.",
         ]
-        return random.choice(responses)
     
     def get_unknown_intent_response(self) -> str:
         """Get response for unknown intent"""
-        responses = [
+        return random.choice(self._unknown_intent_responses())
+    
+    def _unknown_intent_responses(self) -> List[str]:
+        return [
             f"I'm not sure I understand, {self.address_as}. Could you rephrase that?",
             f"I didn't quite catch that, {self.address_as}. Could you try again?",
             f"I'm afraid I don't understand that command, {self.address_as}.",
         ]
-        return random.choice(responses)
 
 
 class ResponseGenerator:
@@ -301,6 +333,7 @@ class ResponseGenerator:
         - error
         - confirmation
         - clarification
+        - cancelled
         - suggestion
         - status
         - help
@@ -314,6 +347,10 @@ class ResponseGenerator:
         
         return self.templates.get_unknown_intent_response()
     
+    def get_fixed_phrases(self) -> List[str]:
+        """Get the responses that never vary, e.g. to pre-render their speech"""
+        return self.templates.get_fixed_phrases()
+    
     def _generate_greeting(self, **kwargs) -> str:
         return self.templates.get_greeting()
     
@@ -332,6 +369,9 @@ class ResponseGenerator:
     def _generate_clarification(self, intent: str, context: Optional[str] = None, **kwargs) -> str:
         return self.templates.format_clarification_request(intent, context)
     
+    def _generate_cancelled(self, reason: Optional[str] = None, count: Optional[int] = None, **kwargs) -> str:
+        return self.templates.format_cancelled(reason, count)
+    
     def _generate_suggestion(self, suggestions: list, **kwargs) -> str:
         return self.templates.format_suggestion(suggestions)
     
@@ -27,7 +27,8 @@ def test_text_commands():
         "what time is it",
         "list running apps",
         "help",
-        "thank you"
+        "thank you",
+        "what time is it and what's the date"
     ]
     
     for command in test_commands:
@@ -40,6 +41,671 @@ def test_text_commands():
     print("\n✓ Text commands test completed")
 
 
+def test_async_commands():
+    """Test that async commands respond like synchronous ones"""
+    print("\n=== Testing Async Commands ===")
+    
+    import asyncio
+    from core.events import COMMAND_RECEIVED, RESPONSE
+    
+    jarvis = get_jarvis()
+    jarvis.start()
+    subscription = jarvis.events.subscribe('test', types=[COMMAND_RECEIVED, RESPONSE])
+    
+    async def run():
+        return await asyncio.gather(*(jarvis.process_command_async(command, speak_response=False,
+                                                                   source='test')
+                                      for command in ("what time is it", "what's the date")))
+    
+    results = asyncio.run(run())
+    assert [result['intent'] for result in results] == ['time', 'date']
+    assert set(results[0]) == set(jarvis.process_command("what time is it", speak_response=False))
+    
+    events = []
+    while subscription.pending():
+        events.append(subscription.get(0))
+    assert [event['type'] for event in events].count(RESPONSE) == 3
+    assert {event['source'] for event in events if event['type'] == COMMAND_RECEIVED} == {'test', 'text'}
+    subscription.close()
+    
+    jarvis.stop()
+    print("✓ Async commands test passed")
+
+
+def test_intent_recognizer():
+    """Test intent recognition through the keyword index"""
+    print("\n=== Testing Intent Recognizer ===")
+    
+    from core import IntentRecognizer
+    
+    recognizer = IntentRecognizer()
+    
+    expected = [
+        ("open chrome", 'launch_app', {'target': 'chrome'}),
+        ("volume to 50%", 'volume', {'value': 50}),
+        ("set volume 30", 'volume', {'value': 30}),
+        ("what's the time", 'time', {}),
+        ("create new folder Projects", 'create_folder', {'name': 'Projects'}),
+        ("stop that", 'cancel', {}),
+        ("stop spotify", 'close_app', {'target': 'spotify'}),
+        ("make me a sandwich", 'unknown', {}),
+    ]
+    
+    for command, intent, parameters in expected:
+        result = recognizer.recognize(command)
+        assert result['intent'] == intent, f"{command}: {result['intent']} != {intent}"
+        assert result['parameters'] == parameters, f"{command}: {result['parameters']}"
+    
+    # Repeats differing only in case share a cache entry
+    hits = recognizer.get_cache_stats()['hits']
+    result = recognizer.recognize("Volume UP")
+    assert result['intent'] == 'volume' and result['parameters'] == {'direction': 'up'}
+    recognizer.recognize("volume up")
+    assert recognizer.get_cache_stats()['hits'] == hits + 1
+    
+    # Filler words are matched as spoken, cached or not
+    uncached = IntentRecognizer(cache_size=0)
+    for command in ("open chrome", "open chrome please", "create folder please", "create folder"):
+        result = recognizer.recognize(command)
+        assert result == uncached.recognize(command), command
+        assert result['raw_command'] == command
+    
+    # and get entries of their own rather than taking turns in one
+    hits = recognizer.get_cache_stats()['hits']
+    assert recognizer.recognize("open chrome please")['parameters'] == {'target': 'chrome please'}
+    assert recognizer.recognize("open chrome")['parameters'] == {'target': 'chrome'}
+    assert recognizer.recognize("create folder")['intent'] == 'unknown'
+    assert recognizer.get_cache_stats()['hits'] == hits + 3
+    
+    print("✓ Intent recognizer test passed")
+
+
+def test_fallback_classifier():
+    """Test classifying commands that no pattern matches"""
+    print("\n=== Testing Fallback Classifier ===")
+    
+    from core import CommandProcessor, IntentRecognizer
+    from core.fallback_classifier import FallbackClassifier
+    
+    classifier = FallbackClassifier()
+    recognizer = IntentRecognizer(cache_size=0)
+    
+    # Paraphrases the patterns miss get the intent of their nearest example
+    for command, intent in (("grab a picture of my screen", 'screenshot'),
+                            ("how much battery is left", 'system_info'),
+                            ("find files named report", 'find_files')):
+        assert recognizer.recognize(command)['intent'] == 'unknown'
+        result = classifier.classify(command)
+        assert result['intent'] == intent, (command, result)
+        assert result['source'] == 'fallback' and result['parameters'] == {}
+        assert classifier.min_score <= result['confidence'] <= 1.0
+    
+    # Parameters line up with the slot of the closest example
+    expected = [
+        ("fire up Visual Studio Code", 'launch_app', {'target': 'Visual Studio Code'}),
+        ("get notepad going", 'launch_app', {'target': 'notepad'}),
+        ("look for the invoice", 'find_files', {'query': 'invoice'}),
+        ("make a folder named music", 'create_folder', {'name': 'music'}),
+    ]
+    for command, intent, parameters in expected:
+        assert recognizer.recognize(command)['intent'] == 'unknown'
+        result = classifier.classify(command)
+        assert (result['intent'], result['parameters']) == (intent, parameters), (command, result)
+    
+    # Nonsense, close calls and blank commands stay unclassified
+    for command in ("make me a sandwich", "xyzzy", "   "):
+        assert classifier.classify(command) is None, command
+    assert FallbackClassifier(min_score=0.99).classify("grab a picture of my screen") is None
+    
+    # Power and destructive intents are never guessed
+    assert not {'shutdown', 'restart', 'delete_file'} & set(classifier._get_model().intents)
+    
+    # The processor asks for the parameters the fallback cannot find
+    result = CommandProcessor().process("find files named report")
+    assert not result['success'] and result['intent'] == 'find_files'
+    assert result['response'].startswith("What type of files")
+    
+    print("✓ Fallback classifier test passed")
+
+
+def test_intent_catalog():
+    """Test custom intents from the catalog file, its cache and hot reload"""
+    print("\n=== Testing Intent Catalog ===")
+    
+    import json
+    import tempfile
+    from core import IntentRecognizer
+    from core.intent_catalog import PROJECT_ROOT, IntentCatalog
+    
+    def write_catalog(path, pattern):
+        path.write_text(json.dumps({'intents': {'open_project': [
+            {'pattern': pattern, 'name_group': 1}
+        ]}}))
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'intents.json'
+        cache_dir = Path(directory) / 'cache'
+        write_catalog(path, r"\bopen\s+project\s+(.+)")
+        
+        # The first load parses the catalog, the next one uses the cache
+        parsed = []
+        catalog = IntentCatalog(str(path), str(cache_dir))
+        parse = catalog._parse
+        catalog._parse = lambda raw: parsed.append(raw) or parse(raw)
+        patterns = catalog.load()
+        assert list(patterns) == ['open_project'] and len(parsed) == 1
+        assert catalog.cache_path.exists()
+        assert list(catalog.load()) == ['open_project'] and len(parsed) == 1
+        
+        # A cache that is not what the catalog wrote is a miss, not an error
+        for cached in ([], {'hash': None}, "text"):
+            catalog.cache_path.write_text(json.dumps(cached))
+            assert list(catalog.load()) == ['open_project']
+        assert len(parsed) == 4
+        
+        # Catalog patterns are recognized, and edits are picked up while running
+        recognizer = IntentRecognizer(catalog_path='')
+        recognizer.catalog = IntentCatalog(str(path), str(cache_dir))
+        recognizer.catalog_poll_interval = 0
+        assert recognizer.reload_catalog()
+        result = recognizer.recognize("open project Apollo")
+        assert result['intent'] == 'open_project' and result['parameters'] == {'name': 'Apollo'}
+        
+        write_catalog(path, r"\bload\s+workspace\s+(.+)")
+        assert recognizer.recognize("load workspace Gemini")['parameters'] == {'name': 'Gemini'}
+        assert recognizer.recognize("open project Apollo")['intent'] != 'open_project'
+        
+        # An invalid edit keeps the patterns that were loaded
+        path.write_text('{"intents": {"open_project": [{"pattern": "(", "name_group": 1}]}}')
+        assert recognizer.recognize("load workspace Gemini")['intent'] == 'open_project'
+    
+    # Relative catalog paths are found from any working directory
+    assert IntentCatalog('config/intents.json').path == PROJECT_ROOT / 'config' / 'intents.json'
+    
+    print("✓ Intent catalog test passed")
+
+
+def test_spell_correction():
+    """Test that spelling correction fixes command words but not parameters"""
+    print("\n=== Testing Spell Correction ===")
+    
+    from core import CommandProcessor
+    
+    processor = CommandProcessor()
+    
+    expected = [
+        ("opne chrome", "open chrome", {'target': 'chrome'}),
+        ("volme up", "volume up", {'direction': 'up'}),
+        ("clsoe Notepads", "close Notepads", {'target': 'Notepads'}),
+        ("lanch notepad then craete folder Dates", "launch notepad then create folder Dates", None),
+        # Parameters that look like misspelled vocabulary words are left alone
+        ("delete Exits", "delete Exits", {'target': 'Exits'}),
+        ("create folder Windows", "create folder Windows", {'name': 'Windows'}),
+        ("create folder Firefly", "create folder Firefly", {'name': 'Firefly'}),
+        ("find codes files", "find codes files", {'query': 'codes'}),
+    ]
+    
+    for command, corrected, parameters in expected:
+        assert processor.correct_spelling(command) == corrected, \
+            f"{command}: {processor.correct_spelling(command)}"
+        if parameters is not None:
+            assert processor.analyze(command)[0]['parameters'] == parameters, \
+                f"{command}: {processor.analyze(command)[0]['parameters']}"
+    
+    stages = processor.analyze("lanch notepad then craete folder Dates")
+    assert stages[1]['intent'] == 'create_folder' and stages[1]['parameters'] == {'name': 'Dates'}
+    
+    print("✓ Spell correction test passed")
+
+
+def test_cancellation():
+    """Test cancellation tokens, the cancel intent and command handlers"""
+    print("\n=== Testing Cancellation ===")
+    
+    import os
+    import tempfile
+    import time
+    from core import CommandProcessor
+    from core.scheduler import CommandScheduler
+    from modules import FileManager
+    from utils.cancellation import CancellationToken
+    
+    # Deadlines, and children that follow their parent
+    token = CancellationToken(0.05)
+    assert not token.cancelled and token.remaining() > 0
+    assert token.wait(1) and token.reason == 'timed out'
+    
+    parent = CancellationToken(10)
+    child = parent.child(60)
+    assert child.deadline == parent.deadline
+    parent.cancel('stopped')
+    assert child.cancelled and child.reason == 'stopped'
+    
+    # File search stops at its timeout and reports what it found
+    file_manager = FileManager()
+    file_manager.search_timeout = 1e-6
+    with tempfile.TemporaryDirectory() as directory:
+        result = file_manager.find_files("report", location=directory)
+    assert result['success'] and result['cancelled'] and result['reason'] == 'timed out'
+    
+    # "stop that" on its own has nothing to cancel
+    processor = CommandProcessor()
+    result = processor.process("stop that")
+    assert result['success'] and result['intent'] == 'cancel'
+    
+    # Handlers outside CANCELLABLE_INTENTS are called without a token
+    class LegacyProcessor(CommandProcessor):
+        def _execute_time(self, params):
+            return {'success': True, 'response': 'legacy', 'intent': 'time'}
+    
+    legacy = LegacyProcessor()
+    assert legacy.process("what time is it")['response'] == 'legacy'
+    cancelled = CancellationToken()
+    cancelled.cancel()
+    assert legacy.process("what time is it", cancelled).get('cancelled')
+    
+    # Copying hands the command's token to the file manager
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'report.txt')
+        with open(source, 'w') as handle:
+            handle.write('report')
+        destination = os.path.join(directory, 'backup.txt')
+        result = processor.process(f"copy {source} to {destination}")
+        assert result['success'] and os.path.exists(destination), result
+    
+    # "stop that" cancels a running command, which stops at its next checkpoint
+    class SlowProcessor(CommandProcessor):
+        def _execute_find_files(self, params, token):
+            token.wait(10)
+            return self._cancelled_result('find_files', token.reason)
+    
+    scheduler = CommandScheduler(SlowProcessor())
+    job = scheduler.submit("find report files")
+    time.sleep(0.1)
+    stop = scheduler.process("stop that")
+    assert stop['intent'] == 'cancel' and stop['cancelled_count'] == 1
+    start = time.monotonic()
+    result = job.result(timeout=5)
+    assert result['cancelled'] and time.monotonic() - start < 1
+    
+    print("✓ Cancellation test passed")
+
+
+def test_scheduler():
+    """Test command scheduling: priorities, resources, preemption and the grace timer"""
+    print("\n=== Testing Command Scheduler ===")
+    
+    import time
+    from threading import Event, Lock
+    from core import CommandProcessor
+    from core.scheduler import CommandScheduler
+    
+    class RecordingProcessor(CommandProcessor):
+        """Records when handlers run instead of touching the system"""
+        
+        CANCELLABLE_INTENTS = {'launch_app', 'time', 'find_files', 'shutdown', 'lock_screen'}
+        
+        def __init__(self):
+            super().__init__()
+            self.runs = []
+            self.gate = Event()
+            self.lock = Lock()
+        
+        def record(self, name, token, duration=0.0, blocking=False):
+            start = time.monotonic()
+            if blocking:
+                self.gate.wait(5)
+            cancelled = token.wait(duration)
+            with self.lock:
+                self.runs.append((name, start, time.monotonic()))
+            if cancelled:
+                return self._cancelled_result(name, token.reason)
+            return {'success': True, 'response': name, 'intent': name}
+        
+        def _execute_launch_app(self, params, token):
+            return self.record(params['target'], token, 0.2, blocking=params['target'] == 'blocker')
+        
+        def _execute_time(self, params, token):
+            return self.record('time', token)
+        
+        def _execute_find_files(self, params, token):
+            return self.record('find', token)
+        
+        def _execute_shutdown(self, params, token):
+            return self.record('shutdown', token)
+        
+        def _execute_lock_screen(self, params, token):
+            return self.record('lock', token, 5)
+    
+    # Queued commands start by priority, then in submission order
+    processor = RecordingProcessor()
+    scheduler = CommandScheduler(processor, workers=1)
+    jobs = [scheduler.submit("open blocker")]
+    time.sleep(0.1)
+    jobs += [scheduler.submit(command) for command in
+             ("find report files", "open spotify", "what time is it")]
+    processor.gate.set()
+    for job in jobs:
+        job.result(timeout=5)
+    order = [run[0] for run in sorted(processor.runs, key=lambda run: run[1])]
+    assert order == ['blocker', 'time', 'spotify', 'find'], order
+    
+    # Commands on the same application never overlap; others run alongside
+    processor = RecordingProcessor()
+    scheduler = CommandScheduler(processor, workers=4)
+    jobs = [scheduler.submit(command) for command in ("open chrome", "open chrome", "open spotify")]
+    for job in jobs:
+        job.result(timeout=5)
+    runs = {name: [] for name in ('chrome', 'spotify')}
+    for name, start, end in processor.runs:
+        runs[name].append((start, end))
+    (first_start, first_end), (second_start, _) = sorted(runs['chrome'])
+    assert second_start >= first_end, "commands on chrome overlapped"
+    assert runs['spotify'][0][0] < first_end, "spotify waited for chrome"
+    
+    # A power action cancels running and queued commands of lower priority
+    processor = RecordingProcessor()
+    scheduler = CommandScheduler(processor, workers=1)
+    running = scheduler.submit("open blocker")
+    queued = scheduler.submit("find report files")
+    time.sleep(0.1)
+    scheduler.submit("shutdown").result(timeout=5)
+    assert queued.result(timeout=1)['cancelled']
+    processor.gate.set()
+    assert running.result(timeout=5)['cancelled']
+    
+    # "Stop that" spares critical commands; only an emergency stop cancels them
+    processor = RecordingProcessor()
+    scheduler = CommandScheduler(processor, workers=1)
+    critical = scheduler.submit("lock screen")
+    running = scheduler.submit("open blocker")
+    time.sleep(0.1)
+    assert scheduler.process("stop that", timeout=5)['cancelled_count'] == 1
+    processor.gate.set()
+    assert running.result(timeout=5)['cancelled']
+    assert not critical.cancelled and not critical.future.done()
+    assert scheduler.cancel_all('emergency stop') == 1
+    assert critical.result(timeout=5)['cancelled']
+    
+    # A command that ignores cancellation is answered once the grace period ends
+    processor = RecordingProcessor()
+    scheduler = CommandScheduler(processor)
+    scheduler.cancel_grace = 0.2
+    job = scheduler.submit("open blocker")
+    time.sleep(0.1)
+    start = time.monotonic()
+    assert scheduler.cancel(job)
+    result = job.result(timeout=5)
+    assert result['cancelled'] and result['intent'] == 'cancelled'
+    assert 0.15 < time.monotonic() - start < 1
+    processor.gate.set()
+    
+    # Replacing Jarvis's processor switches the scheduler and events over
+    jarvis = get_jarvis()
+    original = jarvis.command_processor
+    custom = RecordingProcessor()
+    jarvis.command_processor = custom
+    assert jarvis.scheduler.command_processor is custom and custom.events is jarvis.events
+    jarvis.start()
+    assert jarvis.process_command("what time is it", speak_response=False)['response'] == 'time'
+    jarvis.stop()
+    jarvis.command_processor = original
+    
+    print("✓ Command scheduler test passed")
+
+
+def test_speculation():
+    """Test preparing commands from partial transcripts without delaying them"""
+    print("\n=== Testing Speculation ===")
+    
+    import time
+    from threading import Event
+    from core import CommandProcessor
+    from core.speculation import CommandSpeculator
+    
+    class PreparingProcessor(CommandProcessor):
+        """Records preparations, which take until the gate opens"""
+        
+        def __init__(self):
+            super().__init__()
+            self.gate = Event()
+            self.prepared = []
+        
+        def _prepare_launch_app(self, params):
+            self.gate.wait(5)
+            self.prepared.append(params['target'])
+    
+    processor = PreparingProcessor()
+    speculator = CommandSpeculator(processor, stable_count=2)
+    cache = processor.intent_recognizer.get_cache_stats()
+    
+    # Partials don't go through the recognition cache
+    for partial in ("open", "open chrome", "open chrome"):
+        speculator.feed(partial)
+    assert speculator.preparations == 1
+    assert processor.intent_recognizer.get_cache_stats() == cache
+    
+    # A preparation still running at the final transcript is not waited for
+    start = time.monotonic()
+    assert not speculator.confirm("open chrome")
+    assert time.monotonic() - start < 0.5 and speculator.get_stats()['late'] == 1
+    
+    # Newer preparations replace ones that have not started
+    for partial in ("open firefox", "open firefox", "open spotify", "open spotify"):
+        speculator.feed(partial)
+    processor.gate.set()
+    deadline = time.monotonic() + 2
+    while len(processor.prepared) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert processor.prepared == ['chrome', 'spotify'], processor.prepared
+    
+    # A finished preparation for the same command is a hit
+    assert speculator.confirm("open spotify")
+    speculator.feed("open notepad")
+    speculator.feed("open notepad")
+    assert not speculator.confirm("close notepad")
+    stats = speculator.get_stats()
+    assert (stats['hits'], stats['misses'], stats['late']) == (1, 1, 1)
+    
+    print("✓ Speculation test passed")
+
+
+def test_event_bus():
+    """Test event delivery, drop policies and lag statistics"""
+    print("\n=== Testing Event Bus ===")
+    
+    import time
+    from threading import Event, Thread
+    from core.events import (EventBus, BLOCK, DROP_NEWEST, DROP_OLDEST,
+                             COMMAND_RECEIVED, RESPONSE)
+    
+    bus = EventBus(max_queue=3, block_timeout=0.2)
+    oldest = bus.subscribe('oldest', drop_policy=DROP_OLDEST)
+    newest = bus.subscribe('newest', drop_policy=DROP_NEWEST)
+    responses = bus.subscribe('responses', types=[RESPONSE])
+    
+    def drain(subscription):
+        events = []
+        while subscription.pending():
+            events.append(subscription.get(0)['n'])
+        return events
+    
+    for n in range(5):
+        bus.publish(COMMAND_RECEIVED, n=n)
+    
+    # A full queue loses its oldest or the incoming events, per subscriber
+    assert drain(oldest) == [2, 3, 4] and oldest.dropped == 2
+    assert drain(newest) == [0, 1, 2] and newest.dropped == 2
+    assert responses.pending() == 0 and responses.get(0.01) is None
+    
+    # Blocking waits for the reader to make room, then gives up on the event
+    oldest.close()
+    newest.close()
+    blocking = bus.subscribe('blocking', drop_policy=BLOCK)
+    for n in range(3):
+        bus.publish(RESPONSE, n=n)
+    reader = Thread(target=lambda: (time.sleep(0.01), blocking.get(1)))
+    reader.start()
+    bus.publish(RESPONSE, n=3)
+    reader.join()
+    start = time.monotonic()
+    bus.publish(RESPONSE, n=4)
+    assert time.monotonic() - start >= 0.15
+    assert drain(blocking) == [1, 2, 3] and blocking.dropped == 1
+    
+    # Lag is the age of the oldest unread event, and is recorded on delivery
+    bus.publish(RESPONSE, n=5)
+    time.sleep(0.05)
+    assert responses.lag() >= 0.04
+    assert responses.get(0)['n'] == 3
+    stats = responses.get_stats()
+    assert stats['max_lag_ms'] >= 40 and stats['delivered'] == 1
+    assert stats['pending'] == 2 and stats['dropped'] == 3
+    
+    # Listeners run on their own thread; a failing callback does not stop them
+    received = []
+    done = Event()
+    
+    def listener(event):
+        received.append(event['n'])
+        if event['n'] == 0:
+            raise RuntimeError("listener failure")
+        done.set()
+    
+    listening = bus.listen(listener, types=[COMMAND_RECEIVED])
+    bus.publish(COMMAND_RECEIVED, n=0)
+    bus.publish(COMMAND_RECEIVED, n=1)
+    assert done.wait(2) and received == [0, 1]
+    
+    # Closed subscriptions stop receiving and wake their reader
+    for subscription in (listening, blocking, responses):
+        subscription.close()
+    assert bus.subscriber_count == 0 and responses.get(1) is not None
+    bus.publish(RESPONSE, n=6)
+    assert drain(blocking) == [5, 0, 1]
+    start = time.monotonic()
+    assert blocking.get(1) is None and time.monotonic() - start < 0.5
+    
+    try:
+        bus.subscribe(drop_policy='drop_everything')
+        assert False, "expected an unknown drop policy to be refused"
+    except ValueError:
+        pass
+    
+    print("✓ Event bus test passed")
+
+
+def test_api_server():
+    """Test that the API refuses requests for other hosts and origins"""
+    print("\n=== Testing API Server ===")
+    
+    import http.client
+    import json
+    from core.api_server import ApiServer
+    
+    jarvis = get_jarvis()
+    server = ApiServer(jarvis, host='127.0.0.1', port=0)
+    assert server.start()
+    
+    def request(method, path, body=None, **headers):
+        connection = http.client.HTTPConnection('127.0.0.1', server.port, timeout=5)
+        connection.request(method, path, body=body,
+                           headers={key.replace('_', '-'): value for key, value in headers.items()})
+        response = connection.getresponse()
+        body = json.loads(response.read())
+        connection.close()
+        return response.status, body
+    
+    def get(path, **headers):
+        return request('GET', path, **headers)
+    
+    def post(data, **headers):
+        return request('POST', '/commands', json.dumps(data), Content_Type='application/json', **headers)
+    
+    # A page on a rebound domain reaches the port but names its own host
+    status, body = get('/status', Host=f"evil.example:{server.port}")
+    assert status == 403 and body['response'] == 'Host not allowed'
+    
+    status, body = get('/status', Origin='http://evil.example')
+    assert status == 403 and body['response'] == 'Origin not allowed'
+    
+    assert get('/status')[0] == 200
+    assert get('/status', Host=f"localhost:{server.port}")[0] == 200
+    assert get('/status', Origin=f"http://127.0.0.1:{server.port}")[0] == 200
+    
+    # Bodies are only read from trusted clients, and only up to a small size
+    status, body = request('POST', '/commands', Host='evil.example', Content_Length='1000000000')
+    assert status == 403
+    for length, expected in (('abc', 400), ('-1', 400), (str(10 ** 9), 413)):
+        status, body = request('POST', '/commands', Content_Type='application/json',
+                               Content_Length=length)
+        assert status == expected, (length, status, body)
+    
+    # Priorities must be integers in range; 1.0 and true are not
+    jarvis.start()
+    for priority in (1.0, True, 7, "1"):
+        status, body = post({'command': "what time is it", 'priority': priority})
+        assert status == 400 and body['response'].startswith('Invalid request'), priority
+    status, body = post({'command': "what time is it", 'priority': 1})
+    assert status == 200 and body['intent'] == 'time'
+    jarvis.stop()
+    
+    server.stop()
+    print("✓ API server test passed")
+
+
+def test_ipc():
+    """Test forwarding commands to the daemon endpoint"""
+    print("\n=== Testing IPC ===")
+    
+    import os
+    import socket
+    import tempfile
+    import time
+    from core.ipc_client import CommandClient, forward_command
+    from core.ipc_server import CommandServer
+    
+    if os.name == 'nt':
+        print("✗ Unix sockets not available")
+        return
+    
+    jarvis = get_jarvis()
+    jarvis.start()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        # Round trip, including pipelined requests answered in order
+        address = os.path.join(directory, 'jarvis.sock')
+        server = CommandServer(jarvis, address=address, workers=2)
+        assert server.start()
+        assert os.stat(address).st_mode & 0o777 == 0o600
+        
+        result = forward_command("what time is it", address=address)
+        assert result['success'] and result['intent'] == 'time'
+        with CommandClient(address) as client:
+            results = client.execute_many(["what time is it", "make me a sandwich"])
+        assert [r['intent'] for r in results] == ['time', 'unknown']
+        
+        server.stop()
+        assert forward_command("what time is it", address=address) is None
+        
+        # A daemon that accepts but never answers times out instead of hanging
+        silent = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        silent.bind(address)
+        silent.listen()
+        start = time.monotonic()
+        try:
+            forward_command("what time is it", address=address, timeout=0.2)
+            assert False, "expected a timeout"
+        except TimeoutError:
+            pass
+        assert time.monotonic() - start < 2
+        silent.close()
+    
+    jarvis.stop()
+    print("✓ IPC test passed")
+
+
 def test_system_info():
     """Test system information"""
     print("\n=== Testing System Info ===")
@@ -69,6 +735,18 @@ def test_app_manager():
     
     app_manager = ApplicationManager()
     
+    # Speculative preparation keeps only recent apps and skips cut-off names
+    for index in range(app_manager.MAX_PREPARED + 4):
+        app_manager.prepare_close(f"app {chr(ord('a') + index) * 3}")
+    app_manager.prepare_close("ch")
+    prepared = app_manager._prepared_processes
+    assert len(prepared) == app_manager.MAX_PREPARED and 'ch' not in prepared
+    assert 'app aaa' not in prepared and 'app ttt' in prepared
+    
+    # Expired entries are dropped when read
+    assert app_manager._get_prepared(prepared, "app ttt", ttl=0.0) is None
+    assert 'app ttt' not in prepared
+    
     # Test listing apps
     result = app_manager.list_running()
     if result['success']:
@@ -90,6 +768,163 @@ def test_app_manager():
     print(f"Close result: {result['success']} - {result['message']}")
 
 
+def write_utterance(path, seed=3, silent=False):
+    """Write a WAV of one synthetic utterance; returns the true speech start and end"""
+    import wave
+    import numpy as np
+    from benchmarks.vad import SAMPLE_RATE, synthetic_utterance
+    
+    samples, start, end = synthetic_utterance(np.random.default_rng(seed), -50, False)
+    samples = samples[:int((end + 1.0) * SAMPLE_RATE)]
+    if silent:
+        samples = np.zeros_like(samples)
+    with wave.open(str(path), 'wb') as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(SAMPLE_RATE)
+        file.writeframes(samples.tobytes())
+    return start, end
+
+
+def test_endpointer():
+    """Test finding where speech starts and ends in synthetic audio"""
+    print("\n=== Testing Voice Activity Detection ===")
+    
+    import numpy as np
+    from voice.vad import Endpointer, VoiceActivityDetector
+    
+    rate = 16000
+    rng = np.random.default_rng(5)
+    
+    def noise(seconds, db=-50):
+        return rng.normal(0, 10 ** (db / 20), int(seconds * rate))
+    
+    def voiced(seconds):
+        t = np.arange(int(seconds * rate)) / rate
+        return 0.3 * sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 8)) / 3
+    
+    def pcm(*pieces):
+        return (np.clip(np.concatenate(pieces), -1, 1) * 32767).astype(np.int16)
+    
+    def endpoint(samples, chunk=512):
+        vad = VoiceActivityDetector(rate, frame_ms=20, energy_margin_db=9.0, spectral=False)
+        vad.calibrate(samples[:rate // 2])
+        endpointer = Endpointer(vad, min_speech_ms=90, hangover_ms=400, padding_ms=150)
+        for offset in range(0, len(samples), chunk):
+            if endpointer.feed(samples[offset:offset + chunk]):
+                break
+        return endpointer
+    
+    frame = 0.02
+    lead, speech = 1.013, 1.2
+    samples = pcm(noise(lead), voiced(speech) + noise(speech), noise(2.0))
+    
+    # Start and end land within a frame of the speech, fed in any chunk size
+    for chunk in (512, 160, 1999):
+        endpointer = endpoint(samples, chunk)
+        assert endpointer.ended
+        assert abs(endpointer.speech_start - lead) <= frame, endpointer.speech_start
+        assert abs(endpointer.speech_end - (lead + speech)) <= frame, endpointer.speech_end
+        
+        # It stops listening one hangover after the speech, not at the end of the audio
+        assert abs(endpointer.processed_seconds - (endpointer.speech_end + 0.4)) <= frame
+    
+    # Bounds trim the silence around the utterance, keeping the padding
+    start, end = endpointer.bounds(len(samples))
+    assert abs(start / rate - (endpointer.speech_start - 0.15)) < 1e-3
+    assert abs(end / rate - (endpointer.speech_end + 0.15)) < 1e-3
+    
+    # Background noise and quieter hiss never start an utterance
+    hiss = rng.normal(0, 10 ** (-35 / 20), rate)
+    endpointer = endpoint(pcm(noise(1.0), hiss, noise(1.0)))
+    assert endpointer.speech_start is None and not endpointer.ended
+    endpointer.finish()
+    assert endpointer.ended and endpointer.bounds(3 * rate) == (0, 0)
+    
+    # Speech still going when the audio stops ends where it was last heard
+    endpointer = endpoint(pcm(noise(1.0), voiced(0.5)))
+    assert not endpointer.ended
+    endpointer.finish()
+    assert abs(endpointer.speech_end - 1.5) <= frame
+    
+    print("✓ Voice activity detection test passed")
+
+
+def test_speech_recognition():
+    """Test listening to a recording through the scripted recognition engine"""
+    print("\n=== Testing Speech Recognition ===")
+    
+    import tempfile
+    from voice.recognition_backends import RecognitionBackend, ScriptedBackend
+    from voice.speech_recognition import FileAudioSource, SpeechRecognizer
+    
+    # Engines must implement _transcribe
+    try:
+        RecognitionBackend()
+        assert False, "the base backend should be abstract"
+    except TypeError:
+        pass
+    
+    recognizer = SpeechRecognizer()
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'utterance.wav'
+        silence = Path(directory) / 'silence.wav'
+        write_utterance(path)
+        write_utterance(silence, silent=True)
+        
+        # Decoded after the phrase is recorded, and while it is captured
+        for streaming in (False, True):
+            recognizer.backend = ScriptedBackend(["open chrome", "what time is it"], seconds_per_word=0.2)
+            recognizer.streaming = streaming
+            partials = []
+            result = recognizer.listen(timeout=3, source=FileAudioSource(path), on_partial=partials.append)
+            assert result['success'] and result['text'] == "open chrome", result
+            assert partials and partials[-1] == "open chrome", partials
+            
+            # The next phrase gets the next transcript
+            result = recognizer.listen(timeout=3, source=FileAudioSource(path))
+            assert result['text'] == "what time is it"
+            
+            result = recognizer.listen(timeout=1, source=FileAudioSource(silence))
+            assert not result['success'] and result['error'] == 'timeout', result
+        
+        stats = recognizer.backend.get_stats()
+        assert stats['engine'] == 'scripted' and stats['recognized'] == 2
+    
+    print("✓ Speech recognition test passed")
+
+
+def test_streaming_recognition():
+    """Test decoding a phrase while it is captured"""
+    print("\n=== Testing Streaming Recognition ===")
+    
+    import tempfile
+    from voice.recognition_backends import ScriptedBackend
+    from voice.speech_recognition import FileAudioSource, SpeechRecognizer
+    
+    recognizer = SpeechRecognizer()
+    recognizer.backend = ScriptedBackend(["open the quarterly report"], seconds_per_word=0.2)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'utterance.wav'
+        start, end = write_utterance(path)
+        results = list(recognizer.listen_stream(timeout=3, source=FileAudioSource(path)))
+    
+    # Hypotheses grow word by word while the phrase is captured
+    *partials, final = results
+    texts = [result['text'] for result in partials]
+    assert all(result.get('partial') for result in partials)
+    assert texts == ["open", "open the", "open the quarterly", "open the quarterly report"], texts
+    
+    # Then one final result, with the phrase timing and finalize latency
+    assert final['success'] and not final.get('partial') and final['text'] == "open the quarterly report"
+    assert abs(final['speech_start'] - start) < 0.1 and abs(final['speech_end'] - end) < 0.2, final
+    assert final['finalize_ms'] >= 0
+    assert recognizer.backend.get_stats()['decodes'] == 1
+    
+    print("✓ Streaming recognition test passed")
+
+
 def test_microphone():
     """Test microphone"""
     print("\n=== Testing Microphone ===")
@@ -124,6 +959,102 @@ def test_tts():
         print("✗ TTS not available")
 
 
+def test_speech_queue():
+    """Test speech priorities, backlog trimming and interruption"""
+    print("\n=== Testing Speech Queue ===")
+    
+    import time
+    from threading import Event
+    from voice.text_to_speech import (TextToSpeech, PRIORITY_ALERT, PRIORITY_CHATTER,
+                                      PRIORITY_RESPONSE)
+    
+    class ScriptedEngine:
+        """Says text instantly, except "hold ..." which lasts until released or stopped"""
+        
+        def __init__(self, tts):
+            self.tts = tts
+            self.spoken = []
+            self.pending = []
+            self.release = Event()
+            self.stopped = Event()
+        
+        def say(self, text):
+            self.pending.append(text)
+        
+        def runAndWait(self):
+            texts, self.pending = self.pending, []
+            for text in texts:
+                self.tts._on_started_utterance()
+                while text.startswith("hold") and not self.release.is_set() and \
+                        not self.stopped.is_set():
+                    time.sleep(0.005)
+                if self.stopped.is_set():
+                    self.stopped.clear()
+                    return
+                self.spoken.append(text)
+        
+        def stop(self):
+            self.stopped.set()
+    
+    def speech_queue():
+        tts = TextToSpeech()
+        tts.engine = engine = ScriptedEngine(tts)
+        tts.available = True
+        tts.phrase_cache = None
+        return tts, engine
+    
+    def wait_until_speaking(tts):
+        deadline = time.monotonic() + 2
+        while not tts.is_speaking and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert tts.is_speaking
+    
+    # Queued utterances are said by priority, then in order; repeats are said once
+    tts, engine = speech_queue()
+    tts.say("hold on")
+    wait_until_speaking(tts)
+    chatter = tts.say("by the way", PRIORITY_CHATTER)
+    tts.say("done")
+    tts.say("battery low", PRIORITY_ALERT)
+    assert tts.say("done").outcome == 'coalesced'
+    engine.release.set()
+    assert chatter.wait(2)
+    assert engine.spoken == ["hold on", "battery low", "done", "by the way"]
+    
+    # A backlog beyond max_backlog loses its least important, oldest utterances
+    tts, engine = speech_queue()
+    tts.max_backlog = 2
+    tts.say("hold on")
+    wait_until_speaking(tts)
+    first, second = tts.say("tip one", PRIORITY_CHATTER), tts.say("tip two", PRIORITY_CHATTER)
+    kept = [tts.say("result one"), tts.say("result two")]
+    assert first.outcome == 'dropped' and second.outcome == 'dropped'
+    assert tts.queue_depth() == 2 and tts.get_stats()['dropped'] == 2
+    engine.release.set()
+    assert all(utterance.wait(2) for utterance in kept)
+    
+    # interrupt() cuts off the current utterance and drops the queue, keeping alerts
+    tts, engine = speech_queue()
+    current = tts.say("hold this long answer")
+    wait_until_speaking(tts)
+    alert = tts.say("meeting in five minutes", PRIORITY_ALERT)
+    queued = tts.say("and another thing")
+    assert tts.interrupt() == 2
+    assert current.wait(2) is False and current.outcome == 'interrupted'
+    assert queued.outcome == 'dropped'
+    assert alert.wait(2) and engine.spoken == ["meeting in five minutes"]
+    
+    # Alerts themselves are only cut off when asked to
+    alert = tts.say("hold alarm", PRIORITY_ALERT)
+    wait_until_speaking(tts)
+    assert tts.interrupt() == 0
+    assert tts.interrupt(keep_alerts=False) == 1
+    assert not alert.wait(2) and alert.outcome == 'interrupted'
+    assert tts.get_stats()['interrupted'] == 2
+    
+    print("✓ Speech queue test passed")
+
+
 def run_all_tests():
     """Run all tests"""
     print("\n" + "="*60)
@@ -132,9 +1063,24 @@ def run_all_tests():
     
     try:
         test_text_commands()
+        test_async_commands()
+        test_intent_recognizer()
+        test_fallback_classifier()
+        test_intent_catalog()
+        test_spell_correction()
+        test_cancellation()
+        test_scheduler()
+        test_speculation()
+        test_event_bus()
+        test_api_server()
+        test_ipc()
         test_system_info()
         test_app_manager()
+        test_endpointer()
+        test_speech_recognition()
+        test_streaming_recognition()
         test_microphone()
+        test_speech_queue()
         test_tts()
         
         print("\n" + "="*60)
@@ -4,6 +4,8 @@ Utilities package for Jarvis V2
 
 from .logger import get_logger, log_startup, log_shutdown
 from .config_manager import get_config, ConfigManager
+from .cancellation import CancellationToken, OperationCancelled
+from .profiling import StartupProfiler
 from .helpers import (
     get_time_greeting,
     format_file_size,
@@ -20,6 +22,9 @@ __all__ = [
     'log_shutdown',
     'get_config',
     'ConfigManager',
+    'CancellationToken',
+    'OperationCancelled',
+    'StartupProfiler',
     'get_time_greeting',
     'format_file_size',
     'format_duration',
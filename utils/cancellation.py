@@ -0,0 +1,95 @@
+"""
+Cancellation tokens for Jarvis V2
+Cooperative cancellation and deadlines for long-running operations
+"""
+
+import time
+from threading import Event
+from typing import Optional
+
+
+class OperationCancelled(Exception):
+    """Raised when an operation notices its token was cancelled"""
+    
+    def __init__(self, reason: str = 'cancelled'):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancellationToken:
+    """
+    Cancellation flag with an optional deadline
+    
+    Long operations check the token between units of work (a directory, a
+    copied file, a slice of a delay) and stop early once it is cancelled or
+    its deadline has passed. A child token is cancelled with its parent but
+    may have a shorter deadline of its own.
+    """
+    
+    def __init__(self, timeout: Optional[float] = None,
+                 parent: Optional['CancellationToken'] = None):
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.parent = parent
+        self._event = Event()
+        self._reason: Optional[str] = None
+        
+        # A child never outlives its parent's deadline
+        if parent and parent.deadline and (self.deadline is None or parent.deadline < self.deadline):
+            self.deadline = parent.deadline
+    
+    def cancel(self, reason: str = 'cancelled'):
+        """Cancel the token"""
+        if not self._event.is_set():
+            self._reason = reason
+            self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether the token was cancelled or its deadline has passed"""
+        if self._event.is_set():
+            return True
+        if self.parent and self.parent.cancelled:
+            self.cancel(self.parent.reason)
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel('timed out')
+            return True
+        return False
+    
+    @property
+    def reason(self) -> Optional[str]:
+        """Why the token was cancelled, or None"""
+        return self._reason if self.cancelled else None
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without a deadline"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def raise_if_cancelled(self):
+        """Raise OperationCancelled if the token was cancelled"""
+        if self.cancelled:
+            raise OperationCancelled(self._reason)
+    
+    def wait(self, seconds: float) -> bool:
+        """
+        Sleep for up to seconds
+        Returns True if the token was cancelled before the time was up
+        """
+        end = time.monotonic() + seconds
+        while not self.cancelled:
+            left = end - time.monotonic()
+            if left <= 0:
+                return False
+            
+            # Wake up for a parent's cancellation and the deadline as well
+            remaining = self.remaining()
+            if remaining is not None:
+                left = min(left, remaining)
+            self._event.wait(min(left, 0.1) if self.parent else left)
+        return True
+    
+    def child(self, timeout: Optional[float] = None) -> 'CancellationToken':
+        """Get a token cancelled with this one, optionally with a shorter deadline"""
+        return CancellationToken(timeout, parent=self)
@@ -38,13 +38,23 @@ class ColoredFormatter(logging.Formatter):
         return result
 
 
+class LazyFileHandler(logging.FileHandler):
+    """File handler that creates its directory and opens the file on the first record"""
+    
+    def __init__(self, filename, encoding=None):
+        super().__init__(filename, encoding=encoding, delay=True)
+    
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
 class JarvisLogger:
     """Centralized logging system for Jarvis"""
     
     def __init__(self, name="Jarvis", log_dir="logs", level=logging.INFO):
         self.name = name
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True)
         
         # Create logger
         self.logger = logging.getLogger(name)
@@ -64,9 +74,9 @@ class JarvisLogger:
         console_handler.setFormatter(console_formatter)
         self.logger.addHandler(console_handler)
         
-        # File handler - daily log files
+        # File handler - daily log files, opened when the first record is written
         log_file = self.log_dir / f"jarvis_{datetime.now().strftime('%Y-%m-%d')}.log"
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler = LazyFileHandler(log_file, encoding='utf-8')
         file_handler.setLevel(logging.DEBUG)  # Log everything to file
         file_formatter = logging.Formatter(
             '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
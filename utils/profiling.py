@@ -0,0 +1,128 @@
+"""
+Startup profiling for Jarvis V2
+Per-phase startup timings and import-time trees
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Third-party packages that should only be imported by the feature using them
+OPTIONAL_DEPENDENCIES = (
+    'numpy', 'psutil', 'pyautogui', 'PIL', 'win32api', 'win32gui', 'pygetwindow',
+    'speech_recognition', 'pyttsx3', 'pyaudio', 'pvporcupine', 'customtkinter', 'pystray'
+)
+
+
+class ImportNode:
+    """One module in an import-time tree"""
+    
+    def __init__(self, name: str, self_us: int, cumulative_us: int):
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.children: List['ImportNode'] = []
+
+
+class StartupProfiler:
+    """
+    Records how long each startup phase takes
+    
+    Phases are consecutive: each one runs from the end of the previous phase
+    (or the profiler's start) until mark() is called with its name.
+    """
+    
+    def __init__(self, start: Optional[float] = None):
+        self.start = start if start is not None else time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self._last = self.start
+    
+    def mark(self, name: str) -> float:
+        """End a phase that began at the previous mark; returns its duration"""
+        now = time.perf_counter()
+        duration = now - self._last
+        self.phases.append((name, duration))
+        self._last = now
+        return duration
+    
+    def total(self) -> float:
+        """Seconds from the profiler's start to the end of the last phase"""
+        return self._last - self.start
+    
+    def format_phases(self, details: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+        """
+        Format the phase timings
+        details maps a phase name to sub-timings in milliseconds shown under it
+        """
+        lines = ["Startup phases:"]
+        for name, duration in self.phases:
+            lines.append(f"  {duration * 1000:>8.1f} ms  {name}")
+            for label, ms in (details or {}).get(name, {}).items():
+                value = f"{ms:>8.1f} ms" if ms is not None else f"{'-':>8}   "
+                lines.append(f"  {value}    {label}")
+        lines.append(f"  {self.total() * 1000:>8.1f} ms  total")
+        return '\n'.join(lines)
+
+
+def loaded_optional_dependencies() -> List[str]:
+    """Get the optional third-party packages imported so far"""
+    return [name for name in OPTIONAL_DEPENDENCIES if name in sys.modules]
+
+
+def profile_imports(*modules: str, cwd: Optional[str] = None) -> List[ImportNode]:
+    """
+    Import modules in a fresh interpreter and get their import-time trees
+    Uses the interpreter's -X importtime report, so the timings are those of
+    a cold start (apart from the operating system's file cache).
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + ', '.join(modules)],
+        cwd=cwd or str(Path(__file__).parent.parent),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    return parse_import_times(process.stderr.splitlines())
+
+
+def parse_import_times(lines: List[str]) -> List[ImportNode]:
+    """Build import-time trees from -X importtime output lines"""
+    # Modules are reported after everything they import, indented by depth
+    pending: Dict[int, List[ImportNode]] = {}
+    
+    for line in lines:
+        if not line.startswith('import time:'):
+            continue
+        
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        node = ImportNode(name.strip(), int(fields[0]), int(fields[1]))
+        node.children = pending.pop(depth + 1, [])
+        pending.setdefault(depth, []).append(node)
+    
+    return pending.get(0, [])
+
+
+def format_import_tree(roots: List[ImportNode], min_ms: float = 1.0,
+                       max_depth: int = 8) -> str:
+    """Format import-time trees, leaving out modules cheaper than min_ms"""
+    lines = [f"Import times (cumulative, modules >= {min_ms:g} ms):"]
+    
+    def walk(node: ImportNode, depth: int):
+        if node.cumulative_us < min_ms * 1000 or depth > max_depth:
+            return
+        lines.append(f"  {node.cumulative_us / 1000:>8.1f} ms  "
+                     f"{'  ' * depth}{node.name} (self {node.self_us / 1000:.1f} ms)")
+        for child in sorted(node.children, key=lambda child: -child.cumulative_us):
+            walk(child, depth + 1)
+    
+    for root in roots:
+        walk(root, 0)
+    
+    return '\n'.join(lines)
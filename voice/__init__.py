@@ -1,14 +1,43 @@
 """
 Voice package for Jarvis V2
+
+Submodules are imported on first access, so importing the package does not
+pull in speech_recognition, pyttsx3 or pyaudio until voice is actually used.
 """
 
-from .speech_recognition import SpeechRecognizer
-from .text_to_speech import TextToSpeech
-from .wake_word import WakeWordDetector, SimpleWakeWordDetector
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .speech_recognition import SpeechRecognizer, FileAudioSource
+    from .recognition_backends import RecognitionBackend, create_backend
+    from .text_to_speech import TextToSpeech
+    from .phrase_cache import PhraseCache
+    from .audio_bus import AudioBus, AudioReader, get_audio_bus
+    from .wake_word import WakeWordDetector, SimpleWakeWordDetector
+
+# Exported name -> submodule defining it
+_EXPORTS = {
+    'SpeechRecognizer': '.speech_recognition',
+    'FileAudioSource': '.speech_recognition',
+    'RecognitionBackend': '.recognition_backends',
+    'create_backend': '.recognition_backends',
+    'TextToSpeech': '.text_to_speech',
+    'PhraseCache': '.phrase_cache',
+    'AudioBus': '.audio_bus',
+    'AudioReader': '.audio_bus',
+    'get_audio_bus': '.audio_bus',
+    'WakeWordDetector': '.wake_word',
+    'SimpleWakeWordDetector': '.wake_word'
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    'SpeechRecognizer',
-    'TextToSpeech',
-    'WakeWordDetector',
-    'SimpleWakeWordDetector'
-]
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
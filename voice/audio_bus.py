@@ -0,0 +1,240 @@
+"""
+Audio Bus for Jarvis V2
+One long-lived microphone stream shared by every audio consumer
+"""
+
+from threading import Condition, Lock
+from typing import Dict, List, Optional, Union
+from utils.logger import get_logger
+from utils.config_manager import get_config
+
+logger = get_logger()
+config = get_config()
+
+SAMPLE_WIDTH = 2  # 16-bit mono PCM
+
+
+class AudioReader:
+    """
+    One consumer's position in the audio bus
+    
+    Readers never hold up capture or each other: each has its own read
+    position in the shared ring buffer. A reader that falls more than the
+    ring's length behind skips to the oldest audio still held and counts
+    an overrun.
+    """
+    
+    def __init__(self, bus: 'AudioBus', name: str, position: int):
+        self.bus = bus
+        self.name = name
+        self.position = position
+        self.closed = False
+        
+        # Statistics
+        self.bytes_read = 0
+        self.overruns = 0
+    
+    def read(self, samples: int, timeout: Optional[float] = None) -> Optional[Union[memoryview, bytes]]:
+        """
+        Get the next samples, waiting for them to be captured
+        Returns None on timeout or once the bus stops. Audio that lies in
+        one piece in the ring is returned as a memoryview of it, without
+        copying; it stays valid until the ring wraps around (ring_seconds),
+        so copy it to keep it longer. Reads of whole frames never wrap.
+        """
+        return self.bus._read(self, samples * SAMPLE_WIDTH, timeout)
+    
+    def available(self) -> int:
+        """Number of captured samples not read yet"""
+        return min(self.bus.position - self.position, self.bus.capacity) // SAMPLE_WIDTH
+    
+    def seek_to_live(self):
+        """Skip audio captured before now"""
+        self.position = self.bus.position
+    
+    def close(self):
+        """Stop reading"""
+        self.closed = True
+        self.bus._remove_reader(self)
+    
+    def get_stats(self) -> Dict:
+        return {
+            'name': self.name,
+            'behind_ms': round(self.available() / self.bus.sample_rate * 1000),
+            'bytes_read': self.bytes_read,
+            'overruns': self.overruns
+        }
+
+
+class AudioBus:
+    """
+    Shared capture stream
+    
+    The microphone is opened once and kept open; captured 16-bit mono
+    frames are written to a ring buffer holding the last ring_seconds of
+    audio. Any number of readers (wake word, command listener, voice
+    activity detection, recorders) follow the stream at their own pace
+    through open_reader(), so no consumer opens the device itself.
+    """
+    
+    def __init__(self, sample_rate: Optional[int] = None, frame_samples: Optional[int] = None,
+                 ring_seconds: Optional[float] = None, device_index: Optional[int] = None):
+        self.sample_rate = sample_rate or config.get('voice.capture_sample_rate', 16000)
+        self.frame_samples = frame_samples or config.get('voice.capture_frame_samples', 512)
+        self.device_index = device_index if device_index is not None else \
+            config.get('voice.capture_device_index')
+        ring_seconds = ring_seconds or config.get('voice.capture_ring_seconds', 10)
+        
+        # A whole number of frames, so frame-sized reads never wrap
+        frame_bytes = self.frame_samples * SAMPLE_WIDTH
+        frames = max(2, int(ring_seconds * self.sample_rate / self.frame_samples))
+        self.capacity = frames * frame_bytes
+        self._ring = bytearray(self.capacity)
+        self._view = memoryview(self._ring)
+        
+        # Total bytes captured; the ring holds [position - capacity, position)
+        self.position = 0
+        self._condition = Condition()
+        self._readers: List[AudioReader] = []
+        self._lock = Lock()
+        self._pa = None
+        self._stream = None
+        self._continue = self._overflow = 0
+        
+        # Statistics
+        self.starts = 0
+        self.overflows = 0
+    
+    @property
+    def is_running(self) -> bool:
+        return self._stream is not None
+    
+    def start(self):
+        """Open the microphone; raises OSError (or ImportError) if it can't be opened"""
+        with self._lock:
+            if self.is_running:
+                return
+            
+            import pyaudio
+            self._pa = self._pa or pyaudio.PyAudio()
+            self._continue = pyaudio.paContinue
+            self._overflow = pyaudio.paInputOverflow
+            try:
+                self._stream = self._pa.open(
+                    rate=self.sample_rate,
+                    channels=1,
+                    format=pyaudio.paInt16,
+                    input=True,
+                    input_device_index=self.device_index,
+                    frames_per_buffer=self.frame_samples,
+                    stream_callback=self._on_audio
+                )
+            except Exception as e:
+                raise OSError(f"Could not open microphone: {e}") from e
+            
+            self.starts += 1
+            logger.info(f"Audio capture started ({self.sample_rate} Hz, "
+                        f"{self.frame_samples}-sample frames)")
+    
+    def stop(self):
+        """Close the microphone; readers waiting for audio get None"""
+        with self._lock:
+            if not self.is_running:
+                return
+            
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception as e:
+                logger.debug(f"Error closing audio capture: {e}")
+            self._stream = None
+        
+        with self._condition:
+            self._condition.notify_all()
+        logger.info("Audio capture stopped")
+    
+    def open_reader(self, name: str = '', history: float = 0.0,
+                    position: Optional[int] = None) -> AudioReader:
+        """
+        Start reading the stream
+        Reading starts at position (a reader's earlier position; default
+        now), or history seconds before it, as far as the ring goes back.
+        """
+        with self._condition:
+            start = self.position if position is None else min(position, self.position)
+            start -= int(history * self.sample_rate) * SAMPLE_WIDTH
+            start = max(start, self.position - self.capacity, 0)
+            reader = AudioReader(self, name, start)
+            self._readers = self._readers + [reader]
+        return reader
+    
+    def _remove_reader(self, reader: AudioReader):
+        with self._condition:
+            self._readers = [r for r in self._readers if r is not reader]
+            self._condition.notify_all()
+    
+    def _on_audio(self, data: bytes, frame_count, time_info, status):
+        """PortAudio callback: append captured audio to the ring"""
+        if status & self._overflow:
+            self.overflows += 1
+        
+        start = self.position % self.capacity
+        end = start + len(data)
+        if end <= self.capacity:
+            self._view[start:end] = data
+        else:
+            split = self.capacity - start
+            self._view[start:] = data[:split]
+            self._view[:end - self.capacity] = data[split:]
+        
+        with self._condition:
+            self.position += len(data)
+            self._condition.notify_all()
+        return None, self._continue
+    
+    def _read(self, reader: AudioReader, size: int, timeout: Optional[float]):
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self.position - reader.position >= size or not self.is_running or reader.closed,
+                timeout
+            ) or self.position - reader.position < size:
+                return None
+            
+            # Fell behind further than the ring reaches: skip to its oldest frame
+            if self.position - reader.position > self.capacity:
+                reader.overruns += 1
+                oldest = self.position - self.capacity
+                frame_bytes = self.frame_samples * SAMPLE_WIDTH
+                reader.position = oldest + (reader.position - oldest) % frame_bytes
+        
+        start = reader.position % self.capacity
+        reader.position += size
+        reader.bytes_read += size
+        
+        if start + size <= self.capacity:
+            return self._view[start:start + size]
+        return bytes(self._view[start:]) + bytes(self._view[:start + size - self.capacity])
+    
+    def get_stats(self) -> Dict:
+        """Get capture statistics"""
+        return {
+            'running': self.is_running,
+            'captured_seconds': round(self.position / SAMPLE_WIDTH / self.sample_rate, 1),
+            'starts': self.starts,
+            'overflows': self.overflows,
+            'readers': [reader.get_stats() for reader in self._readers]
+        }
+
+
+# Global audio bus
+_audio_bus = None
+_audio_bus_lock = Lock()
+
+
+def get_audio_bus() -> AudioBus:
+    """Get or create the global audio bus"""
+    global _audio_bus
+    with _audio_bus_lock:
+        if _audio_bus is None:
+            _audio_bus = AudioBus()
+    return _audio_bus
@@ -0,0 +1,130 @@
+"""
+Phrase Cache for Jarvis V2
+Keeps synthesized audio of frequently spoken phrases on disk
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class PhraseCache:
+    """
+    Least-recently-used store of WAV files keyed by phrase and voice settings
+    
+    Entries survive restarts: the index is rebuilt from the directory with
+    file modification times as the recency order, and a file is touched
+    every time it is used. The cache is kept within max_entries files and
+    max_bytes of audio.
+    """
+    
+    def __init__(self, directory: str = 'cache/phrases', max_entries: int = 200,
+                 max_bytes: int = 50 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()  # key -> size, oldest first
+        self._lock = Lock()
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._load()
+    
+    @staticmethod
+    def key(text: str, voice: Optional[str], rate: int, volume: float) -> str:
+        """Cache key of a phrase spoken with the given settings"""
+        identity = f"{voice}|{rate}|{volume:.2f}|{text.strip()}"
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+    
+    def path(self, key: str) -> Path:
+        """File that holds (or will hold) a phrase's audio"""
+        return self.directory / f"{key}.wav"
+    
+    def get(self, key: str) -> Optional[Path]:
+        """Get a cached phrase's audio file, marking it recently used"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            # Removed behind our back
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        return path
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    def add(self, key: str, rendered: Path) -> bool:
+        """Move a freshly rendered file into the cache; False if it is unusable"""
+        path = self.path(key)
+        try:
+            size = rendered.stat().st_size
+            if size > self.max_bytes:
+                rendered.unlink()
+                return False
+            os.replace(rendered, path)
+        except OSError as e:
+            logger.warning(f"Could not cache phrase audio: {e}")
+            return False
+        
+        with self._lock:
+            self._entries[key] = size
+            self._entries.move_to_end(key)
+            self._evict()
+        return True
+    
+    def _evict(self):
+        """Remove least recently used files until within limits (lock held)"""
+        total = sum(self._entries.values())
+        while self._entries and (len(self._entries) > self.max_entries or total > self.max_bytes):
+            key, size = self._entries.popitem(last=False)
+            total -= size
+            self.evictions += 1
+            try:
+                self.path(key).unlink()
+            except OSError:
+                pass
+    
+    def _load(self):
+        """Index the files already in the cache directory"""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            files = []
+            for path in self.directory.glob('*.wav'):
+                stat = path.stat()
+                files.append((stat.st_mtime, path.stem, stat.st_size))
+        except OSError as e:
+            logger.warning(f"Phrase cache directory unavailable: {e}")
+            return
+        
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+        with self._lock:
+            self._evict()
+    
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        return {
+            'entries': len(self._entries),
+            'bytes': sum(self._entries.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
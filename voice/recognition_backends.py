@@ -0,0 +1,361 @@
+"""
+Speech Recognition Backends for Jarvis V2
+Interchangeable speech-to-text engines, selected by voice.recognition_engine
+"""
+
+import importlib.util
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from threading import Lock
+from typing import Dict, List, Optional
+import speech_recognition as sr
+from utils.logger import get_logger
+from utils.config_manager import get_config
+
+logger = get_logger()
+config = get_config()
+
+
+class RecognitionBackend(ABC):
+    """
+    Base class for speech-to-text engines
+    
+    Subclasses implement _transcribe(), which returns the transcript or
+    raises sr.UnknownValueError / sr.RequestError like speech_recognition's
+    engines do. recognize() wraps it with error handling and records how
+    long each decode took relative to the audio's length (the real-time
+    factor), so engines can be compared on the same hardware.
+    
+    open_stream() decodes a phrase while it is captured. Engines that can
+    decode incrementally (streaming = True) return their own stream; the
+    others get one that decodes everything when the phrase ends.
+    """
+    
+    name = 'base'
+    offline = False
+    streaming = False
+    
+    def __init__(self):
+        self.available = True
+        window = config.get('voice.recognition_stats_window', 100)
+        self._timings = deque(maxlen=window)
+        self._finish_timings = deque(maxlen=window)
+        self._stats_lock = Lock()
+        
+        # Statistics
+        self.decodes = 0
+        self.recognized = 0
+        self.errors = 0
+    
+    def recognize(self, audio: sr.AudioData, partial: bool = False) -> Optional[str]:
+        """
+        Transcribe audio; None if nothing was understood or the engine failed
+        partial marks a decode of a phrase that is still being recorded.
+        """
+        start = time.perf_counter()
+        text = self._call(self._transcribe, audio, partial)
+        audio_seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        self._record(time.perf_counter() - start, audio_seconds, text)
+        return text
+    
+    def open_stream(self, sample_rate: int, sample_width: int = 2) -> 'RecognitionStream':
+        """Start decoding a phrase incrementally"""
+        return RecognitionStream(self, sample_rate, sample_width)
+    
+    def _call(self, function, *args) -> Optional[str]:
+        """Run an engine call, turning engine errors into None"""
+        try:
+            return function(*args) or None
+        except sr.UnknownValueError:
+            logger.debug("Speech recognition could not understand audio")
+        except sr.RequestError as e:
+            logger.error(f"Recognition service error: {e}")
+            self.errors += 1
+        except Exception as e:
+            logger.error(f"Recognition error: {e}")
+            self.errors += 1
+        return None
+    
+    def _record(self, elapsed: float, audio_seconds: float, text: Optional[str],
+                finish_elapsed: Optional[float] = None):
+        with self._stats_lock:
+            self._timings.append((elapsed, audio_seconds))
+            if finish_elapsed is not None:
+                self._finish_timings.append(finish_elapsed)
+            self.decodes += 1
+            if text:
+                self.recognized += 1
+    
+    @abstractmethod
+    def _transcribe(self, audio: sr.AudioData, partial: bool) -> Optional[str]:
+        """Decode audio with the engine"""
+    
+    def get_stats(self) -> Dict:
+        """Decode latency and real-time factor over the recent decodes"""
+        with self._stats_lock:
+            timings = list(self._timings)
+            finish_timings = sorted(self._finish_timings)
+        
+        stats = {
+            'engine': self.name,
+            'offline': self.offline,
+            'decodes': self.decodes,
+            'recognized': self.recognized,
+            'errors': self.errors
+        }
+        if timings:
+            latencies = sorted(elapsed * 1000 for elapsed, _ in timings)
+            audio_seconds = sum(seconds for _, seconds in timings)
+            stats.update({
+                'latency_p50_ms': round(latencies[len(latencies) // 2], 1),
+                'latency_p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+                'real_time_factor': round(sum(elapsed for elapsed, _ in timings) / audio_seconds, 3)
+                if audio_seconds else None
+            })
+        if finish_timings:
+            # Time from the end of a streamed phrase to its final transcript
+            stats['finalize_p50_ms'] = round(finish_timings[len(finish_timings) // 2] * 1000, 1)
+        return stats
+
+
+class RecognitionStream:
+    """
+    Incremental decode of one phrase
+    
+    accept() takes audio as it is captured and returns the hypothesis so
+    far when it changes; finish() returns the final transcript. This base
+    stream only buffers the audio and decodes all of it in finish(), for
+    engines that can't decode incrementally.
+    """
+    
+    def __init__(self, backend: RecognitionBackend, sample_rate: int, sample_width: int = 2):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.hypothesis = ''
+        self.audio_bytes = 0
+        self.decode_seconds = 0.0
+        self._buffer = bytearray()
+    
+    def accept(self, data) -> Optional[str]:
+        """Decode the next captured audio; returns the new hypothesis if it changed"""
+        start = time.perf_counter()
+        self.audio_bytes += len(data)
+        text = self.backend._call(self._accept, bytes(data))
+        self.decode_seconds += time.perf_counter() - start
+        
+        if text and text != self.hypothesis:
+            self.hypothesis = text
+            return text
+        return None
+    
+    def finish(self) -> Optional[str]:
+        """Get the final transcript of the phrase"""
+        start = time.perf_counter()
+        text = self.backend._call(self._finish)
+        elapsed = time.perf_counter() - start
+        self.decode_seconds += elapsed
+        
+        audio_seconds = self.audio_bytes / (self.sample_rate * self.sample_width)
+        self.backend._record(self.decode_seconds, audio_seconds, text, finish_elapsed=elapsed)
+        return text
+    
+    def _accept(self, data: bytes) -> Optional[str]:
+        self._buffer += data
+        return None
+    
+    def _finish(self) -> Optional[str]:
+        audio = sr.AudioData(bytes(self._buffer), self.sample_rate, self.sample_width)
+        return self.backend._transcribe(audio, False)
+
+
+class SpeechRecognitionBackend(RecognitionBackend):
+    """Engines built into the speech_recognition package (web services and Sphinx)"""
+    
+    ENGINES = ('google', 'sphinx', 'wit', 'azure')
+    
+    def __init__(self, engine: str = 'google'):
+        super().__init__()
+        self.name = engine if engine in self.ENGINES else 'google'
+        self.offline = self.name == 'sphinx'
+        self.recognizer = sr.Recognizer()
+        self.api_key = None
+        
+        if self.name in ('wit', 'azure'):
+            self.api_key = config.get(f'advanced.api_keys.{self.name}_key')
+            if not self.api_key:
+                logger.warning(f"No {self.name} API key configured - using Google speech recognition")
+                self.name = 'google'
+    
+    def _transcribe(self, audio: sr.AudioData, partial: bool) -> Optional[str]:
+        if self.name == 'sphinx':
+            return self.recognizer.recognize_sphinx(audio)
+        elif self.name == 'wit':
+            return self.recognizer.recognize_wit(audio, key=self.api_key)
+        elif self.name == 'azure':
+            return self.recognizer.recognize_azure(audio, key=self.api_key)
+        return self.recognizer.recognize_google(audio)
+
+
+class VoskBackend(RecognitionBackend):
+    """
+    Offline recognition with a local Vosk (Kaldi) model on the CPU
+    
+    The model is loaded once, when the backend is created; each decode
+    then only needs a lightweight recognizer over it. Streams feed audio
+    to the recognizer as it arrives, so little is left to decode when the
+    phrase ends.
+    """
+    
+    name = 'vosk'
+    offline = True
+    streaming = True
+    
+    def __init__(self, model_path: Optional[str] = None):
+        super().__init__()
+        self.model_path = model_path or config.get('voice.vosk_model_path', 'models/vosk-model-small-en-us-0.15')
+        self.model = None
+        self.available = False
+        
+        if importlib.util.find_spec('vosk') is None:
+            logger.warning("vosk not installed. Offline speech recognition disabled.")
+            logger.info("Install with: pip install vosk")
+            return
+        
+        try:
+            import vosk
+            vosk.SetLogLevel(-1)
+            self._vosk = vosk
+            self.model = vosk.Model(self.model_path)
+            self.available = True
+            logger.info(f"Vosk model loaded from {self.model_path}")
+        except Exception as e:
+            logger.error(f"Could not load Vosk model from {self.model_path}: {e}")
+    
+    def _transcribe(self, audio: sr.AudioData, partial: bool) -> Optional[str]:
+        recognizer = self._vosk.KaldiRecognizer(self.model, audio.sample_rate)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_width=2))
+        return json.loads(recognizer.FinalResult()).get('text')
+    
+    def open_stream(self, sample_rate: int, sample_width: int = 2) -> RecognitionStream:
+        return VoskStream(self, sample_rate, sample_width)
+
+
+class VoskStream(RecognitionStream):
+    """Incremental Vosk decode; the recognizer splits long phrases into segments"""
+    
+    def __init__(self, backend: VoskBackend, sample_rate: int, sample_width: int = 2):
+        super().__init__(backend, sample_rate, sample_width)
+        self.recognizer = backend._vosk.KaldiRecognizer(backend.model, sample_rate)
+        self.segments: List[str] = []
+    
+    def _accept(self, data: bytes) -> Optional[str]:
+        if self.recognizer.AcceptWaveform(data):
+            self._add_segment(json.loads(self.recognizer.Result()).get('text', ''))
+            return ' '.join(self.segments)
+        partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        return ' '.join(self.segments + [partial]).strip()
+    
+    def _finish(self) -> Optional[str]:
+        self._add_segment(json.loads(self.recognizer.FinalResult()).get('text', ''))
+        return ' '.join(self.segments)
+    
+    def _add_segment(self, text: str):
+        if text:
+            self.segments.append(text)
+
+
+class ScriptedBackend(RecognitionBackend):
+    """
+    Deterministic stand-in engine for tests and benchmarks
+    
+    Each finished phrase is transcribed as the next of the scripted
+    transcripts, in turn. Partial decodes don't advance the script; they
+    return as many words of the upcoming transcript as the audio covers at
+    seconds_per_word. Decoding takes real_time_factor times the length of
+    the audio, so latency can be modelled without a real engine; streams
+    spend that time as the audio arrives.
+    """
+    
+    name = 'scripted'
+    offline = True
+    streaming = True
+    
+    def __init__(self, transcripts: Optional[List[str]] = None, real_time_factor: Optional[float] = None,
+                 seconds_per_word: float = 0.3):
+        super().__init__()
+        self.transcripts = list(transcripts if transcripts is not None else
+                                config.get('voice.scripted_transcripts', []))
+        self.real_time_factor = real_time_factor if real_time_factor is not None else \
+            config.get('voice.scripted_real_time_factor', 0.0)
+        self.seconds_per_word = seconds_per_word
+        self.index = 0
+    
+    def _transcribe(self, audio: sr.AudioData, partial: bool) -> Optional[str]:
+        audio_seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        self._decode_time(audio_seconds)
+        if not audio.frame_data:
+            raise sr.UnknownValueError()
+        return self._words(audio_seconds) if partial else self._next_transcript()
+    
+    def open_stream(self, sample_rate: int, sample_width: int = 2) -> RecognitionStream:
+        return ScriptedStream(self, sample_rate, sample_width)
+    
+    def _decode_time(self, audio_seconds: float):
+        if self.real_time_factor:
+            time.sleep(audio_seconds * self.real_time_factor)
+    
+    def _words(self, audio_seconds: float) -> str:
+        """The words of the upcoming transcript spoken in audio_seconds"""
+        if not self.transcripts:
+            raise sr.UnknownValueError()
+        words = self.transcripts[self.index % len(self.transcripts)].split()
+        return ' '.join(words[:int(audio_seconds / self.seconds_per_word)])
+    
+    def _next_transcript(self) -> str:
+        if not self.transcripts:
+            raise sr.UnknownValueError()
+        text = self.transcripts[self.index % len(self.transcripts)]
+        self.index += 1
+        return text
+
+
+class ScriptedStream(RecognitionStream):
+    """Incremental decode by the scripted stand-in engine"""
+    
+    def _accept(self, data: bytes) -> Optional[str]:
+        self.backend._decode_time(len(data) / (self.sample_rate * self.sample_width))
+        return self.backend._words(self.audio_bytes / (self.sample_rate * self.sample_width))
+    
+    def _finish(self) -> Optional[str]:
+        if not self.audio_bytes:
+            raise sr.UnknownValueError()
+        return self.backend._next_transcript()
+
+
+# Engine name -> backend class; speech_recognition's engines are the default
+BACKENDS = {
+    'vosk': VoskBackend,
+    'scripted': ScriptedBackend
+}
+
+
+def create_backend(engine: Optional[str] = None) -> RecognitionBackend:
+    """
+    Create the backend for an engine name (default voice.recognition_engine)
+    Falls back to Google speech recognition if the engine is unavailable.
+    """
+    engine = (engine or config.get('voice.recognition_engine', 'google')).lower()
+    
+    if engine in BACKENDS:
+        backend = BACKENDS[engine]()
+        if backend.available:
+            return backend
+        logger.warning(f"Speech recognition engine '{engine}' unavailable - using Google")
+        return SpeechRecognitionBackend('google')
+    
+    if engine not in SpeechRecognitionBackend.ENGINES:
+        logger.warning(f"Unknown speech recognition engine '{engine}' - using Google")
+    return SpeechRecognitionBackend(engine)
@@ -3,65 +3,223 @@ Speech Recognition for Jarvis V2
 Converts speech to text using various engines
 """
 
+import importlib.util
+import time
 import speech_recognition as sr
-from typing import Optional, Dict
+from pathlib import Path
+from threading import Thread
+from typing import Callable, Iterator, Optional, Dict, Tuple, Union
 from utils.logger import get_logger
 from utils.config_manager import get_config
+from voice.audio_bus import SAMPLE_WIDTH, AudioReader, get_audio_bus
+from voice.recognition_backends import RecognitionStream, create_backend
 
 logger = get_logger()
 config = get_config()
 
 
+class BusAudioSource(sr.AudioSource):
+    """speech_recognition audio source that reads from the shared audio bus"""
+    
+    def __init__(self, reader: AudioReader, read_timeout: float = 2.0):
+        self.reader = reader
+        self.read_timeout = read_timeout
+        self.SAMPLE_RATE = reader.bus.sample_rate
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = reader.bus.frame_samples
+        self.stream = self
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.reader.close()
+    
+    def read(self, size: int) -> bytes:
+        """Read size samples (the stream interface the recognizer expects)"""
+        data = self.reader.read(size, self.read_timeout)
+        if data is None:
+            raise OSError("Audio capture stopped")
+        return bytes(data)
+    
+    def read_chunk(self) -> Optional[Union[memoryview, bytes]]:
+        """Next frame of audio; None once capture stops"""
+        return self.reader.read(self.CHUNK, self.read_timeout)
+
+
+class FileAudioSource(sr.AudioSource):
+    """
+    Audio source that replays a recording, to listen without a microphone
+    
+    Anything sr.AudioFile reads (WAV, AIFF, FLAC) is converted to 16-bit
+    mono at the capture sample rate. With realtime, audio is delivered at
+    the pace it was recorded, like a live microphone. Successive listens
+    continue where the previous one stopped.
+    """
+    
+    def __init__(self, path: Union[str, Path], realtime: bool = False, sample_rate: Optional[int] = None):
+        self.SAMPLE_RATE = sample_rate or config.get('voice.capture_sample_rate', 16000)
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = config.get('voice.capture_frame_samples', 512)
+        self.stream = self
+        self.realtime = realtime
+        
+        with sr.AudioFile(str(path)) as source:
+            audio = sr.Recognizer().record(source)
+        self.data = audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+        self.position = 0
+        self._clock: Optional[float] = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        pass
+    
+    @property
+    def seconds(self) -> float:
+        """Audio replayed so far"""
+        return self.position / (self.SAMPLE_RATE * SAMPLE_WIDTH)
+    
+    def read(self, size: int) -> bytes:
+        """Read size samples; empty at the end of the recording"""
+        chunk = self.data[self.position:self.position + size * SAMPLE_WIDTH]
+        self.position += len(chunk)
+        
+        if self.realtime and chunk:
+            now = time.perf_counter()
+            if self._clock is None:
+                self._clock = now - (self.position - len(chunk)) / (self.SAMPLE_RATE * SAMPLE_WIDTH)
+            time.sleep(max(0.0, self._clock + self.seconds - now))
+        return chunk
+    
+    def read_chunk(self) -> bytes:
+        return self.read(self.CHUNK)
+
+
 class SpeechRecognizer:
-    """Handles speech-to-text conversion"""
+    """
+    Handles speech-to-text conversion
+    
+    Audio comes from the shared audio bus, which keeps the microphone open,
+    so listening never opens the device; the ambient noise calibration is
+    done once and then kept current by the dynamic energy threshold.
+    
+    With NumPy available, phrases are endpointed by voice activity
+    detection (see voice.vad) instead of the energy threshold: listening
+    stops shortly after the speaker does, and only the speech itself, with
+    a little padding, is sent to the recognition engine.
+    
+    The engine is a recognition backend chosen by voice.recognition_engine
+    (see voice.recognition_backends); 'vosk' decodes locally, offline.
+    Engines that decode incrementally are fed the phrase while it is being
+    spoken (voice.streaming_recognition, see listen_stream), so the final
+    transcript follows the end of speech closely however long it was.
+    """
     
     def __init__(self):
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        self.bus = get_audio_bus()
+        try:
+            self.bus.start()
+        except Exception as e:
+            logger.warning(f"Microphone unavailable: {e}")
         
         # Load configuration
-        self.engine = config.get('voice.recognition_engine', 'google')
+        self.backend = create_backend()
+        self.engine = self.backend.name
         self.timeout = config.get('voice.recognition_timeout', 5)
         self.phrase_limit = config.get('voice.phrase_time_limit', 10)
         self.energy_threshold = config.get('voice.energy_threshold', 4000)
         self.dynamic_energy = config.get('voice.dynamic_energy_threshold', True)
+        self.partial_results = config.get('voice.partial_results', True)
+        self.partial_interval = config.get('voice.partial_interval', 0.5)
+        self.streaming = config.get('voice.streaming_recognition', True)
         
         # Configure recognizer
         self.recognizer.energy_threshold = self.energy_threshold
         self.recognizer.dynamic_energy_threshold = self.dynamic_energy
         
+        self.vad = None
+        if config.get('voice.vad_enabled', True):
+            if importlib.util.find_spec('numpy') is not None:
+                from voice.vad import VoiceActivityDetector
+                self.vad = VoiceActivityDetector(self.bus.sample_rate)
+            else:
+                logger.warning("numpy not available - using energy threshold endpointing")
+        
         # Calibrate for ambient noise
         self._calibrate()
     
     def _calibrate(self):
         """Calibrate for ambient noise"""
+        if not self.bus.is_running:
+            return
+        
         try:
             logger.info("Calibrating microphone for ambient noise...")
-            with self.microphone as source:
+            with self._capture('calibration') as source:
                 self.recognizer.adjust_for_ambient_noise(source, duration=1)
+            
+            if self.vad:
+                # The same second of background audio sets the VAD's noise floor
+                from voice.vad import to_samples
+                reader = self.bus.open_reader('vad calibration', history=1.0)
+                self.vad.calibrate(to_samples(reader.read(reader.available(), timeout=0)))
+                reader.close()
             logger.info(f"Calibration complete. Energy threshold: {self.recognizer.energy_threshold}")
         except Exception as e:
             logger.warning(f"Could not calibrate microphone: {e}")
     
     def listen(self, timeout: Optional[float] = None, 
-              phrase_time_limit: Optional[float] = None) -> Dict[str, any]:
+              phrase_time_limit: Optional[float] = None,
+              on_partial: Optional[Callable[[str], None]] = None,
+              start_position: Optional[int] = None, preroll: float = 0.0,
+              source: Optional[sr.AudioSource] = None) -> Dict[str, any]:
         """
         Listen for speech and convert to text
         Returns dict with success status and recognized text
+        
+        If on_partial is given, transcripts of the audio captured so far are
+        passed to it while the phrase is still being recorded.
+        
+        start_position (an audio bus position) makes listening start with
+        audio already captured from there, less preroll seconds, rather
+        than from now; timeout then counts from that point.
+        
+        With voice activity detection, the result also has speech_start and
+        speech_end (seconds from the start of listening) and audio_seconds
+        (the length of audio sent for recognition).
+        
+        source replaces the microphone, e.g. with a FileAudioSource.
         """
+        if self.streaming and self.backend.streaming:
+            result = {}
+            for result in self.listen_stream(timeout, phrase_time_limit, start_position, preroll, source):
+                if result.get('partial') and on_partial and self.partial_results:
+                    self._report_partial(on_partial, result['text'])
+            return result
+        
         try:
             timeout = timeout or self.timeout
             phrase_limit = phrase_time_limit or self.phrase_limit
             
             logger.debug("Listening for speech...")
             
-            with self.microphone as source:
+            timing = {}
+            with source or self._capture('listener', start_position, preroll) as source:
                 try:
-                    audio = self.recognizer.listen(
-                        source,
-                        timeout=timeout,
-                        phrase_time_limit=phrase_limit
-                    )
+                    if self.vad:
+                        audio, timing = self._listen_vad(source, timeout, phrase_limit,
+                                                         on_partial if self.partial_results else None)
+                    elif on_partial and self.partial_results:
+                        audio = self._listen_with_partials(source, timeout, phrase_limit, on_partial)
+                    else:
+                        audio = self.recognizer.listen(
+                            source,
+                            timeout=timeout,
+                            phrase_time_limit=phrase_limit
+                        )
                 except sr.WaitTimeoutError:
                     return {
                         'success': False,
@@ -75,10 +233,7 @@ class SpeechRecognizer:
             
             if text:
                 logger.info(f"Recognized: {text}")
-                return {
-                    'success': True,
-                    'text': text
-                }
+                return dict(timing, success=True, text=text)
             else:
                 return {
                     'success': False,
@@ -94,36 +249,226 @@ class SpeechRecognizer:
                 'message': str(e)
             }
     
-    def _recognize_audio(self, audio: sr.AudioData) -> Optional[str]:
-        """Recognize audio using configured engine"""
+    def _capture(self, name: str, position: Optional[int] = None,
+                 history: float = 0.0) -> BusAudioSource:
+        """Audio source for one use, starting now or at an earlier bus position"""
+        self.bus.start()
+        return BusAudioSource(self.bus.open_reader(name, history, position))
+    
+    def _listen_with_partials(self, source, timeout: float, phrase_limit: float,
+                              on_partial: Callable[[str], None]) -> sr.AudioData:
+        """
+        Record a phrase while decoding the audio captured so far in the background
+        A new partial decode only starts once the previous one has finished,
+        so slow engines simply produce fewer partials.
+        """
+        chunks = []
+        captured = 0
+        decoded_at = 0
+        decoder: Optional[Thread] = None
+        interval = int(self.partial_interval * source.SAMPLE_RATE * source.SAMPLE_WIDTH)
+        
+        for chunk in self.recognizer.listen(source, timeout=timeout,
+                                            phrase_time_limit=phrase_limit, stream=True):
+            chunks.append(chunk.frame_data)
+            captured += len(chunk.frame_data)
+            
+            if captured - decoded_at >= interval and (decoder is None or not decoder.is_alive()):
+                audio = sr.AudioData(b"".join(chunks), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                decoder = Thread(target=self._decode_partial, args=(audio, on_partial), daemon=True)
+                decoder.start()
+                decoded_at = captured
+        
+        return sr.AudioData(b"".join(chunks), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+    
+    def _listen_vad(self, source: BusAudioSource, timeout: float, phrase_limit: float,
+                    on_partial: Optional[Callable[[str], None]]) -> Tuple[sr.AudioData, Dict]:
+        """
+        Record a phrase, ending it once voice activity detection hears the speaker stop
+        Leading and trailing silence are trimmed from the audio returned.
+        """
+        from voice.vad import Endpointer
+        
+        endpointer = Endpointer(self.vad)
+        captured = bytearray()
+        width = source.SAMPLE_WIDTH
+        bytes_per_second = source.SAMPLE_RATE * width
+        interval = int(self.partial_interval * bytes_per_second)
+        decoded_at = 0
+        decoder: Optional[Thread] = None
+        
+        while not endpointer.ended:
+            if not self._read_into(source, endpointer, captured):
+                break
+            seconds = len(captured) / bytes_per_second
+            
+            if endpointer.speech_start is None:
+                if seconds > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                continue
+            
+            if seconds - endpointer.speech_start >= phrase_limit:
+                endpointer.finish()
+            elif on_partial and len(captured) - decoded_at >= interval and \
+                    (decoder is None or not decoder.is_alive()):
+                start, _ = endpointer.bounds(len(captured) // width)
+                audio = sr.AudioData(bytes(captured[start * width:]), source.SAMPLE_RATE, width)
+                decoder = Thread(target=self._decode_partial, args=(audio, on_partial), daemon=True)
+                decoder.start()
+                decoded_at = len(captured)
+        
+        if endpointer.speech_start is None:
+            raise sr.WaitTimeoutError("audio ended before a phrase started")
+        
+        start, end = endpointer.bounds(len(captured) // width)
+        timing = {
+            'speech_start': round(endpointer.speech_start, 3),
+            'speech_end': round(endpointer.speech_end, 3),
+            'audio_seconds': round((end - start) / source.SAMPLE_RATE, 3)
+        }
+        return sr.AudioData(bytes(captured[start * width:end * width]), source.SAMPLE_RATE, width), timing
+    
+    def listen_stream(self, timeout: Optional[float] = None,
+                      phrase_time_limit: Optional[float] = None,
+                      start_position: Optional[int] = None, preroll: float = 0.0,
+                      source: Optional[sr.AudioSource] = None) -> Iterator[Dict[str, any]]:
+        """
+        Listen for speech, decoding it while it is captured
+        Yields {'partial': True, 'text': ...} whenever the hypothesis so far
+        changes, then the result as listen() returns it. finalize_ms in
+        the result is how long the final transcript took after the end of
+        speech was detected.
+        
+        Captured audio goes straight to the engine's incremental decoder
+        (a RecognitionStream); engines without one decode the whole phrase
+        once it ends. Arguments are as for listen().
+        """
+        try:
+            timeout = timeout or self.timeout
+            phrase_limit = phrase_time_limit or self.phrase_limit
+            
+            with source or self._capture('listener', start_position, preroll) as source:
+                stream = self.backend.open_stream(source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                try:
+                    if self.vad:
+                        timing = yield from self._stream_vad(source, stream, timeout, phrase_limit)
+                    else:
+                        timing = yield from self._stream_energy(source, stream, timeout, phrase_limit)
+                except sr.WaitTimeoutError:
+                    yield {
+                        'success': False,
+                        'error': 'timeout',
+                        'message': 'No speech detected'
+                    }
+                    return
+            
+            start = time.perf_counter()
+            text = stream.finish()
+            timing['finalize_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            
+            if text:
+                logger.info(f"Recognized: {text}")
+                yield dict(timing, success=True, text=text)
+            else:
+                yield {
+                    'success': False,
+                    'error': 'no_recognition',
+                    'message': 'Could not understand audio'
+                }
+        
+        except Exception as e:
+            logger.error(f"Error during speech recognition: {e}")
+            yield {
+                'success': False,
+                'error': 'exception',
+                'message': str(e)
+            }
+    
+    def _stream_vad(self, source, stream: RecognitionStream, timeout: float,
+                    phrase_limit: float) -> Iterator[Dict[str, any]]:
+        """
+        Feed a phrase to the decoder from where voice activity detection
+        hears speech start until it hears it end; returns the timing
+        """
+        from voice.vad import Endpointer
+        
+        endpointer = Endpointer(self.vad)
+        captured = bytearray()
+        width = source.SAMPLE_WIDTH
+        bytes_per_second = source.SAMPLE_RATE * width
+        fed = None
+        
+        while not endpointer.ended:
+            if not self._read_into(source, endpointer, captured):
+                break
+            seconds = len(captured) / bytes_per_second
+            
+            if endpointer.speech_start is None:
+                if seconds > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                continue
+            
+            if fed is None:
+                # Speech just started: decode from its padded start
+                fed = endpointer.bounds(len(captured) // width)[0] * width
+            text = stream.accept(captured[fed:])
+            fed = len(captured)
+            if text:
+                yield {'partial': True, 'text': text}
+            
+            if seconds - endpointer.speech_start >= phrase_limit:
+                endpointer.finish()
+        
+        if endpointer.speech_start is None:
+            raise sr.WaitTimeoutError("audio ended before a phrase started")
+        
+        return {
+            'speech_start': round(endpointer.speech_start, 3),
+            'speech_end': round(endpointer.speech_end, 3),
+            'audio_seconds': round(stream.audio_bytes / bytes_per_second, 3)
+        }
+    
+    def _stream_energy(self, source, stream: RecognitionStream, timeout: float,
+                       phrase_limit: float) -> Iterator[Dict[str, any]]:
+        """Feed a phrase endpointed by the energy threshold to the decoder"""
+        for chunk in self.recognizer.listen(source, timeout=timeout,
+                                            phrase_time_limit=phrase_limit, stream=True):
+            text = stream.accept(chunk.frame_data)
+            if text:
+                yield {'partial': True, 'text': text}
+        return {}
+    
+    def _read_into(self, source, endpointer, captured: bytearray) -> bool:
+        """Read a frame for voice activity detection; False at the end of a recording"""
+        from voice.vad import to_samples
+        
+        data = source.read_chunk()
+        if data is None:
+            raise OSError("Audio capture stopped")
+        if not data:
+            endpointer.finish()
+            return False
+        
+        endpointer.feed(to_samples(data))
+        captured += data
+        return True
+    
+    def _decode_partial(self, audio: sr.AudioData, on_partial: Callable[[str], None]):
+        """Recognize partial audio and report the transcript"""
+        text = self._recognize_audio(audio, partial=True)
+        if text:
+            self._report_partial(on_partial, text)
+    
+    def _report_partial(self, on_partial: Callable[[str], None], text: str):
+        logger.debug(f"Partial: {text}")
         try:
-            if self.engine == 'google':
-                return self.recognizer.recognize_google(audio)
-            elif self.engine == 'sphinx':
-                return self.recognizer.recognize_sphinx(audio)
-            elif self.engine == 'wit':
-                # Requires API key
-                api_key = config.get('advanced.api_keys.wit_key')
-                if api_key:
-                    return self.recognizer.recognize_wit(audio, key=api_key)
-            elif self.engine == 'azure':
-                # Requires API key
-                api_key = config.get('advanced.api_keys.azure_key')
-                if api_key:
-                    return self.recognizer.recognize_azure(audio, key=api_key)
-            
-            # Default to Google
-            return self.recognizer.recognize_google(audio)
-            
-        except sr.UnknownValueError:
-            logger.debug("Speech recognition could not understand audio")
-            return None
-        except sr.RequestError as e:
-            logger.error(f"Recognition service error: {e}")
-            return None
+            on_partial(text)
         except Exception as e:
-            logger.error(f"Recognition error: {e}")
-            return None
+            logger.error(f"Error handling partial transcript: {e}")
+    
+    def _recognize_audio(self, audio: sr.AudioData, partial: bool = False) -> Optional[str]:
+        """Recognize audio using configured engine"""
+        return self.backend.recognize(audio, partial)
     
     def listen_continuous(self, callback, stop_event):
         """
@@ -132,7 +477,7 @@ class SpeechRecognizer:
         """
         logger.info("Starting continuous listening mode")
         
-        with self.microphone as source:
+        with self._capture('continuous listener') as source:
             while not stop_event.is_set():
                 try:
                     logger.debug("Listening...")
@@ -162,7 +507,7 @@ class SpeechRecognizer:
         try:
             logger.info("Testing microphone...")
             
-            with self.microphone as source:
+            with self._capture('microphone test') as source:
                 logger.info("Microphone is accessible")
                 
                 # Try to record a brief sample
@@ -170,7 +515,8 @@ class SpeechRecognizer:
                 
                 return {
                     'success': True,
-                    'message': 'Microphone is working'
+                    'message': 'Microphone is working',
+                    'capture': self.bus.get_stats()
                 }
                 
         except sr.WaitTimeoutError:
@@ -185,6 +531,13 @@ class SpeechRecognizer:
                 'message': f'Microphone test failed: {str(e)}'
             }
     
+    def get_stats(self) -> Dict[str, any]:
+        """Get recognition engine and capture statistics"""
+        return {
+            'recognition': self.backend.get_stats(),
+            'capture': self.bus.get_stats()
+        }
+    
     def set_energy_threshold(self, threshold: int):
         """Set energy threshold for voice detection"""
         self.recognizer.energy_threshold = threshold
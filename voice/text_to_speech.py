@@ -3,19 +3,165 @@ Text-to-Speech for Jarvis V2
 Converts text to spoken audio
 """
 
+import heapq
+import importlib.util
+import itertools
+import os
+import re
+import tempfile
+import time
+import wave
 import pyttsx3
-from typing import Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Condition, Event, Lock, Thread
+from typing import Callable, Dict, List, Optional
 from utils.logger import get_logger
 from utils.config_manager import get_config
+from voice.phrase_cache import PhraseCache
 
 logger = get_logger()
 config = get_config()
 
+# Utterance priorities (lower is spoken first)
+PRIORITY_ALERT = 0
+PRIORITY_RESPONSE = 1
+PRIORITY_CHATTER = 2
+
+# Markdown that should not be read out
+_MARKDOWN = (
+    (re.compile(r'\[([^\]]+)\]\([^)]*\)'), r'\1'),      # [link](url)
+    (re.compile(r'\*\*|__|`'), ''),                      # bold, code
+    (re.compile(r'(?<!\w)\*(\S[^*]*)\*(?!\w)'), r'\1'),   # *italic*
+    (re.compile(r'^[ \t]*#+[ \t]*', re.M), ''),           # headings
+    (re.compile(r'^[ \t]*[-*\u2022][ \t]+', re.M), ''),   # bullets
+)
+
+# A sentence ends at punctuation followed by whitespace ("chrome.exe" doesn't end one)
+_SENTENCE_END = re.compile(r'(?<=[.!?;:])\s+')
+
+
+def clean_for_speech(text: str) -> str:
+    """Strip markdown formatting from text that is about to be spoken"""
+    for pattern, replacement in _MARKDOWN:
+        text = pattern.sub(replacement, text)
+    return '\n'.join(' '.join(line.split()) for line in text.splitlines() if line.strip())
+
+
+def split_for_speech(text: str, max_chars: int = 200) -> List[str]:
+    """
+    Split text into chunks that can be synthesized one at a time
+    Chunks are lines, then sentences; a sentence longer than max_chars is
+    split at clause boundaries (commas, dashes) or, failing that, spaces.
+    """
+    chunks = []
+    for line in text.splitlines():
+        for sentence in _SENTENCE_END.split(line.strip()):
+            while len(sentence) > max_chars:
+                cut = max(sentence.rfind(', ', 0, max_chars), sentence.rfind(' - ', 0, max_chars))
+                if cut <= 0:
+                    cut = sentence.rfind(' ', 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                chunks.append(sentence[:cut + 1].strip())
+                sentence = sentence[cut + 1:].strip()
+            if sentence:
+                chunks.append(sentence)
+    return chunks
+
+
+class Utterance:
+    """A piece of text waiting in or being spoken by the speech queue"""
+    
+    def __init__(self, text: str, priority: int,
+                 on_finished: Optional[Callable[['Utterance'], None]] = None):
+        self.text = text
+        self.priority = priority
+        self.on_finished = on_finished
+        self.queued_at = time.perf_counter()
+        self.started_at: Optional[float] = None
+        self.first_audio_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.outcome: Optional[str] = None  # spoken, interrupted, dropped, coalesced, failed
+        self._done = Event()
+    
+    @property
+    def spoken(self) -> bool:
+        return self.outcome == 'spoken'
+    
+    @property
+    def time_to_first_audio(self) -> Optional[float]:
+        """Seconds from queueing until the engine started producing audio"""
+        if self.first_audio_at is None:
+            return None
+        return self.first_audio_at - self.queued_at
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the utterance is spoken or discarded; returns True if spoken"""
+        self._done.wait(timeout)
+        return self.spoken
+    
+    def __repr__(self):
+        return f"Utterance({self.text!r}, {self.priority})"
+
 
 class TextToSpeech:
-    """Handles text-to-speech conversion"""
+    """
+    Handles text-to-speech conversion
+    
+    Utterances are spoken one at a time by a worker thread that owns the
+    engine's run loop, so speak() returns immediately. The queue is ordered
+    by priority; when it backs up, utterances that have waited longer than
+    max_age are dropped, then the oldest lowest-priority ones, so what is
+    said stays current. interrupt() cuts off the current utterance.
+    
+    Fixed phrases (warm_cache) and phrases spoken repeatedly are rendered
+    to WAV files while the worker is idle and played from the phrase cache
+    from then on, skipping synthesis.
+    
+    Markdown is stripped before synthesis. In streaming mode, longer text
+    is spoken a sentence at a time: with PyAudio the next sentence is
+    synthesized to a file while the current one plays, so the time to the
+    first word does not grow with the length of the text.
+    """
     
     def __init__(self):
+        # Speech queue (see speak)
+        self.max_backlog = config.get('voice.tts_max_backlog', 3)
+        self.max_age = config.get('voice.tts_max_age', 10)
+        self._queue: List = []
+        self._sequence = itertools.count()
+        self._condition = Condition()
+        self._engine_lock = Lock()
+        self._worker: Optional[Thread] = None
+        self._current: Optional[Utterance] = None
+        self._interrupting = False
+        
+        # Phrases waiting to be rendered into the cache, and how often each was said
+        self.phrase_cache: Optional[PhraseCache] = None
+        self.cache_min_uses = config.get('voice.phrase_cache_min_uses', 2)
+        self._renders = deque()
+        self._use_counts: Dict[str, int] = {}
+        self._audio = None
+        self._can_play = importlib.util.find_spec('pyaudio') is not None
+        
+        # Streaming (see _speak_chunks)
+        self.streaming = config.get('voice.tts_streaming', True)
+        self.chunk_chars = config.get('voice.tts_chunk_chars', 200)
+        self._chunk_renderer: Optional[ThreadPoolExecutor] = None
+        
+        # Statistics
+        self.stats = {
+            'spoken': 0,
+            'interrupted': 0,
+            'dropped': 0,
+            'coalesced': 0,
+            'failed': 0,
+            'max_queue_depth': 0
+        }
+        self._first_audio_times: List[float] = []
+        
         try:
             self.engine = pyttsx3.init()
             
@@ -29,54 +175,395 @@ class TextToSpeech:
             self.engine.setProperty('volume', self.volume)
             
             # Set voice
+            self.voice_id = self.engine.getProperty('voice')
             if voice_name != 'default':
                 self._set_voice(voice_name)
             
+            # Time to first audio, and a place to stop an interrupted utterance
+            self.engine.connect('started-utterance', self._on_started_utterance)
+            self.engine.connect('started-word', self._on_started_word)
+            
             self.available = True
             logger.info("Text-to-speech initialized successfully")
             
+            if config.get('voice.phrase_cache_enabled', True):
+                self.phrase_cache = self._init_phrase_cache()
+        
         except Exception as e:
             logger.error(f"Failed to initialize text-to-speech: {e}")
             self.engine = None
             self.available = False
     
-    def speak(self, text: str, wait: bool = True) -> bool:
+    def speak(self, text: str, wait: bool = False, priority: int = PRIORITY_RESPONSE,
+              on_finished: Optional[Callable[[Utterance], None]] = None) -> bool:
         """
-        Speak the given text
+        Queue text to be spoken
         
         Args:
             text: Text to speak
             wait: Whether to wait for speech to complete before returning
-            
+            priority: PRIORITY_ALERT, PRIORITY_RESPONSE or PRIORITY_CHATTER
+            on_finished: Called on the speech thread with the Utterance once it
+                         has been spoken or discarded
+        
         Returns:
-            True if successful, False otherwise
+            True if the text was queued (and, with wait, spoken), False otherwise
         """
         if not self.available or not self.engine:
             logger.warning("Text-to-speech not available")
             return False
         
-        try:
-            logger.debug(f"Speaking: {text}")
+        utterance = self.say(text, priority, on_finished)
+        return utterance.wait() if wait else utterance.outcome != 'coalesced'
+    
+    def say(self, text: str, priority: int = PRIORITY_RESPONSE,
+            on_finished: Optional[Callable[[Utterance], None]] = None) -> Utterance:
+        """Queue text to be spoken and get its Utterance"""
+        utterance = Utterance(text, priority, on_finished)
+        discarded = []
+        
+        with self._condition:
+            # The same text already waiting to be said is said once
+            if any(queued.text == text for _, _, queued in self._queue):
+                self.stats['coalesced'] += 1
+                discarded.append((utterance, 'coalesced'))
+            else:
+                heapq.heappush(self._queue, (priority, next(self._sequence), utterance))
+                discarded.extend((stale, 'dropped') for stale in self._trim_backlog())
+                self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'],
+                                                    len(self._queue))
+                self._condition.notify()
+            
+            self._start_worker()
+        
+        for stale, outcome in discarded:
+            self._finish(stale, outcome)
+        return utterance
+    
+    def _trim_backlog(self) -> List[Utterance]:
+        """Drop stale utterances once the queue is over max_backlog (condition held)"""
+        if len(self._queue) <= self.max_backlog:
+            return []
+        
+        now = time.perf_counter()
+        expired = [entry for entry in self._queue
+                   if now - entry[2].queued_at > self.max_age and entry[0] > PRIORITY_ALERT]
+        kept = [entry for entry in self._queue if entry not in expired]
+        
+        # Still too many: drop the least important, oldest first
+        overflow = len(kept) - self.max_backlog
+        if overflow > 0:
+            droppable = sorted((entry for entry in kept if entry[0] > PRIORITY_ALERT),
+                               key=lambda entry: (-entry[0], entry[1]))[:overflow]
+            expired.extend(droppable)
+            kept = [entry for entry in kept if entry not in droppable]
+        
+        heapq.heapify(kept)
+        self._queue = kept
+        self.stats['dropped'] += len(expired)
+        return [entry[2] for entry in expired]
+    
+    def _start_worker(self):
+        """Start the speech thread on first use (condition held)"""
+        if self._worker is None:
+            self._worker = Thread(target=self._speech_loop, name='tts', daemon=True)
+            self._worker.start()
+    
+    def _speech_loop(self):
+        """Speak queued utterances one at a time, rendering phrases when idle"""
+        while True:
+            with self._condition:
+                while not self._queue and not self._renders:
+                    self._condition.wait()
+                
+                render = self._renders.popleft() if not self._queue else None
+                if render is None:
+                    _, _, utterance = heapq.heappop(self._queue)
+                    self._current = utterance
+                    self._interrupting = False
+            
+            if render:
+                # Rendered without the lock, so say() and speak() never wait for it
+                self._render(*render)
+                continue
             
+            utterance.started_at = time.perf_counter()
+            try:
+                logger.debug(f"Speaking: {utterance.text}")
+                self._speak_text(clean_for_speech(utterance.text))
+                outcome = 'interrupted' if self._interrupting else 'spoken'
+            except Exception as e:
+                logger.error(f"Error during speech: {e}")
+                outcome = 'failed'
+            
+            with self._condition:
+                self._current = None
+                if outcome == 'spoken':
+                    self._count_use(utterance.text)
+            self.stats[outcome] += 1
+            self._finish(utterance, outcome)
+    
+    def _speak_text(self, text: str):
+        """Say text from the phrase cache, chunk by chunk or in one go (speech thread)"""
+        cached = self._cached_audio(text)
+        if cached:
+            self._on_started_utterance()
+            self._play(cached)
+            return
+        
+        chunks = split_for_speech(text, self.chunk_chars) if self.streaming else [text]
+        if len(chunks) > 1:
+            self._speak_chunks(chunks)
+            return
+        
+        with self._engine_lock:
             self.engine.say(text)
+            self.engine.runAndWait()
+    
+    def _speak_chunks(self, chunks: List[str]):
+        """Speak chunks in order, synthesizing the next while the current one plays"""
+        if not self._can_play:
+            # The engine synthesizes each queued chunk just before saying it
+            with self._engine_lock:
+                for chunk in chunks:
+                    self.engine.say(chunk)
+                self.engine.runAndWait()
+            return
+        
+        if self._chunk_renderer is None:
+            self._chunk_renderer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tts-render')
+        
+        upcoming = self._chunk_renderer.submit(self._render_chunk, chunks[0])
+        for index, chunk in enumerate(chunks):
+            current, upcoming = upcoming, None
+            path, temporary = current.result()
+            if index + 1 < len(chunks) and not self._interrupting:
+                upcoming = self._chunk_renderer.submit(self._render_chunk, chunks[index + 1])
             
-            if wait:
+            try:
+                if self._interrupting:
+                    break
+                if path is None:
+                    with self._engine_lock:
+                        self.engine.say(chunk)
+                        self.engine.runAndWait()
+                else:
+                    self._on_started_utterance()
+                    self._play(path)
+            finally:
+                if temporary:
+                    path.unlink()
+        
+        # A chunk rendered ahead of an interruption is never played
+        if upcoming is not None:
+            upcoming.add_done_callback(self._discard_chunk)
+    
+    @staticmethod
+    def _discard_chunk(future):
+        path, temporary = future.result()
+        if temporary:
+            path.unlink(missing_ok=True)
+    
+    def _render_chunk(self, chunk: str):
+        """Get a chunk's audio file and whether it is temporary (renderer thread)"""
+        cached = self._cached_audio(chunk)
+        if cached:
+            return cached, False
+        
+        handle, name = tempfile.mkstemp(prefix='jarvis-tts-', suffix='.wav')
+        os.close(handle)
+        path = Path(name)
+        if not self._synthesize_to_file(chunk, path):
+            return None, False
+        return path, True
+    
+    def _finish(self, utterance: Utterance, outcome: str):
+        utterance.outcome = outcome
+        utterance.finished_at = time.perf_counter()
+        utterance._done.set()
+        
+        if utterance.on_finished:
+            try:
+                utterance.on_finished(utterance)
+            except Exception as e:
+                logger.error(f"Error in speech callback: {e}")
+    
+    def _init_phrase_cache(self) -> Optional[PhraseCache]:
+        """Open the phrase cache if cached audio can be played here"""
+        if not self._can_play:
+            logger.info("Phrase cache disabled: PyAudio is needed to play cached audio")
+            return None
+        
+        return PhraseCache(
+            config.get('voice.phrase_cache_dir', 'cache/phrases'),
+            max_entries=config.get('voice.phrase_cache_max_entries', 200),
+            max_bytes=config.get('voice.phrase_cache_max_mb', 50) * 1024 * 1024
+        )
+    
+    def _phrase_key(self, text: str) -> str:
+        return PhraseCache.key(clean_for_speech(text), self.voice_id, self.rate, self.volume)
+    
+    def warm_cache(self, phrases: List[str]):
+        """Render phrases into the phrase cache in the background"""
+        if not self.phrase_cache or not self.available:
+            return
+        
+        with self._condition:
+            for text in dict.fromkeys(phrases):
+                key = self._phrase_key(text)
+                if text.strip() and key not in self.phrase_cache:
+                    self._renders.append((text, key))
+            self._start_worker()
+            self._condition.notify()
+    
+    def _count_use(self, text: str):
+        """Queue a phrase for rendering once it has been said often enough (condition held)"""
+        if not self.phrase_cache:
+            return
+        
+        # Forget one-off phrases rather than grow without bound
+        if len(self._use_counts) > 1000:
+            self._use_counts.clear()
+        
+        uses = self._use_counts.get(text, 0) + 1
+        self._use_counts[text] = uses
+        if uses == self.cache_min_uses:
+            key = self._phrase_key(text)
+            if key not in self.phrase_cache:
+                self._renders.append((text, key))
+    
+    def _cached_audio(self, text: str) -> Optional[Path]:
+        if not self.phrase_cache:
+            return None
+        return self.phrase_cache.get(self._phrase_key(text))
+    
+    def _render(self, text: str, key: str):
+        """Synthesize a phrase to a WAV file and add it to the cache (speech thread)"""
+        if key in self.phrase_cache:
+            return
+        
+        rendering = self.phrase_cache.path(key).with_suffix('.tmp')
+        if self._synthesize_to_file(clean_for_speech(text), rendering):
+            self.phrase_cache.add(key, rendering)
+    
+    def _synthesize_to_file(self, text: str, path: Path) -> bool:
+        """Render text to a WAV file; False (and no file) if that fails"""
+        try:
+            with self._engine_lock:
+                self.engine.save_to_file(text, str(path))
                 self.engine.runAndWait()
             
+            # Some drivers ignore the extension; only WAV can be played back
+            with wave.open(str(path), 'rb') as audio:
+                audio.getparams()
             return True
-            
         except Exception as e:
-            logger.error(f"Error during speech: {e}")
+            logger.debug(f"Could not render {text!r}: {e}")
+            try:
+                path.unlink()
+            except OSError:
+                pass
             return False
     
-    def stop(self):
-        """Stop current speech"""
-        if self.available and self.engine:
+    def _play(self, path: Path):
+        """Play a cached WAV file, stopping early if interrupted"""
+        import pyaudio
+        if self._audio is None:
+            self._audio = pyaudio.PyAudio()
+        
+        with wave.open(str(path), 'rb') as audio:
+            stream = self._audio.open(
+                format=self._audio.get_format_from_width(audio.getsampwidth()),
+                channels=audio.getnchannels(),
+                rate=audio.getframerate(),
+                output=True
+            )
+            try:
+                # Short chunks so an interruption is heard within ~50 ms
+                chunk = max(1, audio.getframerate() // 20)
+                data = audio.readframes(chunk)
+                while data and not self._interrupting:
+                    stream.write(data)
+                    data = audio.readframes(chunk)
+            finally:
+                stream.stop_stream()
+                stream.close()
+    
+    def _on_started_utterance(self, name=None):
+        utterance = self._current
+        if utterance is not None and utterance.first_audio_at is None:
+            utterance.first_audio_at = time.perf_counter()
+            self._first_audio_times.append(utterance.time_to_first_audio)
+            del self._first_audio_times[:-100]
+    
+    def _on_started_word(self, name=None, location=None, length=None):
+        # The engine can only be stopped reliably from inside its run loop
+        if self._interrupting:
+            self.engine.stop()
+    
+    def interrupt(self, clear_queue: bool = True, keep_alerts: bool = True) -> int:
+        """
+        Cut off the current utterance
+        
+        Args:
+            clear_queue: Also drop the utterances waiting to be spoken
+            keep_alerts: Leave PRIORITY_ALERT utterances alone
+        
+        Returns:
+            Number of utterances interrupted or dropped
+        """
+        with self._condition:
+            current = self._current
+            if current is not None and not (keep_alerts and current.priority == PRIORITY_ALERT):
+                self._interrupting = True
+            else:
+                current = None
+            
+            dropped = []
+            if clear_queue:
+                dropped = [entry for entry in self._queue
+                           if not (keep_alerts and entry[0] == PRIORITY_ALERT)]
+                self._queue = [entry for entry in self._queue if entry not in dropped]
+                heapq.heapify(self._queue)
+                self.stats['dropped'] += len(dropped)
+        
+        # Words already handed to the engine stop at the next word boundary
+        if current is not None:
             try:
                 self.engine.stop()
-                logger.debug("Speech stopped")
             except Exception as e:
-                logger.error(f"Error stopping speech: {e}")
+                logger.debug(f"Error interrupting speech: {e}")
+        
+        for _, _, utterance in dropped:
+            self._finish(utterance, 'dropped')
+        return len(dropped) + (current is not None)
+    
+    @property
+    def is_speaking(self) -> bool:
+        return self._current is not None
+    
+    def queue_depth(self) -> int:
+        """Number of utterances waiting to be spoken"""
+        return len(self._queue)
+    
+    def get_stats(self) -> Dict:
+        """Get speech queue statistics"""
+        times = self._first_audio_times
+        return dict(
+            self.stats,
+            queue_depth=self.queue_depth(),
+            speaking=self.is_speaking,
+            average_time_to_first_audio_ms=round(sum(times) / len(times) * 1000, 1)
+            if times else None,
+            max_time_to_first_audio_ms=round(max(times) * 1000, 1) if times else None,
+            phrase_cache=self.phrase_cache.get_stats() if self.phrase_cache else None
+        )
+    
+    def stop(self):
+        """Stop current speech and drop anything queued"""
+        if self.available and self.engine:
+            self.interrupt(keep_alerts=False)
+            logger.debug("Speech stopped")
     
     def set_rate(self, rate: int):
         """
@@ -141,6 +628,7 @@ class TextToSpeech:
             for voice in voices:
                 if voice_id in voice.id or voice_id.lower() in voice.name.lower():
                     self.engine.setProperty('voice', voice.id)
+                    self.voice_id = voice.id
                     logger.info(f"Voice set to: {voice.name}")
                     return True
             
@@ -166,8 +654,9 @@ class TextToSpeech:
             return False
         
         try:
-            self.engine.save_to_file(text, filename)
-            self.engine.runAndWait()
+            with self._engine_lock:
+                self.engine.save_to_file(text, filename)
+                self.engine.runAndWait()
             logger.info(f"Speech saved to: {filename}")
             return True
         except Exception as e:
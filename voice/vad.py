@@ -0,0 +1,196 @@
+"""
+Voice Activity Detection for Jarvis V2
+Frame-level speech detection and utterance endpointing with NumPy
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+from utils.config_manager import get_config
+
+config = get_config()
+
+
+class VoiceActivityDetector:
+    """
+    Classifies short frames of 16-bit mono audio as speech or not
+    
+    A frame is speech when its energy is well above the noise floor and its
+    zero-crossing rate is in the range of voiced speech (hiss and clicks
+    cross zero far more often); unvoiced sounds such as "s" pass when they
+    are loud enough. Optionally, spectrally flat (noise-like) frames are
+    rejected as well. All features are computed for a block of frames at
+    once. The noise floor follows the frames classified as non-speech.
+    """
+    
+    def __init__(self, sample_rate: int = 16000, frame_ms: Optional[int] = None,
+                 energy_margin_db: Optional[float] = None, spectral: Optional[bool] = None):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms or config.get('voice.vad_frame_ms', 20)
+        self.frame_samples = int(sample_rate * self.frame_ms / 1000)
+        self.energy_margin_db = energy_margin_db if energy_margin_db is not None else \
+            config.get('voice.vad_energy_margin_db', 9.0)
+        self.spectral = spectral if spectral is not None else config.get('voice.vad_spectral', False)
+        
+        self.min_energy_db = -60.0   # never speech below this, however quiet the room
+        self.max_zcr = 0.25          # crossings per sample
+        self.loud_margin_db = 2 * self.energy_margin_db
+        self.max_flatness = 0.5
+        self.noise_db: Optional[float] = None
+        self.noise_adaptation = 0.05
+    
+    def frames(self, samples: np.ndarray) -> np.ndarray:
+        """View whole frames of samples as a (frames, frame_samples) array"""
+        count = len(samples) // self.frame_samples
+        return samples[:count * self.frame_samples].reshape(count, self.frame_samples)
+    
+    def features(self, frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Energy (dBFS) and zero-crossing rate of each frame"""
+        scaled = frames.astype(np.float32) / 32768.0
+        energy_db = 10.0 * np.log10(np.mean(scaled * scaled, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+        return energy_db, zcr
+    
+    def spectral_flatness(self, frames: np.ndarray) -> np.ndarray:
+        """Spectral flatness of each frame in the speech band (1 = white noise)"""
+        window = np.hanning(frames.shape[1]).astype(np.float32)
+        power = np.abs(np.fft.rfft(frames.astype(np.float32) * window, axis=1)) ** 2 + 1e-10
+        frequencies = np.fft.rfftfreq(frames.shape[1], 1.0 / self.sample_rate)
+        band = power[:, (frequencies >= 100) & (frequencies <= 4000)]
+        return np.exp(np.mean(np.log(band), axis=1)) / np.mean(band, axis=1)
+    
+    def calibrate(self, samples: np.ndarray, percentile: float = 50):
+        """
+        Set the noise floor from background audio
+        A low percentile estimates it from audio that also contains speech.
+        """
+        frames = self.frames(samples)
+        if len(frames):
+            self.noise_db = float(np.percentile(self.features(frames)[0], percentile))
+    
+    def is_speech(self, frames: np.ndarray) -> np.ndarray:
+        """Classify each frame, then update the noise floor from the non-speech ones"""
+        if not len(frames):
+            return np.zeros(0, dtype=bool)
+        
+        energy_db, zcr = self.features(frames)
+        if self.noise_db is None:
+            self.noise_db = float(np.min(energy_db))
+        
+        loud = energy_db > max(self.noise_db + self.energy_margin_db, self.min_energy_db)
+        speech = loud & ((zcr < self.max_zcr) | (energy_db > self.noise_db + self.loud_margin_db))
+        if self.spectral and speech.any():
+            speech &= self.spectral_flatness(frames) < self.max_flatness
+        
+        quiet = energy_db[~speech]
+        if len(quiet):
+            # Follow a falling floor at once, a rising one slowly
+            level = float(np.mean(quiet))
+            if level < self.noise_db:
+                self.noise_db = level
+            else:
+                rate = 1 - (1 - self.noise_adaptation) ** len(quiet)
+                self.noise_db += rate * (level - self.noise_db)
+        return speech
+
+
+class Endpointer:
+    """
+    Finds where an utterance starts and ends in a stream of audio
+    
+    Speech starts with min_speech_ms of consecutive speech frames and ends
+    once hangover_ms of non-speech follow it. Times are seconds from the
+    start of the stream.
+    """
+    
+    def __init__(self, vad: VoiceActivityDetector, min_speech_ms: Optional[int] = None,
+                 hangover_ms: Optional[int] = None, padding_ms: Optional[int] = None):
+        self.vad = vad
+        min_speech_ms = min_speech_ms or config.get('voice.vad_min_speech_ms', 90)
+        hangover_ms = hangover_ms or config.get('voice.vad_hangover_ms', 400)
+        padding_ms = padding_ms if padding_ms is not None else config.get('voice.vad_padding_ms', 150)
+        
+        self.min_speech_frames = max(1, round(min_speech_ms / vad.frame_ms))
+        self.hangover_frames = max(1, round(hangover_ms / vad.frame_ms))
+        self.padding_samples = int(vad.sample_rate * padding_ms / 1000)
+        
+        self.speech_start: Optional[float] = None
+        self.speech_end: Optional[float] = None
+        self.ended = False
+        
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._frame_index = 0
+        self._run = 0       # consecutive speech frames
+        self._silence = 0   # non-speech frames since the last speech frame
+        self._last_speech_frame = -1
+    
+    def feed(self, samples: np.ndarray) -> bool:
+        """Process the next samples; returns True once the utterance has ended"""
+        if self.ended:
+            return True
+        
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        frames = self.vad.frames(samples)
+        self._pending = samples[len(frames) * self.vad.frame_samples:]
+        
+        for speech in self.vad.is_speech(frames):
+            if speech:
+                self._run += 1
+                self._silence = 0
+                self._last_speech_frame = self._frame_index
+                if self.speech_start is None and self._run >= self.min_speech_frames:
+                    self.speech_start = self._frame_time(self._frame_index - self._run + 1)
+            else:
+                self._run = 0
+                self._silence += 1
+                if self.speech_start is not None and self._silence >= self.hangover_frames:
+                    self.speech_end = self._frame_time(self._last_speech_frame + 1)
+                    self.ended = True
+                    self._frame_index += 1
+                    return True
+            self._frame_index += 1
+        
+        return False
+    
+    def finish(self):
+        """End the utterance where the audio stops (e.g. at the phrase time limit)"""
+        if self.speech_start is not None and self.speech_end is None:
+            self.speech_end = self._frame_time(self._last_speech_frame + 1)
+        self.ended = True
+    
+    def bounds(self, total_samples: int) -> Tuple[int, int]:
+        """Sample range of the utterance with padding, trimming leading and trailing silence"""
+        if self.speech_start is None:
+            return 0, 0
+        end = self.speech_end if self.speech_end is not None else total_samples / self.vad.sample_rate
+        start_sample = max(0, int(self.speech_start * self.vad.sample_rate) - self.padding_samples)
+        end_sample = min(total_samples, int(end * self.vad.sample_rate) + self.padding_samples)
+        return start_sample, end_sample
+    
+    @property
+    def processed_seconds(self) -> float:
+        """Audio classified so far"""
+        return self._frame_time(self._frame_index)
+    
+    def _frame_time(self, frame_index: int) -> float:
+        return frame_index * self.vad.frame_samples / self.vad.sample_rate
+
+
+def to_samples(data) -> np.ndarray:
+    """View 16-bit PCM bytes (or a memoryview of them) as samples, without copying"""
+    return np.frombuffer(data, dtype=np.int16)
+
+
+def find_speech(samples: np.ndarray, sample_rate: int = 16000,
+                vad: Optional[VoiceActivityDetector] = None) -> Optional[Tuple[float, float]]:
+    """Get the start and end (seconds) of the first utterance in recorded audio"""
+    vad = vad or VoiceActivityDetector(sample_rate)
+    if vad.noise_db is None:
+        vad.calibrate(samples, percentile=10)
+    endpointer = Endpointer(vad)
+    endpointer.feed(samples)
+    endpointer.finish()
+    if endpointer.speech_start is None:
+        return None
+    return endpointer.speech_start, endpointer.speech_end
@@ -3,12 +3,11 @@ Wake Word Detection for Jarvis V2
 Listens for wake word to activate voice commands
 """
 
-import struct
-import pyaudio
 from threading import Thread, Event
 from typing import Optional, Callable
 from utils.logger import get_logger
 from utils.config_manager import get_config
+from voice.audio_bus import get_audio_bus
 
 logger = get_logger()
 config = get_config()
@@ -23,8 +22,7 @@ class WakeWordDetector:
         self.stop_event = Event()
         self.listen_thread = None
         self.porcupine = None
-        self.audio_stream = None
-        self.pa = None
+        self.reader = None
         
         # Try to initialize Porcupine
         self._init_porcupine()
@@ -67,7 +65,9 @@ class WakeWordDetector:
         Start listening for wake word
         
         Args:
-            callback: Function to call when wake word is detected
+            callback: Function to call when wake word is detected, with the
+                      audio bus position where the audio after it starts
+                      (audio_position=...)
         """
         if self.is_listening:
             logger.warning("Wake word detector already running")
@@ -102,31 +102,32 @@ class WakeWordDetector:
     def _listen_loop(self, callback: Callable):
         """Main listening loop"""
         try:
-            self.pa = pyaudio.PyAudio()
-            
-            self.audio_stream = self.pa.open(
-                rate=self.porcupine.sample_rate,
-                channels=1,
-                format=pyaudio.paInt16,
-                input=True,
-                frames_per_buffer=self.porcupine.frame_length
-            )
+            bus = get_audio_bus()
+            if bus.sample_rate != self.porcupine.sample_rate:
+                logger.error(f"Wake word engine needs {self.porcupine.sample_rate} Hz audio; "
+                             f"capture runs at {bus.sample_rate} Hz")
+                return
             
-            logger.debug("Audio stream opened for wake word detection")
+            bus.start()
+            self.reader = bus.open_reader('wake word')
+            logger.debug("Wake word detection reading from the audio bus")
             
             while self.is_listening and not self.stop_event.is_set():
                 try:
-                    pcm = self.audio_stream.read(self.porcupine.frame_length, 
-                                                exception_on_overflow=False)
-                    pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm)
+                    pcm = self.reader.read(self.porcupine.frame_length, timeout=1)
+                    if pcm is None:
+                        continue
                     
-                    keyword_index = self.porcupine.process(pcm)
+                    keyword_index = self.porcupine.process(memoryview(pcm).cast('h'))
                     
                     if keyword_index >= 0:
                         logger.info(f"Wake word '{self.wake_word}' detected!")
                         if callback:
-                            callback()
-                    
+                            callback(audio_position=self.reader.position)
+                        
+                        # The audio after the wake word went to the callback
+                        self.reader.seek_to_live()
+                
                 except Exception as e:
                     if self.is_listening:
                         logger.error(f"Error in wake word detection loop: {e}")
@@ -138,19 +139,11 @@ class WakeWordDetector:
             self._cleanup()
     
     def _cleanup(self):
-        """Clean up audio resources"""
-        try:
-            if self.audio_stream:
-                self.audio_stream.close()
-                self.audio_stream = None
-            
-            if self.pa:
-                self.pa.terminate()
-                self.pa = None
-            
+        """Stop reading audio"""
+        if self.reader:
+            self.reader.close()
+            self.reader = None
             logger.debug("Wake word detector cleaned up")
-        except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
     
     def __del__(self):
         """Destructor"""
@@ -163,14 +156,22 @@ class WakeWordDetector:
 class SimpleWakeWordDetector:
     """Simple wake word detection using speech recognition"""
     
-    def __init__(self, wake_word: Optional[str] = None):
+    def __init__(self, wake_word: Optional[str] = None, recognizer=None):
         self.wake_word = wake_word or config.get('voice.wake_word', 'jarvis')
+        self.recognizer = recognizer
         self.is_listening = False
         self.stop_event = Event()
         self.listen_thread = None
     
     def start(self, callback: Callable):
-        """Start listening for wake word"""
+        """
+        Start listening for wake word
+        
+        Args:
+            callback: Function to call when wake word is detected, with
+                      whatever was said after it in the same phrase
+                      (command=...) if anything was
+        """
         if self.is_listening:
             return
         
@@ -179,7 +180,8 @@ class SimpleWakeWordDetector:
         self.is_listening = True
         self.stop_event.clear()
         
-        recognizer = SpeechRecognizer()
+        # Reuse the assistant's calibrated recognizer if there is one
+        recognizer = self.recognizer or SpeechRecognizer()
         
         def listen_loop():
             logger.info(f"Simple wake word detection started for '{self.wake_word}'")
@@ -191,8 +193,9 @@ class SimpleWakeWordDetector:
                     text = result['text'].lower()
                     if self.wake_word.lower() in text:
                         logger.info(f"Wake word '{self.wake_word}' detected!")
+                        command = text.split(self.wake_word.lower(), 1)[1].strip(' ,.!?')
                         if callback:
-                            callback()
+                            callback(command=command or None)
         
         self.listen_thread = Thread(target=listen_loop)
         self.listen_thread.daemon = True